@@ -0,0 +1,63 @@
+import threading
+
+
+class AnalysisBatcher:
+    """
+    Groups articles that pipeline workers submit at about the same time into one batched analysis.
+
+    Each worker calls ``analyze(key, text, priority)`` and blocks until its
+    analysis is ready. Submissions are collected until ``max_articles`` are
+    waiting or the oldest has waited ``wait_seconds``; the worker that closes
+    the group then runs ``analyze_many({key: text}, {key: priority})`` for
+    everyone (see mvp_demo.analyze_texts) and hands each waiting worker its
+    own result. A group can never be larger
+    than the number of workers calling analyze().
+    """
+
+    def __init__(self, analyze_many, max_articles=8, wait_seconds=2.0):
+        self.analyze_many = analyze_many
+        self.max_articles = max(1, int(max_articles))
+        self.wait_seconds = wait_seconds
+        self._lock = threading.Lock()
+        self._pending = []
+        self.batches = 0
+        self.articles = 0
+
+    def analyze(self, key, text, priority=0.0):
+        slot = {'key': key, 'text': text, 'priority': priority, 'done': threading.Event(), 'result': None}
+        with self._lock:
+            self._pending.append(slot)
+            group = self._take() if len(self._pending) >= self.max_articles else None
+        if group:
+            self._run(group)
+        elif not slot['done'].wait(self.wait_seconds):
+            # Nobody closed the group in time: close it ourselves (unless it was just taken)
+            with self._lock:
+                group = self._take() if slot in self._pending else None
+            if group:
+                self._run(group)
+        slot['done'].wait()
+        return slot['result']
+
+    def _take(self):
+        group, self._pending = self._pending, []
+        return group
+
+    def _run(self, group):
+        try:
+            results = self.analyze_many({slot['key']: slot['text'] for slot in group},
+                                        {slot['key']: slot['priority'] for slot in group})
+        except Exception as e:
+            results = {}
+            print(f"  ❌ Batched analysis failed: {e}")
+        with self._lock:
+            self.batches += 1
+            self.articles += len(group)
+        for slot in group:
+            slot['result'] = results.get(slot['key'], "ERROR: Batched analysis returned no result")
+            slot['done'].set()
+
+    def stats(self):
+        with self._lock:
+            return {'batches': self.batches, 'articles': self.articles,
+                    'articles_per_batch': round(self.articles / self.batches, 2) if self.batches else 0.0}
@@ -0,0 +1,126 @@
+import json
+
+# Response schema for JSON output mode (passed to Gemini as response_schema,
+# which constrains generation to it)
+ANALYSIS_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'is_new_feature': {'type': 'boolean'},
+        'feature_name': {'type': 'string'},
+        'category': {'type': 'string'},
+        'target_market': {'type': 'string'},
+        'summary': {'type': 'string'},
+        'competitive_intelligence': {'type': 'string'},
+        'key_features': {'type': 'array', 'items': {'type': 'string'}},
+        'relevance_score': {'type': 'integer'},
+    },
+    'required': ['is_new_feature', 'feature_name', 'category', 'summary', 'relevance_score'],
+}
+
+# Batched requests answer with one object per article, tagged with its number
+BATCH_SCHEMA = {
+    'type': 'array',
+    'items': dict(ANALYSIS_SCHEMA,
+                  properties=dict(ANALYSIS_SCHEMA['properties'], article={'type': 'integer'}),
+                  required=['article'] + ANALYSIS_SCHEMA['required']),
+}
+
+# Screening answer of the fast model in a cascade: no competitive
+# intelligence or key features (validate fills them in empty)
+SCREEN_SCHEMA = dict(ANALYSIS_SCHEMA, properties={
+    field: spec for field, spec in ANALYSIS_SCHEMA['properties'].items()
+    if field not in ('competitive_intelligence', 'key_features')})
+
+_STRING_FIELDS = ('feature_name', 'category', 'target_market', 'summary', 'competitive_intelligence')
+
+
+def is_json(text):
+    return bool(text) and text.lstrip()[:1] in ('{', '[')
+
+
+def validate(data):
+    """
+    Checks one decoded analysis object against ANALYSIS_SCHEMA and normalizes it.
+
+    Returns:
+        The analysis record, or None if a required field is missing or has the wrong type
+    """
+    if not isinstance(data, dict):
+        return None
+    for field in ANALYSIS_SCHEMA['required']:
+        if field not in data:
+            return None
+    if not isinstance(data['is_new_feature'], bool):
+        return None
+    score = data['relevance_score']
+    if isinstance(score, bool) or not isinstance(score, (int, float)):
+        return None
+    key_features = data.get('key_features') or []
+    if not isinstance(key_features, list):
+        return None
+    record = {'is_new_feature': data['is_new_feature'],
+              'relevance_score': max(0, min(10, int(score))),
+              'key_features': [str(feature).strip()[:100] for feature in key_features if str(feature).strip()][:5]}
+    for field in _STRING_FIELDS:
+        value = data.get(field, '')
+        if not isinstance(value, str):
+            return None
+        record[field] = value.strip()
+    return record
+
+
+def decode(text):
+    """Decodes a JSON-mode analysis in a single pass; None when it is not a valid analysis (use the Markdown parser)."""
+    if not is_json(text):
+        return None
+    try:
+        return validate(json.loads(text))
+    except ValueError:
+        return None
+
+
+def decode_batch(text, count):
+    """
+    Splits a JSON-mode batched response into one analysis (as JSON text) per article, in article order.
+
+    Returns:
+        List of count JSON strings, or None unless every article 1..count has exactly one valid analysis
+    """
+    if not is_json(text):
+        return None
+    try:
+        items = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(items, list) or len(items) != count:
+        return None
+    by_article = {}
+    for item in items:
+        record = validate(item)
+        number = item.get('article') if isinstance(item, dict) else None
+        if record is None or not isinstance(number, int) or number in by_article:
+            return None
+        by_article[number] = record
+    if sorted(by_article) != list(range(1, count + 1)):
+        return None
+    return [json.dumps(by_article[number], ensure_ascii=False) for number in range(1, count + 1)]
+
+
+def to_markdown(record):
+    """Renders a decoded analysis in the Markdown layout of ANALYSIS_FORMAT (for logs)."""
+    lines = [
+        "**FEATURE ANALYSIS:**",
+        f"- Is this announcing a new feature or product? {'Yes' if record['is_new_feature'] else 'No'}",
+        f"- Feature/Product Name: {record['feature_name']}",
+        f"- Category: {record['category']}",
+        f"- Target Market: {record['target_market']}",
+        "",
+        "**SUMMARY:**",
+        record['summary'],
+    ]
+    if record['competitive_intelligence']:
+        lines += ["", "**COMPETITIVE INTELLIGENCE:**", record['competitive_intelligence']]
+    if record['key_features']:
+        lines += ["", "**KEY FEATURES:**"] + [f"- {feature}" for feature in record['key_features']]
+    lines += ["", f"**RELEVANCE SCORE:** {record['relevance_score']}"]
+    return '\n'.join(lines)
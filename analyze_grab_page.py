@@ -1,24 +1,22 @@
 #!/usr/bin/env python3
 
-import requests
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
 
+import html_parser
+import http_client
+
 def analyze_grab_press_page():
     """分析Grab press页面的结构"""
     
     url = 'https://www.grab.com/sg/press/'
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
 
     try:
         print(f"正在分析: {url}")
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_client.get(url, profile='grab')
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = html_parser.make_soup(response.content)
         
         # 查找所有可能的文章链接
         print("\n=== 查找文章链接 ===")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Measures the per-request cost of getting a Gemini model client, before and
+after model_registry: constructing a GenerativeModel on every call (the old
+analyze_text) against a registry lookup, from several threads at once.
+No request is sent, so no API key or network access is needed.
+
+Usage: python benchmark_model_clients.py [calls_per_thread] [threads] [model]
+"""
+
+import sys
+import threading
+import time
+
+import google.generativeai as genai
+from google.generativeai import client as genai_client
+
+import model_registry
+
+
+def run_threads(get_client, calls, threads):
+    """Returns (seconds, distinct client objects) for threads x calls get_client() calls."""
+    # Every client is kept alive until counted, so no id() is reused
+    clients = []
+    clients_lock = threading.Lock()
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+        got = [get_client() for _ in range(calls)]
+        with clients_lock:
+            clients.extend(got)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return elapsed, len({id(client) for client in clients})
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    name = sys.argv[3] if len(sys.argv) > 3 else 'gemini-1.5-pro'
+    # Client construction never contacts the API, any key will do
+    genai.configure(api_key='benchmark')
+    total = calls * threads
+    print(f"🤖 {name}: {calls} calls x {threads} threads\n")
+
+    start = time.perf_counter()
+    genai_client.get_default_generative_client()
+    print(f"One-time transport setup        {(time.perf_counter() - start) * 1000:9.3f} ms")
+
+    before, before_clients = run_threads(lambda: genai.GenerativeModel(name), calls, threads)
+    print(f"Before: GenerativeModel per call {before * 1e6 / total:8.2f} µs/call  {before_clients:6d} client objects")
+
+    model_registry.get_model(name)
+    after, after_clients = run_threads(lambda: model_registry.get_model(name), calls, threads)
+    print(f"After:  model_registry lookup    {after * 1e6 / total:8.2f} µs/call  {after_clients:6d} client object(s)")
+    print(f"\nRegistry stats: {model_registry.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Parses the saved Grab press page repeatedly with every installed HTML parser
+backend and reports throughput and peak memory, checking that all backends
+(and full vs. partial parsing) agree.
+
+Usage: python benchmark_parsers.py [iterations] [html_file]
+"""
+
+import sys
+import time
+import tracemalloc
+
+import html_parser
+
+
+def benchmark_backend(html, backend, iterations, partial=True):
+    """Returns (seconds, peak_bytes, result) for parsing html `iterations` times."""
+    # Peak memory from a separate traced run, since tracing slows parsing down
+    tracemalloc.start()
+    result = html_parser.parse_grab_listing(html, backend=backend, partial=partial)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        html_parser.parse_grab_listing(html, backend=backend, partial=partial)
+    return time.perf_counter() - start, peak, result
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    html_file = sys.argv[2] if len(sys.argv) > 2 else 'grab_press_page.html'
+
+    with open(html_file, 'rb') as f:
+        html = f.read()
+    size_mb = len(html) / (1024 * 1024)
+    print(f"📄 {html_file}: {len(html):,} bytes, {iterations} iterations per backend\n")
+
+    runs = []
+    for backend in html_parser.available_backends():
+        if backend != 'selectolax':
+            runs.append((f"{backend} (full)", backend, False))
+        runs.append((backend, backend, True))
+
+    baseline = None
+    timings = {}
+    for label, backend, partial in runs:
+        elapsed, peak, result = benchmark_backend(html, backend, iterations, partial)
+        timings[label] = elapsed
+        if baseline is None:
+            baseline = result
+        status = "✓ identical" if result == baseline else "❌ differs from html.parser (full)"
+        # lexbor allocates in C, which tracemalloc cannot see
+        memory = "   n/a (C heap)" if backend == 'selectolax' else f"{peak / (1024 * 1024):6.2f} MB peak"
+        print(f"{label:20s} {iterations / elapsed:8.1f} pages/s  "
+              f"{size_mb * iterations / elapsed:7.2f} MB/s  "
+              f"{elapsed / iterations * 1000:7.2f} ms/page  "
+              f"{memory}  {len(result[0])} panels  {status}")
+
+    slowest = timings['html.parser (full)']
+    print()
+    for label, elapsed in timings.items():
+        if label != 'html.parser (full)':
+            print(f"⚡ {label} is {slowest / elapsed:.1f}x faster than html.parser (full)")
+    print(f"Selected backend (HTML_PARSER_BACKEND={html_parser.HTML_PARSER_BACKEND}): "
+          f"{html_parser.resolve_backend()}")
+
+
+if __name__ == "__main__":
+    main()
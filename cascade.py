@@ -0,0 +1,95 @@
+import os
+import re
+import threading
+
+import analysis_schema
+import html_parser
+
+# Prices used for the cost estimate, in USD per million input and output
+# tokens ("input,output"); defaults are gemini-1.5-flash and gemini-1.5-pro
+CASCADE_FAST_PRICE = os.environ.get('CASCADE_FAST_PRICE', '0.075,0.30')
+CASCADE_LARGE_PRICE = os.environ.get('CASCADE_LARGE_PRICE', '1.25,5.00')
+
+TIERS = ('fast', 'large')
+
+_NEW_FEATURE_RE = re.compile(r'new feature or product\?\**\s*(yes|no)', re.IGNORECASE)
+_SCORE_RE = re.compile(r'RELEVANCE SCORE:\**\s*(\d+)', re.IGNORECASE)
+
+_lock = threading.Lock()
+_counters = {tier: {'calls': 0, 'seconds': 0.0, 'input_tokens': 0, 'output_tokens': 0} for tier in TIERS}
+_decisions = {'screened': 0, 'escalated': 0}
+
+
+def _prices(value):
+    input_price, output_price = (float(part) for part in value.split(','))
+    return input_price, output_price
+
+
+_PRICES = {'fast': _prices(CASCADE_FAST_PRICE), 'large': _prices(CASCADE_LARGE_PRICE)}
+
+
+def verdict(analysis_text):
+    """
+    Reads the screening answer of the fast model (JSON or Markdown).
+
+    Returns:
+        (is_new_feature, relevance_score), or None if the answer cannot be read
+    """
+    record = analysis_schema.decode(analysis_text)
+    if record is not None:
+        return record['is_new_feature'], record['relevance_score']
+    score = _SCORE_RE.search(analysis_text or '')
+    if not score:
+        return None
+    new_feature = _NEW_FEATURE_RE.search(analysis_text)
+    return bool(new_feature and new_feature.group(1).lower() == 'yes'), int(score.group(1))
+
+
+def should_escalate(analysis_text, threshold):
+    """Escalate new features and articles scoring at least threshold; unreadable answers are escalated too."""
+    result = verdict(analysis_text)
+    if result is None:
+        return True
+    is_new_feature, score = result
+    return is_new_feature or score >= threshold
+
+
+def record_call(tier, seconds, prompt, response):
+    """Counts one model call of a tier ('fast' or 'large'), with tokens estimated locally."""
+    with _lock:
+        counters = _counters[tier]
+        counters['calls'] += 1
+        counters['seconds'] += seconds
+        counters['input_tokens'] += html_parser.estimate_tokens(prompt)
+        counters['output_tokens'] += html_parser.estimate_tokens(response or '')
+
+
+def record_decision(escalated):
+    with _lock:
+        _decisions['screened'] += 1
+        _decisions['escalated'] += bool(escalated)
+
+
+def _cost(tier, counters):
+    input_price, output_price = _PRICES[tier]
+    return (counters['input_tokens'] * input_price + counters['output_tokens'] * output_price) / 1e6
+
+
+def stats():
+    """Per-tier calls, average latency and estimated cost, plus how often the fast tier escalated."""
+    with _lock:
+        tiers = {}
+        for tier, counters in _counters.items():
+            tiers[tier] = {
+                'calls': counters['calls'],
+                'avg_latency_ms': round(counters['seconds'] * 1000 / counters['calls'], 1) if counters['calls'] else 0.0,
+                'input_tokens': counters['input_tokens'],
+                'output_tokens': counters['output_tokens'],
+                'cost_usd': round(_cost(tier, counters), 6),
+            }
+        screened = _decisions['screened']
+        return dict(tiers,
+                    screened=screened,
+                    escalated=_decisions['escalated'],
+                    escalation_rate=round(_decisions['escalated'] / screened, 3) if screened else 0.0,
+                    cost_usd=round(sum(tier['cost_usd'] for tier in tiers.values()), 6))
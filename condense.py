@@ -0,0 +1,108 @@
+import os
+import re
+
+import html_parser
+
+# Token budget for the article text sent to the model (0 = send everything).
+# Counted with html_parser.estimate_tokens, the same local tokenizer used for
+# batching and TPM quotas.
+ANALYSIS_TOKEN_BUDGET = int(os.environ.get('ANALYSIS_TOKEN_BUDGET', '800'))
+# Cap on the characters sent, whatever the token estimate says; met by dropping
+# the lowest-ranked sentences (0 = none)
+ANALYSIS_MAX_CHARS = int(os.environ.get('ANALYSIS_MAX_CHARS', '4000'))
+
+# Words that tend to appear in sentences announcing something
+FEATURE_KEYWORDS = {
+    'launch', 'launches', 'launched', 'introduce', 'introduces', 'introduced', 'introducing',
+    'new', 'feature', 'features', 'available', 'availability', 'rollout', 'roll', 'rolls',
+    'expand', 'expands', 'expansion', 'partnership', 'partner', 'partners', 'users', 'customers',
+    'merchants', 'drivers', 'app', 'service', 'services', 'product', 'pilot', 'beta', 'announce',
+    'announces', 'announced', 'unveil', 'unveils', 'enable', 'enables', 'allows', 'option',
+}
+# Page furniture that leaks into extracted text
+BOILERPLATE_WORDS = {
+    'cookie', 'cookies', 'subscribe', 'newsletter', 'privacy', 'copyright', 'reserved',
+    'facebook', 'twitter', 'linkedin', 'instagram', 'login',
+}
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have', 'in', 'is',
+    'it', 'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'were', 'will', 'with',
+}
+
+# Sentence ends (CJK full stops need no following space or capital), and
+# line breaks between blocks extracted from different elements
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+(?=["“(\[]?[A-Z0-9])|(?<=[。！？])\s*|\n+')
+_WORD_RE = re.compile(r'\w+')
+
+
+def split_sentences(text):
+    return [sentence.strip() for sentence in _SENTENCE_SPLIT_RE.split(text) if sentence and sentence.strip()]
+
+
+def _content_words(text):
+    return {word for word in _WORD_RE.findall(text.lower()) if word not in STOPWORDS and len(word) > 1}
+
+
+def score_sentence(sentence, index, title_words):
+    """Salience of one sentence: title overlap, feature keywords and an early-position bonus."""
+    words = _WORD_RE.findall(sentence.lower())
+    if len(words) < 4:
+        # Headings, bylines, navigation items
+        return 0.0
+    unique = set(words)
+    score = 1.0 / (1 + index / 3)
+    if title_words:
+        score += 3.0 * len(unique & title_words) / len(title_words)
+    score += 0.5 * min(4, len(unique & FEATURE_KEYWORDS))
+    score -= 1.0 * len(unique & BOILERPLATE_WORDS)
+    return score
+
+
+def _cut(text, max_chars):
+    """First max_chars characters of a single sentence, ending at a word boundary where there is one."""
+    if not max_chars or len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    if text[max_chars].isspace():
+        return cut.rstrip()
+    space = cut.rfind(' ')
+    return cut[:space].rstrip() if space > 0 else cut
+
+
+def condense(text, title='', token_budget=None, max_chars=None):
+    """
+    Shrinks article text to the token budget and character cap by keeping its most informative sentences.
+
+    Sentences are scored with score_sentence and the best ones are packed,
+    highest score first, while both the token budget and max_chars
+    (ANALYSIS_MAX_CHARS) allow; they are returned in their original order,
+    so lower-ranked sentences are the ones dropped. Text within both limits
+    is returned unchanged, so condensing twice is harmless.
+    """
+    token_budget = ANALYSIS_TOKEN_BUDGET if token_budget is None else token_budget
+    max_chars = ANALYSIS_MAX_CHARS if max_chars is None else max_chars
+    if not text or ((not max_chars or len(text) <= max_chars) and
+                    (not token_budget or html_parser.estimate_tokens(text) <= token_budget)):
+        return text
+
+    sentences = split_sentences(text)
+    title_words = _content_words(title or '')
+    ranked = sorted(((score_sentence(sentence, index, title_words), index) for index, sentence in enumerate(sentences)),
+                    key=lambda pair: (-pair[0], pair[1]))
+    chosen = []
+    used = 0
+    chars = 0
+    for score, index in ranked:
+        tokens = html_parser.estimate_tokens(sentences[index])
+        length = len(sentences[index]) + (1 if chosen else 0)
+        if (not token_budget or used + tokens <= token_budget) and (not max_chars or chars + length <= max_chars):
+            chosen.append(index)
+            used += tokens
+            chars += length
+        if (token_budget and token_budget - used < 4) or (max_chars and max_chars - chars < 20):
+            break
+    if not chosen:
+        # A single sentence longer than the limits: keep its beginning
+        best = sentences[ranked[0][1]]
+        return _cut(html_parser.truncate_tokens(best, token_budget) if token_budget else best, max_chars)
+    return ' '.join(sentences[index] for index in sorted(chosen))
@@ -0,0 +1,75 @@
+import threading
+import uuid
+from collections import deque
+from itertools import islice
+
+
+class EventHub:
+    """
+    Broadcasts events to any number of readers.
+
+    Events are kept in one bounded ring buffer and numbered from 1. Readers
+    hold no queue of their own, only the id of the last event they have
+    seen (an SSE client's Last-Event-ID), so memory stays at `size` events
+    however many readers there are or however long a run lasts. A reader
+    that falls more than `size` events behind skips the oldest ones.
+
+    Ids given to clients are "<epoch>-<n>" (format_id); the epoch is new for
+    every hub, so an id from before a server restart is recognised as such
+    (parse_id) instead of being compared with this process's numbers.
+    """
+
+    def __init__(self, size=1000):
+        self.epoch = uuid.uuid4().hex[:12]
+        self._events = deque(maxlen=max(1, size))
+        self._last_id = 0
+        self._condition = threading.Condition()
+
+    @property
+    def last_id(self):
+        with self._condition:
+            return self._last_id
+
+    def publish(self, data):
+        """Appends an event and wakes the waiting readers; returns its id."""
+        with self._condition:
+            self._last_id += 1
+            self._events.append((self._last_id, data))
+            self._condition.notify_all()
+            return self._last_id
+
+    def format_id(self, event_id):
+        """Client-facing id of an event: "<epoch>-<n>"."""
+        return f"{self.epoch}-{event_id}"
+
+    def parse_id(self, value):
+        """
+        Event number of a client-facing id.
+
+        Returns:
+            n for an id of this hub, 0 (replay everything still buffered) for
+            one from another epoch, None for an empty or malformed value
+        """
+        epoch, _, number = (value or '').rpartition('-')
+        if not epoch or not number.isdigit():
+            return None
+        if epoch != self.epoch:
+            return 0
+        return min(int(number), self.last_id)
+
+    def read(self, after_id, timeout=None):
+        """
+        Events published after after_id, waiting up to timeout seconds for one.
+
+        Returns:
+            (list of (id, data), number of events after after_id already
+            dropped from the buffer)
+        """
+        with self._condition:
+            if self._last_id <= after_id:
+                self._condition.wait(timeout)
+            if not self._events:
+                return [], 0
+            first_id = self._events[0][0]
+            start = max(0, after_id + 1 - first_id)
+            return list(islice(self._events, start, None)), max(0, first_id - after_id - 1)
@@ -1,30 +1,28 @@
 #!/usr/bin/env python3
 
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
 import re
 
+import html_parser
+import http_client
+
 def extract_grab_articles(limit=10):
     """提取Grab的最新文章信息"""
     
     url = 'https://www.grab.com/sg/press/'
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
 
     try:
         print(f"正在获取Grab最新文章...")
-        response = requests.get(url, headers=headers, timeout=15)
+        response = http_client.get(url, profile='grab')
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = html_parser.make_soup(response.content)
         
         # 查找文章容器
         articles = []
         
         # 根据之前分析，文章在panel-article类中
-        article_panels = soup.find_all('article', class_=lambda x: x and 'panel-article' in x)
+        article_panels = soup.find_all('article', class_=html_parser.PANEL_ARTICLE_CLASS)
         
         print(f"找到 {len(article_panels)} 个文章面板")
         
@@ -0,0 +1,213 @@
+import io
+import os
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import http_client
+import listing_cache
+import url_canon
+
+# Ignore feed / sitemap entries older than this many days
+FEED_LOOKBACK_DAYS = int(os.environ.get('FEED_LOOKBACK_DAYS', '90'))
+# How many child sitemaps of a sitemap index are followed
+SITEMAP_MAX_CHILDREN = int(os.environ.get('SITEMAP_MAX_CHILDREN', '5'))
+
+
+def _local_name(tag):
+    """Strips the XML namespace from a tag name."""
+    return tag.rsplit('}', 1)[-1].lower() if isinstance(tag, str) else ''
+
+
+def _child_text(element, name):
+    for child in element:
+        if _local_name(child.tag) == name:
+            return (child.text or '').strip()
+    return ''
+
+
+def parse_feed_date(text):
+    """Parses RFC 822 (RSS) or ISO 8601 (Atom, sitemap) dates into a naive local datetime."""
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        parsed = parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        parsed = None
+    if parsed is None:
+        try:
+            parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def _title_from_url(url):
+    """Sitemaps carry no titles, so build one from the URL slug."""
+    slug = [part for part in urlsplit(url).path.split('/') if part]
+    return slug[-1].replace('-', ' ').replace('_', ' ').title() if slug else url
+
+
+def _make_article(url, title, published, category, description, source):
+    return {
+        'url': url,
+        'title': title or _title_from_url(url),
+        'publish_date': published,  # None when the entry has no date
+        'original_date_text': published.strftime('%d %b %Y') if published else 'Unknown',
+        'category': category or 'News',
+        'description': re.sub(r'<[^>]+>', '', description or '').strip()[:300] or title or '',
+        'source': source,
+    }
+
+
+def iter_xml_entries(content, since=None):
+    """
+    Streams entries out of an RSS, Atom or sitemap document.
+
+    Elements are cleared as soon as they have been read, so memory stays flat
+    for large sitemaps. RSS and Atom feeds are newest-first, so parsing stops
+    at the first item older than ``since``. A feed only lists recent items, so
+    undated ones are kept; a sitemap lists the whole site, so with ``since``
+    its undated entries are skipped rather than taken for new ones.
+
+    Yields:
+        ('article', article_dict) or ('sitemap', child_sitemap_url)
+    """
+    for _, element in ET.iterparse(io.BytesIO(content), events=('end',)):
+        name = _local_name(element.tag)
+
+        if name == 'item':  # RSS 2.0
+            published = parse_feed_date(_child_text(element, 'pubdate'))
+            if since and published and published < since:
+                return
+            url = _child_text(element, 'link')
+            if url:
+                yield 'article', _make_article(url, _child_text(element, 'title'), published,
+                                               _child_text(element, 'category'),
+                                               _child_text(element, 'description'), 'rss')
+            element.clear()
+
+        elif name == 'entry':  # Atom
+            published = parse_feed_date(_child_text(element, 'published') or _child_text(element, 'updated'))
+            if since and published and published < since:
+                return
+            url = ''
+            category = ''
+            for child in element:
+                child_name = _local_name(child.tag)
+                if child_name == 'link' and child.get('rel', 'alternate') == 'alternate' and not url:
+                    url = child.get('href', '')
+                elif child_name == 'category' and not category:
+                    category = child.get('term', '')
+            if url:
+                yield 'article', _make_article(url, _child_text(element, 'title'), published, category,
+                                               _child_text(element, 'summary'), 'atom')
+            element.clear()
+
+        elif name == 'url':  # sitemap <urlset>
+            published = parse_feed_date(_child_text(element, 'lastmod'))
+            url = _child_text(element, 'loc')
+            if url and (not since or (published and published >= since)):
+                yield 'article', _make_article(url, '', published, '', '', 'sitemap')
+            element.clear()
+
+        elif name == 'sitemap':  # sitemap index
+            lastmod = parse_feed_date(_child_text(element, 'lastmod'))
+            url = _child_text(element, 'loc')
+            if url and not (since and lastmod and lastmod < since):
+                yield 'sitemap', url
+            element.clear()
+
+
+def _fetch_source(url, since, profile=None):
+    """Fetches one feed / sitemap (revalidating with a conditional GET) and returns (articles, child_sitemaps)."""
+    cached = listing_cache.get_entry(url)
+    response = http_client.get(url, profile=profile, cache_ttl=0,
+                               headers=listing_cache.conditional_headers(cached))
+    if response.status_code == 304 and cached:
+        print(f"♻️  {url} not modified (304), reusing cached entries")
+        articles, _ = listing_cache.cached_page(cached)
+        articles = [a for a in articles if not since or not a['publish_date'] or a['publish_date'] >= since]
+        return articles, listing_cache.cached_children(cached)
+    response.raise_for_status()
+
+    articles = []
+    children = []
+    for kind, value in iter_xml_entries(response.content, since):
+        if kind == 'article':
+            articles.append(value)
+        else:
+            children.append(value)
+    listing_cache.store(url, response, articles, children=children)
+    return articles, children
+
+
+def discover_articles(competitor_config, known_urls=None, since=None):
+    """
+    Discovers new article URLs from a competitor's declared feeds and sitemaps.
+
+    Args:
+        competitor_config: A COMPETITORS entry; uses its 'feeds', 'sitemaps',
+            optional 'sitemap_filter' (article URL substring),
+            'sitemap_child_filter' (sitemap index child substring) and 'header_profile'
+        known_urls: Already processed URLs to leave out
+        since: Skip entries older than this datetime (default FEED_LOOKBACK_DAYS ago)
+
+    Returns:
+        (urls, articles) newest first, or None when no source is declared or
+        every source failed, in which case the caller should scrape the HTML
+        listing instead
+    """
+    feeds = competitor_config.get('feeds') or []
+    sitemaps = competitor_config.get('sitemaps') or []
+    if not feeds and not sitemaps:
+        return None
+
+    known_urls = known_urls if known_urls is not None else set()
+    since = since or datetime.now() - timedelta(days=FEED_LOOKBACK_DAYS)
+    url_filter = competitor_config.get('sitemap_filter')
+    child_filter = competitor_config.get('sitemap_child_filter')
+    profile = competitor_config.get('header_profile')
+
+    articles = {}
+    succeeded = 0
+    pending = [(url, True) for url in feeds] + [(url, False) for url in sitemaps]
+    children_followed = 0
+
+    while pending:
+        source_url, is_feed = pending.pop(0)
+        print(f"📡 Reading {'feed' if is_feed else 'sitemap'}: {source_url}")
+        try:
+            found, children = _fetch_source(source_url, since, profile)
+        except Exception as e:
+            print(f"  ⚠️  Could not read {source_url}: {e}")
+            continue
+        succeeded += 1
+
+        for child in children:
+            if children_followed < SITEMAP_MAX_CHILDREN and (not child_filter or child_filter in child):
+                pending.append((child, False))
+                children_followed += 1
+
+        for article in found:
+            url = url_canon.canonicalize_url(article['url'], source_url)
+            if not url or (not is_feed and url_filter and url_filter not in url):
+                continue
+            key = url_canon.dedup_key(url)
+            if url in known_urls or key in articles:
+                continue
+            articles[key] = dict(article, url=url)
+        print(f"  ✓ {len(found)} entries, {len(articles)} new so far")
+
+    if not succeeded:
+        print("⚠️  No feed or sitemap could be read, falling back to HTML listing")
+        return None
+
+    # Undated feed items go after every dated article
+    ordered = sorted(articles.values(), key=lambda a: a['publish_date'] or datetime.min, reverse=True)
+    return [article['url'] for article in ordered], ordered
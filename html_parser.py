@@ -0,0 +1,499 @@
+import codecs
+import os
+import re
+from html import unescape
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401  (only needed as a BeautifulSoup tree builder)
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    HAS_SELECTOLAX = False
+
+# Parser backend: 'auto' picks the fastest installed one
+# 'selectolax' (lexbor engine) > 'lxml' > 'html.parser' (pure Python, always available)
+HTML_PARSER_BACKEND = os.environ.get('HTML_PARSER_BACKEND', 'auto').lower()
+
+# Tags whose text makes up an article body
+ARTICLE_TEXT_TAGS = ['p', 'h1', 'h2', 'h3', 'li']
+# Elements whose text is never page text; removed before any text is taken,
+# since backends disagree on whether get_text()/text() includes them
+SKIPPED_TEXT_TAGS = {'script', 'style', 'noscript', 'template'}
+
+# Class matchers for the Grab listing, built once. A plain class name is
+# compared against each class of a tag, so no per-candidate str() is needed.
+BLOG_LINK_CLASS = 'blogHyperlink'
+PANEL_ARTICLE_CLASS = 'panel-article'
+# Only the a.blogHyperlink subtrees (which hold the article panels) are built
+BLOG_LINK_STRAINER = SoupStrainer('a', class_=BLOG_LINK_CLASS)
+
+# <link>/<a> start tags carrying a rel attribute, for the rel="next" lookup on strained parses
+_REL_TAG_RE = re.compile(r'<(?:link|a)(?:\s[^>]*?)?\srel\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))[^>]*>', re.I)
+_HREF_ATTR_RE = re.compile(r'\shref\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))', re.I)
+
+# Where a listing description stops when it has to be rebuilt from siblings
+PARAGRAPH_BOUNDARY_TAGS = {'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+
+def available_backends():
+    """Backends that can run in this environment, slowest first."""
+    backends = ['html.parser']
+    if HAS_LXML:
+        backends.append('lxml')
+    if HAS_SELECTOLAX:
+        backends.append('selectolax')
+    return backends
+
+
+def resolve_backend(backend=None):
+    """Maps a requested backend (or the configured default) to an installed one."""
+    backend = (backend or HTML_PARSER_BACKEND).lower()
+    available = available_backends()
+    if backend == 'auto':
+        return available[-1]
+    if backend not in available:
+        print(f"Warning: HTML parser backend '{backend}' is not installed, using {available[-1]}")
+        return available[-1]
+    return backend
+
+
+def soup_builder(backend=None):
+    """BeautifulSoup tree builder for a backend; selectolax has no builder, so it maps to the fastest one."""
+    backend = resolve_backend(backend)
+    if backend == 'selectolax':
+        return 'lxml' if HAS_LXML else 'html.parser'
+    return backend
+
+
+def make_soup(markup, backend=None, parse_only=None):
+    """
+    Builds a BeautifulSoup tree with the configured backend.
+
+    Used by parse sites with free-form navigation (generic listings, page
+    analysis scripts) that are not worth porting to every engine.
+    """
+    return BeautifulSoup(markup, soup_builder(backend), parse_only=parse_only)
+
+
+# --- Grab press listing ----------------------------------------------------
+
+def _grab_panel_fields(title, date_text, category, description, url):
+    return {
+        'url': url,
+        'title': title or "Unknown Title",
+        'date_text': date_text,
+        'category': category.replace('**', '').strip() if category else "Others",
+        'description': description,
+    }
+
+
+def strip_non_text(soup):
+    """Removes SKIPPED_TEXT_TAGS elements from a BeautifulSoup tree (in place) and returns it."""
+    for tag in soup.find_all(list(SKIPPED_TEXT_TAGS)):
+        tag.decompose()
+    return soup
+
+
+def _soup_paragraph_text(node):
+    """
+    Text of the first <p> under node.
+
+    html.parser keeps block elements such as <li> inside an open <p>, while
+    lxml and lexbor follow HTML5 and close the paragraph first, leaving it
+    empty. In that case the siblings up to the next paragraph or heading are
+    used, which gives the same text on every backend.
+    """
+    paragraph = node.find('p')
+    if not paragraph:
+        return ''
+    text = paragraph.get_text(strip=True)
+    if text:
+        return text
+    parts = []
+    for sibling in paragraph.next_siblings:
+        if getattr(sibling, 'name', None) in PARAGRAPH_BOUNDARY_TAGS:
+            break
+        parts.append(sibling.get_text(strip=True) if hasattr(sibling, 'get_text') else sibling.strip())
+    return ''.join(parts)
+
+
+def _find_next_href(markup):
+    """
+    Scans the raw markup for the first <link>/<a> with rel="next" and an href.
+
+    A strained parse never builds the <head>, so the tag is looked up with a
+    precompiled pattern instead of a second parse.
+    """
+    if isinstance(markup, bytes):
+        markup = markup.decode('utf-8', errors='replace')
+    for match in _REL_TAG_RE.finditer(markup):
+        rel = next(group for group in match.groups() if group is not None)
+        if 'next' not in rel.lower().split():
+            continue
+        href = _HREF_ATTR_RE.search(match.group(0))
+        if href:
+            return unescape(next(group for group in href.groups() if group is not None))
+    return None
+
+
+def _parse_grab_listing_soup(markup, limit, backend, partial=True):
+    # Partial parsing skips everything outside the blog links: navigation,
+    # scripts and footers never become tree nodes
+    soup = strip_non_text(make_soup(markup, backend, parse_only=BLOG_LINK_STRAINER if partial else None))
+    blog_links = soup.find_all('a', class_=BLOG_LINK_CLASS)
+    panels = []
+    for link in blog_links:
+        if limit is not None and len(panels) >= limit:
+            break
+        article_url = link.get('href')
+        if not article_url or article_url == '#':
+            continue
+        article_panel = link.find('article', class_=PANEL_ARTICLE_CLASS)
+        if not article_panel:
+            continue
+        title_elem = article_panel.find('h2') or article_panel.find(['h1', 'h3', 'h4', 'h5'])
+        date_elem = article_panel.find(class_='post-date')
+        cat_elem = article_panel.find(class_='post-cat')
+        panels.append(_grab_panel_fields(
+            title_elem.get_text(strip=True) if title_elem else '',
+            date_elem.get_text(strip=True) if date_elem else '',
+            cat_elem.get_text(strip=True) if cat_elem else '',
+            _soup_paragraph_text(article_panel),
+            article_url))
+
+    if partial:
+        next_href = _find_next_href(markup)
+    else:
+        next_href = None
+        for tag in soup.find_all(['link', 'a'], rel=True, href=True):
+            rel = tag.get('rel')
+            rel = rel.split() if isinstance(rel, str) else rel
+            if 'next' in [r.lower() for r in rel]:
+                next_href = tag['href']
+                break
+    return panels, len({link.get('href') for link in blog_links}), next_href
+
+
+def _first(node, *selectors):
+    for selector in selectors:
+        found = node.css_first(selector)
+        if found is not None:
+            return found
+    return None
+
+
+def _lexbor_paragraph_text(node):
+    """selectolax counterpart of _soup_paragraph_text."""
+    paragraph = node.css_first('p')
+    if paragraph is None:
+        return ''
+    text = paragraph.text(strip=True)
+    if text:
+        return text
+    parts = []
+    sibling = paragraph.next
+    while sibling is not None and sibling.tag not in PARAGRAPH_BOUNDARY_TAGS:
+        parts.append(sibling.text(strip=True))
+        sibling = sibling.next
+    return ''.join(parts)
+
+
+def _parse_grab_listing_selectolax(html, limit):
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(list(SKIPPED_TEXT_TAGS))
+    blog_links = tree.css('a.blogHyperlink')
+    panels = []
+    for link in blog_links:
+        if limit is not None and len(panels) >= limit:
+            break
+        article_url = link.attributes.get('href')
+        if not article_url or article_url == '#':
+            continue
+        article_panel = link.css_first('article.panel-article')
+        if article_panel is None:
+            continue
+        title_elem = _first(article_panel, 'h2', 'h1, h3, h4, h5')
+        date_elem = article_panel.css_first('.post-date')
+        cat_elem = article_panel.css_first('.post-cat')
+        panels.append(_grab_panel_fields(
+            title_elem.text(strip=True) if title_elem else '',
+            date_elem.text(strip=True) if date_elem else '',
+            cat_elem.text(strip=True) if cat_elem else '',
+            _lexbor_paragraph_text(article_panel),
+            article_url))
+
+    next_href = None
+    for tag in tree.css('link[rel][href], a[rel][href]'):
+        if 'next' in (tag.attributes.get('rel') or '').lower().split():
+            next_href = tag.attributes.get('href')
+            break
+    # lexbor clones <a> while rebuilding formatting elements, so count distinct links
+    return panels, len({link.attributes.get('href') for link in blog_links}), next_href
+
+
+def parse_grab_listing(html, limit=None, backend=None, partial=True):
+    """
+    Extracts the article panels from a Grab press listing page.
+
+    Every backend returns identical output for the same page. With partial
+    (the default) the BeautifulSoup backends only build the a.blogHyperlink
+    subtrees; partial=False builds the whole document (for benchmarking).
+
+    Returns:
+        (panels, link_count, next_href): panel dicts with url, title,
+        date_text, category and description; the number of distinct
+        blogHyperlink targets on the page; and the raw href of the rel="next" link (or None)
+    """
+    if resolve_backend(backend) == 'selectolax':
+        return _parse_grab_listing_selectolax(html, limit)
+    return _parse_grab_listing_soup(html, limit, backend, partial)
+
+
+# --- Article pages ---------------------------------------------------------
+
+# Article bodies are streamed through an incremental tokenizer (html.parser),
+# so reading stops at the text budget; the tree-building backends need the
+# whole document, so HTML_PARSER_BACKEND only applies to listing pages.
+
+# Scripts written without spaces between words (Thai, CJK, kana, Hangul):
+# model tokenizers split them into about one token per character
+_UNSPACED_SCRIPTS = '\u0e00-\u0e7f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff'
+_TOKEN_RE = re.compile(rf"[{_UNSPACED_SCRIPTS}]|[^\W{_UNSPACED_SCRIPTS}]+|[^\w\s]")
+
+
+def estimate_tokens(text):
+    """Rough LLM token count: one token per word, punctuation mark, or Thai/CJK character."""
+    return len(_TOKEN_RE.findall(text))
+
+
+def truncate_tokens(text, max_tokens):
+    """Cuts text after its first max_tokens tokens (as counted by estimate_tokens)."""
+    for count, match in enumerate(_TOKEN_RE.finditer(text), 1):
+        if count == max_tokens:
+            return text[:match.end()]
+    return text
+
+
+def _container_rank(tag, attrs):
+    """Preference of a content container: div.entry-content, then article, then main (0 = not one)."""
+    if tag == 'div':
+        classes = (dict(attrs).get('class') or '').split()
+        return 3 if 'entry-content' in classes else 0
+    return {'article': 2, 'main': 1}.get(tag, 0)
+
+
+class _ArticleBlockParser(HTMLParser):
+    """
+    Incremental tokenizer that collects the text blocks of the article body.
+
+    Blocks inside div.entry-content are released as soon as they close.
+    Blocks from an <article> or <main> are held back, because a div.entry-content
+    later in the page would replace them; they are released once they fill the
+    budget on their own or the document ends.
+    """
+
+    def __init__(self, max_chars=None, max_tokens=None):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.max_tokens = max_tokens
+        self.ready = []
+        self.finished = False
+        self.found_body = False
+        self._pending = []
+        self._pending_chars = 0
+        self._pending_tokens = 0
+        self._container = None  # [tag, rank, depth]
+        self._best_rank = 0
+        self._block = None  # [tag, depth, parts]
+        self._skip_depth = 0
+        self._in_body = False
+        self._body_parts = []
+        self._body_chars = 0
+        self._data = []
+
+    def handle_starttag(self, tag, attrs):
+        self._commit_data()
+        if tag in SKIPPED_TEXT_TAGS:
+            self._skip_depth += 1
+            return
+        if tag == 'body':
+            self._in_body = True
+
+        container = self._container
+        if container and tag == container[0]:
+            container[2] += 1
+        rank = _container_rank(tag, attrs)
+        if rank > self._best_rank:
+            # A preferred container replaces whatever was collected so far
+            self._block = None
+            self._pending = []
+            self._pending_chars = self._pending_tokens = 0
+            self._container = [tag, rank, 1]
+            self._best_rank = rank
+            self.found_body = True
+            return
+
+        if self._container and tag in ARTICLE_TEXT_TAGS:
+            block = self._block
+            if block is None:
+                self._block = [tag, 1, []]
+            elif block[0] == 'p' and tag != 'p':
+                # <p> cannot hold block elements, so it ends here
+                self._flush_block()
+                self._block = [tag, 1, []]
+            elif tag == block[0]:
+                if tag == 'p':
+                    self._flush_block()
+                    self._block = [tag, 1, []]
+                else:
+                    block[1] += 1
+
+    def handle_endtag(self, tag):
+        self._commit_data()
+        if tag in SKIPPED_TEXT_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        block = self._block
+        if block and tag == block[0]:
+            block[1] -= 1
+            if block[1] == 0:
+                self._flush_block()
+        container = self._container
+        if container and tag == container[0]:
+            container[2] -= 1
+            if container[2] == 0:
+                self._flush_block()
+                self._container = None
+                if container[1] == 3:
+                    self.finished = True
+
+    def handle_data(self, data):
+        # The tokenizer may split one text node across feed() calls
+        self._data.append(data)
+
+    def _commit_data(self):
+        """Routes the text node that ended at the current tag."""
+        if not self._data:
+            return
+        text = ''.join(self._data).strip()
+        self._data = []
+        if self._skip_depth or not text:
+            return
+        if self._block:
+            self._block[2].append(text)
+        elif self._in_body and not self.found_body and \
+                (not self.max_chars or self._body_chars < self.max_chars):
+            self._body_parts.append(text)
+            self._body_chars += len(text) + 1
+
+    def close(self):
+        super().close()
+        self._commit_data()
+        self._flush_block()
+
+    def _flush_block(self):
+        block, self._block = self._block, None
+        if not block or not block[2]:
+            return
+        text = ' '.join(block[2])
+        if self._container and self._container[1] == 3:
+            self.ready.append(text)
+            return
+        self._pending.append(text)
+        self._pending_chars += len(text) + 1
+        if self.max_tokens:
+            self._pending_tokens += estimate_tokens(text)
+        if (self.max_chars and self._pending_chars >= self.max_chars) or \
+                (self.max_tokens and self._pending_tokens >= self.max_tokens):
+            self.release_pending()
+
+    def release_pending(self):
+        self.ready.extend(self._pending)
+        self._pending = []
+        self._pending_chars = self._pending_tokens = 0
+
+    def body_text(self):
+        return ' '.join(self._body_parts)
+
+
+def iter_article_blocks(chunks, max_chars=None, max_tokens=None, encoding='utf-8', state=None):
+    """
+    Yields the text blocks (p, h1-h3, li) of an article body in document order,
+    reading ``chunks`` only until the budget is spent.
+
+    Takes the blocks of the preferred container (div.entry-content, then
+    article, then main), or the whole <body> text when there is none.
+
+    Args:
+        chunks: Iterable of HTML bytes/str pieces, e.g. http_client.iter_body()
+        max_chars: Stop once the joined blocks reach this length (the last
+            block is cut to fit); None or 0 means no limit
+        max_tokens: Stop once this many estimate_tokens() tokens were yielded
+        encoding: Used to decode byte chunks (the response charset)
+        state: Optional dict that receives 'found_body' (False when the
+            whole <body> text was used)
+    """
+    parser = _ArticleBlockParser(max_chars, max_tokens)
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    used_chars = 0
+    used_tokens = 0
+
+    def take(blocks):
+        nonlocal used_chars, used_tokens
+        for block in blocks:
+            if used_chars:
+                block = ' ' + block
+            if max_chars and used_chars + len(block) >= max_chars:
+                yield block[:max_chars - used_chars]
+                used_chars = max_chars
+                return
+            used_chars += len(block)
+            yield block
+            if max_tokens:
+                used_tokens += estimate_tokens(block)
+                if used_tokens >= max_tokens:
+                    return
+
+    def spent():
+        return (max_chars and used_chars >= max_chars) or (max_tokens and used_tokens >= max_tokens)
+
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk) if isinstance(chunk, bytes) else chunk)
+        ready, parser.ready = parser.ready, []
+        yield from take(ready)
+        if spent() or parser.finished:
+            break
+    else:
+        parser.feed(decoder.decode(b'', final=True))
+        parser.close()
+
+    if not spent():
+        parser.release_pending()
+        ready, parser.ready = parser.ready, []
+        yield from take(ready)
+        if not parser.found_body:
+            yield from take([parser.body_text()] if parser.body_text() else [])
+    if state is not None:
+        state['found_body'] = parser.found_body
+
+
+def stream_article_text(chunks, max_chars=None, max_tokens=None, encoding='utf-8'):
+    """
+    Extracts the readable text of an article page, reading it only until the budget is spent.
+
+    Returns:
+        (text, found_body): the joined article body blocks, and False when
+        no div.entry-content / article / main was found and the whole
+        <body> text was used instead
+    """
+    state = {}
+    text = ''.join(iter_article_blocks(chunks, max_chars, max_tokens, encoding, state))
+    return text, state.get('found_body', False)
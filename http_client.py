@@ -0,0 +1,245 @@
+import codecs
+import os
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import rate_limiter
+import response_cache
+
+# Connection pool configuration
+# HTTP_POOL_CONNECTIONS: how many hosts keep a pool of their own
+# HTTP_POOL_MAXSIZE: keep-alive connections kept open per host
+HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', '10'))
+HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', '8'))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', '5'))
+HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', '15'))
+# Chunk size for streamed bodies (iter_body)
+HTTP_STREAM_CHUNK_SIZE = int(os.environ.get('HTTP_STREAM_CHUNK_SIZE', '16384'))
+
+# charset parameter of a Content-Type header
+_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.I)
+
+MAC_CHROME_UA = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+WINDOWS_CHROME_UA = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Request headers per competitor site
+HEADER_PROFILES = {
+    'default': {
+        'User-Agent': 'Mozilla/5.0',
+    },
+    'grab': {
+        'User-Agent': MAC_CHROME_UA,
+    },
+    'square': {
+        'User-Agent': WINDOWS_CHROME_UA,
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Accept-Encoding': 'gzip, deflate',
+        'Upgrade-Insecure-Requests': '1',
+    },
+}
+
+# Header profile used when the caller does not name one
+HOST_PROFILES = {
+    'www.grab.com': 'grab',
+    'grab.com': 'grab',
+    'squareup.com': 'square',
+    'www.squareup.com': 'square',
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Returns the process-wide session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                # One pool per host, each keeping up to HTTP_POOL_MAXSIZE
+                # keep-alive connections; proxies from the environment
+                # (see setup_proxy) get their own pooled manager per proxy.
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS,
+                                      pool_maxsize=HTTP_POOL_MAXSIZE)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
+
+def profile_for_url(url: str) -> str:
+    """Picks the header profile for a URL from its host name."""
+    host = (urlsplit(url).hostname or '').lower()
+    return HOST_PROFILES.get(host, 'default')
+
+
+def get(url: str, profile: str = None, timeout=None, headers=None, cache_ttl=None, **kwargs) -> requests.Response:
+    """
+    Performs a GET through the shared pooled session and the response cache.
+
+    Args:
+        url: The URL to fetch
+        profile: Name of a HEADER_PROFILES entry; inferred from the host if omitted
+        timeout: Seconds, or a (connect, read) tuple; defaults to the configured timeouts
+        headers: Extra headers merged over the profile's headers
+        cache_ttl: Accept a cached copy up to this many seconds old (default
+            HTTP_CACHE_TTL); 0 always goes to the network but still records
+            the response for replay
+
+    Returns:
+        The requests.Response (raise_for_status is left to the caller)
+
+    Raises:
+        response_cache.ReplayMiss: in replay mode, when the URL was never cached
+    """
+    mode = response_cache.HTTP_CACHE_MODE
+    if mode == 'replay':
+        cached = response_cache.lookup(url)
+        if cached is None:
+            raise response_cache.ReplayMiss(f"Not in response cache (replay mode): {url}")
+        return cached
+
+    if mode == 'on':
+        ttl = response_cache.HTTP_CACHE_TTL if cache_ttl is None else cache_ttl
+        # Conditional requests are the caller revalidating, so skip the cache
+        if ttl > 0 and not headers:
+            cached = response_cache.lookup(url, max_age=ttl)
+            if cached is not None:
+                return cached
+
+    request_headers = dict(HEADER_PROFILES.get(profile or profile_for_url(url), HEADER_PROFILES['default']))
+    if headers:
+        request_headers.update(headers)
+    if timeout is None:
+        timeout = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+    response = _send_with_retries(url, request_headers, timeout, **kwargs)
+
+    # A streamed body has not been read yet; iter_body records it once complete
+    if mode == 'on' and response.status_code == 200 and not kwargs.get('stream'):
+        try:
+            response_cache.store(url, response)
+        except Exception as e:
+            print(f"Warning: Could not write response cache for {url}: {e}")
+    return response
+
+
+def response_charset(headers, default='utf-8'):
+    """Charset named in the Content-Type header, or default when it names none (or one Python does not know)."""
+    match = _CHARSET_RE.search(headers.get('Content-Type') or '')
+    if match:
+        try:
+            return codecs.lookup(match.group(1)).name
+        except LookupError:
+            pass
+    return default
+
+
+def iter_body(url: str, chunk_size=None, info=None, **kwargs):
+    """
+    Streams a response body in chunks, fetched like get() (same session,
+    rate limiter and response cache).
+
+    The body is only downloaded as far as the caller reads: closing the
+    generator early closes the connection. With HTTP_CACHE_MODE=on the body
+    is recorded in the response cache, so one closed early is read to the
+    end first (replay needs the whole page); early stopping saves the
+    download only with the cache off or in replay.
+
+    Args:
+        info: Optional dict that receives 'encoding' (see response_charset)
+            once the response headers are in, i.e. on the first next()
+
+    Raises:
+        requests.HTTPError: for non-2xx responses, before the first chunk
+    """
+    chunk_size = chunk_size or HTTP_STREAM_CHUNK_SIZE
+    response = get(url, stream=True, **kwargs)
+    try:
+        response.raise_for_status()
+        if info is not None:
+            info['encoding'] = response_charset(response.headers)
+        if response.raw is None:
+            # Served from the response cache, the body is already in memory
+            body = response.content
+            for start in range(0, len(body), chunk_size):
+                yield body[start:start + chunk_size]
+            return
+
+        chunks = []
+        stream = response.iter_content(chunk_size)
+        try:
+            for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            # Also runs when the caller closes the generator early
+            if response_cache.HTTP_CACHE_MODE == 'on' and response.status_code == 200:
+                _store_rest(url, response, chunks, stream)
+    finally:
+        response.close()
+
+
+def _store_rest(url, response, chunks, stream):
+    """Reads what the caller left of a streamed body and records the whole body in the response cache."""
+    try:
+        chunks.extend(stream)
+        response_cache.store_body(url, response.status_code, response.headers, b''.join(chunks))
+    except Exception as e:
+        print(f"Warning: Could not write response cache for {url}: {e}")
+
+
+def _send_with_retries(url, headers, timeout, **kwargs):
+    """
+    Sends the request through the host's rate limiter, retrying throttled
+    responses and connection errors with jittered exponential backoff.
+    """
+    limiter = rate_limiter.get_limiter(urlsplit(url).hostname)
+    attempts = rate_limiter.HTTP_MAX_RETRIES + 1
+
+    for attempt in range(attempts):
+        last_attempt = attempt == attempts - 1
+        limiter.acquire()
+        try:
+            response = get_session().get(url, headers=headers, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            # Timeouts usually mean the host is struggling, so slow down too
+            limiter.on_throttle()
+            if last_attempt:
+                raise
+            limiter.on_retry()
+            delay = rate_limiter.backoff_delay(attempt)
+            print(f"  ⏳ {url} failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+
+        if response.status_code in rate_limiter.RETRY_STATUSES:
+            retry_after = rate_limiter.parse_retry_after(response.headers.get('Retry-After'))
+            if response.status_code in rate_limiter.THROTTLE_STATUSES:
+                limiter.on_throttle(retry_after)
+            if not last_attempt:
+                limiter.on_retry()
+                response.close()
+                # The limiter already holds back every caller until Retry-After
+                delay = rate_limiter.backoff_delay(attempt)
+                print(f"  ⏳ {url} returned {response.status_code}, retrying in {max(delay, retry_after or 0):.1f}s")
+                time.sleep(delay)
+                continue
+        else:
+            limiter.on_success(response.elapsed.total_seconds())
+        return response
+
+
+def close():
+    """Closes all pooled connections (e.g. at shutdown)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
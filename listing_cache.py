@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+# Validators (ETag / Last-Modified) and the parsed article list per listing URL
+LISTING_CACHE_FILE = os.environ.get('LISTING_CACHE_FILE', 'listing_cache.json')
+
+_lock = threading.Lock()
+_entries = None
+
+
+def _load():
+    """Loads the cache file once per process."""
+    global _entries
+    if _entries is None:
+        try:
+            if os.path.exists(LISTING_CACHE_FILE):
+                with open(LISTING_CACHE_FILE, 'r', encoding='utf-8') as f:
+                    _entries = json.load(f)
+            else:
+                _entries = {}
+        except Exception as e:
+            print(f"Warning: Could not load listing cache {LISTING_CACHE_FILE}: {e}")
+            _entries = {}
+    return _entries
+
+
+def _save():
+    """Writes the cache file atomically."""
+    tmp_file = f"{LISTING_CACHE_FILE}.tmp"
+    try:
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(_entries, f, ensure_ascii=False)
+        os.replace(tmp_file, LISTING_CACHE_FILE)
+    except Exception as e:
+        print(f"Warning: Could not save listing cache {LISTING_CACHE_FILE}: {e}")
+
+
+def _encode_article(article):
+    encoded = dict(article)
+    if isinstance(encoded.get('publish_date'), datetime):
+        encoded['publish_date'] = {'__datetime__': encoded['publish_date'].isoformat()}
+    return encoded
+
+
+def _decode_article(article):
+    decoded = dict(article)
+    value = decoded.get('publish_date')
+    if isinstance(value, dict) and '__datetime__' in value:
+        decoded['publish_date'] = datetime.fromisoformat(value['__datetime__'])
+    return decoded
+
+
+def get_entry(url: str, limit=None):
+    """
+    Returns the cached entry for a listing URL, or None.
+
+    An entry parsed with a different ``limit`` is ignored, since its article
+    list would not match what the caller asked for.
+    """
+    with _lock:
+        entry = _load().get(url)
+    if entry and entry.get('limit') == limit:
+        return entry
+    return None
+
+
+def conditional_headers(entry) -> dict:
+    """Builds If-None-Match / If-Modified-Since headers from a cached entry."""
+    headers = {}
+    if entry:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+
+def cached_page(entry):
+    """Rebuilds the (articles, next_url) pair stored in an entry."""
+    articles = [_decode_article(article) for article in entry.get('articles', [])]
+    return articles, entry.get('next_url')
+
+
+def cached_children(entry):
+    """Child sitemap URLs stored with a sitemap index entry."""
+    return entry.get('children', [])
+
+
+def store(url: str, response, articles, limit=None, next_url=None, children=None):
+    """
+    Remembers the validators and parsed articles for a listing URL
+    (and, for a sitemap index, the child sitemaps it points to).
+
+    Nothing is stored when the server sent neither an ETag nor a
+    Last-Modified header, because the page could never be revalidated.
+    """
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if not etag and not last_modified:
+        return
+
+    with _lock:
+        _load()[url] = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'limit': limit,
+            'next_url': next_url,
+            'children': children or [],
+            'stored_at': datetime.now().isoformat(),
+            'articles': [_encode_article(article) for article in articles],
+        }
+        _save()
@@ -0,0 +1,99 @@
+import os
+from urllib.parse import urljoin
+
+import url_canon
+
+# Safety cap for catch-up crawls that never reach a known article
+CRAWL_MAX_PAGES = int(os.environ.get('CRAWL_MAX_PAGES', '10'))
+# Upper bound for explicitly requested backfill crawls
+BACKFILL_MAX_PAGES = int(os.environ.get('BACKFILL_MAX_PAGES', '50'))
+
+
+def find_next_page_url(soup, page_url):
+    """
+    Finds the "next page" link of a paginated listing.
+
+    Looks for <link rel="next"> in the head first (WordPress sites such as
+    Grab's press page emit it), then for an <a rel="next"> in the body.
+    """
+    for tag_name in ('link', 'a'):
+        for tag in soup.find_all(tag_name, href=True):
+            rel = tag.get('rel') or []
+            if isinstance(rel, str):
+                rel = rel.split()
+            if 'next' in [r.lower() for r in rel]:
+                return urljoin(page_url, tag['href'])
+    return None
+
+
+def _confirmed(known_urls, url):
+    # Stopping drops every later article, so a Bloom filter hit on a new URL
+    # must not end the crawl: ask a ProcessedSet to check its database
+    confirmed = getattr(known_urls, 'confirmed', None)
+    return confirmed(url) if confirmed else True
+
+
+def crawl_listing(start_url, fetch_page, known_urls=None, max_pages=None, backfill=False):
+    """
+    Walks a newest-first listing page by page.
+
+    In the normal mode the crawl stops at the first article that is already in
+    known_urls: everything after it is older and was seen on an earlier run,
+    so a steady-state run costs exactly one page and a run after downtime
+    keeps going only until it has caught up. A backfill crawl ignores known
+    URLs and reads a fixed number of pages.
+
+    Args:
+        start_url: URL of the first (newest) listing page
+        fetch_page: Callable ``fetch_page(url) -> (articles, next_url)``
+        known_urls: URLs processed on earlier runs (membership checks only;
+            a processed_store.ProcessedSet matches canonical variants too)
+        max_pages: Page budget; defaults to CRAWL_MAX_PAGES
+        backfill: Read max_pages pages without stopping at known URLs
+
+    Returns:
+        (articles, reached_known): article dicts in listing order without
+        duplicates (compared by url_canon.dedup_key), and whether the crawl stopped at an already known URL
+    """
+    if max_pages is None:
+        max_pages = CRAWL_MAX_PAGES
+    max_pages = max(1, min(max_pages, BACKFILL_MAX_PAGES if backfill else CRAWL_MAX_PAGES))
+    known_urls = known_urls if known_urls is not None else set()
+
+    articles = []
+    seen = set()
+    visited = set()
+    page_url = start_url
+    pages = 0
+
+    while page_url and page_url not in visited and pages < max_pages:
+        visited.add(page_url)
+        try:
+            page_articles, next_url = fetch_page(page_url)
+        except Exception as e:
+            # Only the first page is essential; keep what older pages gave us
+            if not pages:
+                raise
+            print(f"  ⚠️  Could not fetch listing page {page_url}: {e}")
+            break
+        pages += 1
+
+        for article in page_articles:
+            url = article['url']
+            if not backfill and url in known_urls and _confirmed(known_urls, url):
+                print(f"  ⏹️  Reached already processed article after {pages} page(s), stopping crawl")
+                return articles, True
+            key = url_canon.dedup_key(url)
+            if key not in seen:
+                seen.add(key)
+                articles.append(article)
+
+        if not page_articles:
+            break
+        page_url = next_url
+        if page_url and pages < max_pages:
+            print(f"  ➡️  Continuing to next listing page: {page_url}")
+
+    if page_url and pages >= max_pages > 1:
+        print(f"  ⚠️  Stopped crawl at the {max_pages}-page limit")
+    return articles, False
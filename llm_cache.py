@@ -0,0 +1,119 @@
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import near_dup
+
+# Two-level cache of model responses: an in-process LRU in front of SQLite
+LLM_CACHE_ENABLED = os.environ.get('LLM_CACHE_ENABLED', '1').lower() not in ('0', 'false', 'no')
+LLM_CACHE_DB = os.environ.get('LLM_CACHE_DB', 'llm_cache.db')
+LLM_CACHE_MEMORY_SIZE = int(os.environ.get('LLM_CACHE_MEMORY_SIZE', '256'))
+
+_lock = threading.Lock()
+_conn = None
+_memory = OrderedDict()  # key -> (prompt_version, response)
+_counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0}
+
+
+def make_key(model, prompt_version, text):
+    """Hash of everything that determines the response."""
+    digest = hashlib.sha256()
+    for part in (model, prompt_version, text):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _connect():
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(LLM_CACHE_DB, check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            prompt_version TEXT NOT NULL,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL)""")
+        _conn.execute("CREATE INDEX IF NOT EXISTS responses_version ON responses(prompt_version)")
+        _conn.commit()
+    return _conn
+
+
+def _remember(key, prompt_version, response):
+    _memory[key] = (prompt_version, response)
+    _memory.move_to_end(key)
+    while len(_memory) > LLM_CACHE_MEMORY_SIZE:
+        _memory.popitem(last=False)
+
+
+def get(model, prompt_version, text):
+    """Returns the cached response for this model, prompt version and (truncated) text, or None."""
+    if not LLM_CACHE_ENABLED:
+        return None
+    key = make_key(model, prompt_version, text)
+    with _lock:
+        entry = _memory.get(key)
+        if entry is not None:
+            _memory.move_to_end(key)
+            _counters['memory_hits'] += 1
+            return entry[1]
+        row = _connect().execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            _counters['misses'] += 1
+            return None
+        _counters['disk_hits'] += 1
+        _remember(key, prompt_version, row[0])
+        return row[0]
+
+
+def put(model, prompt_version, text, response):
+    """Stores a successful response in both levels."""
+    if not LLM_CACHE_ENABLED:
+        return
+    key = make_key(model, prompt_version, text)
+    with _lock:
+        conn = _connect()
+        conn.execute("INSERT OR REPLACE INTO responses (key, model, prompt_version, response, created_at) VALUES (?, ?, ?, ?, ?)",
+                     (key, model, prompt_version, response, time.time()))
+        conn.commit()
+        _remember(key, prompt_version, response)
+        _counters['stores'] += 1
+
+
+def invalidate(prompt_version):
+    """Drops every cached response produced with one prompt version; returns how many."""
+    with _lock:
+        for key in [key for key, (version, _) in _memory.items() if version == prompt_version]:
+            del _memory[key]
+        conn = _connect()
+        removed = conn.execute("DELETE FROM responses WHERE prompt_version = ?", (prompt_version,)).rowcount
+        conn.commit()
+    return removed
+
+
+def stats():
+    with _lock:
+        lookups = _counters['memory_hits'] + _counters['disk_hits'] + _counters['misses']
+        hits = _counters['memory_hits'] + _counters['disk_hits']
+        return dict(_counters, memory_entries=len(_memory),
+                    hit_rate=round(hits / lookups, 3) if lookups else 0.0)
+
+
+if __name__ == "__main__":
+    # python llm_cache.py invalidate <prompt_version>
+    if len(sys.argv) == 3 and sys.argv[1] == 'invalidate':
+        print(f"Removed {invalidate(sys.argv[2])} cached responses for prompt version {sys.argv[2]}")
+        # Near-duplicate matches would otherwise keep serving the old analyses
+        print(f"Removed {near_dup.invalidate(sys.argv[2])} near-duplicate fingerprints for prompt version {sys.argv[2]}")
+    else:
+        with _lock:
+            rows = _connect().execute("SELECT model, prompt_version, COUNT(*) FROM responses "
+                                      "GROUP BY model, prompt_version").fetchall()
+        for model, version, total in rows:
+            print(f"{model} / {version}: {total} cached responses")
+        print("Usage: python llm_cache.py invalidate <prompt_version>")
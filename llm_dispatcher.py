@@ -0,0 +1,240 @@
+import asyncio
+import concurrent.futures
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+
+# Asynchronous dispatch of model requests: up to LLM_MAX_IN_FLIGHT requests
+# are awaited concurrently on one event loop, within per-minute quotas
+LLM_DISPATCH_ENABLED = os.environ.get('LLM_DISPATCH_ENABLED', '1').lower() not in ('0', 'false', 'no')
+LLM_MAX_IN_FLIGHT = int(os.environ.get('LLM_MAX_IN_FLIGHT', '4'))
+LLM_RPM = float(os.environ.get('LLM_RPM', '60'))          # requests per minute (0 = no limit)
+LLM_TPM = float(os.environ.get('LLM_TPM', '0'))           # prompt tokens per minute (0 = no limit)
+# Quota errors (429 / ResourceExhausted) are retried with jittered exponential backoff
+LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', '4'))
+LLM_BACKOFF_BASE = float(os.environ.get('LLM_BACKOFF_BASE', '2'))
+LLM_BACKOFF_MAX = float(os.environ.get('LLM_BACKOFF_MAX', '60'))
+
+# A bucket holds at most this many seconds of quota, so an idle dispatcher
+# can start a short burst at once (10 s of a 60 RPM quota = 10 requests)
+# while a long backlog is still spread evenly over the minute
+LLM_BURST_SECONDS = float(os.environ.get('LLM_BURST_SECONDS', '10'))
+
+
+class TokenBucket:
+    """Per-minute budget refilled continuously; acquire() waits until enough is available."""
+
+    def __init__(self, per_minute, burst_seconds=None):
+        self.rate = per_minute / 60.0
+        burst_seconds = LLM_BURST_SECONDS if burst_seconds is None else burst_seconds
+        self.capacity = max(1.0, self.rate * min(burst_seconds, 60.0))
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    async def acquire(self, amount=1.0):
+        """
+        Takes amount from the bucket; returns the seconds waited.
+
+        An amount larger than the capacity is let through once the bucket is
+        full and leaves it in debt, so later requests pay it back.
+        """
+        needed = min(float(amount), self.capacity)
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            self._refill(now)
+            if self.tokens >= needed:
+                self.tokens -= amount
+                return waited
+            wait = (needed - self.tokens) / self.rate
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def drain(self):
+        """Empties the bucket, e.g. after the server reported the quota exhausted."""
+        self._refill(time.monotonic())
+        self.tokens = 0.0
+
+
+def is_quota_error(error) -> bool:
+    """True for rate limit / quota errors (Gemini raises ResourceExhausted, HTTP 429)."""
+    if getattr(error, 'code', None) == 429 or error.__class__.__name__ in ('ResourceExhausted', 'TooManyRequests'):
+        return True
+    message = str(error).lower()
+    return '429' in message or 'quota' in message or 'rate limit' in message
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter for the given retry attempt (0-based)."""
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt)))
+
+
+class Dispatcher:
+    """
+    Runs model requests on a background event loop.
+
+    ``generate`` is an async callable ``generate(prompt, **options) -> text``. Callers
+    from any thread use submit() (returns a concurrent.futures.Future) or
+    the blocking generate(). Waiting requests are started highest priority
+    first (callers pass the article's publish timestamp, so the most recent
+    articles go first), at most max_in_flight at a time and only while the
+    requests-per-minute and tokens-per-minute buckets allow. Quota errors
+    drain the buckets, so every request slows down, and are retried with
+    backoff; other errors are returned to the caller.
+    """
+
+    def __init__(self, generate, max_in_flight=None, rpm=None, tpm=None, max_retries=None):
+        self._generate = generate
+        self.max_in_flight = max(1, int(LLM_MAX_IN_FLIGHT if max_in_flight is None else max_in_flight))
+        rpm = LLM_RPM if rpm is None else rpm
+        tpm = LLM_TPM if tpm is None else tpm
+        self.max_retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+        self._rpm = TokenBucket(rpm) if rpm else None
+        self._tpm = TokenBucket(tpm) if tpm else None
+        self._heap = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._loop = None
+        self._wakeup = None
+        self._counters = {'submitted': 0, 'completed': 0, 'failed': 0, 'retries': 0, 'quota_errors': 0,
+                          'in_flight': 0, 'peak_in_flight': 0, 'quota_wait_seconds': 0.0}
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._loop is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            started = threading.Event()
+            thread = threading.Thread(target=self._run_loop, args=(started,), name="llm-dispatcher")
+            thread.daemon = True
+            thread.start()
+        started.wait()
+
+    def _run_loop(self, started):
+        asyncio.set_event_loop(self._loop)
+        self._wakeup = asyncio.Event()
+        for n in range(self.max_in_flight):
+            self._loop.create_task(self._worker())
+        self._loop.call_soon(started.set)
+        self._loop.run_forever()
+
+    def run(self, coroutine_function, *args):
+        """Runs a coroutine on the dispatcher's event loop and waits for its result (e.g. to build loop-bound clients)."""
+        self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(coroutine_function(*args), self._loop).result()
+
+    def submit(self, prompt, priority=0.0, tokens=1, **options):
+        """
+        Queues a request; higher priority starts sooner. tokens counts against
+        the TPM budget, options are passed on to generate().
+        """
+        self._ensure_started()
+        future = concurrent.futures.Future()
+        with self._lock:
+            heapq.heappush(self._heap, (-priority, next(self._sequence), prompt, tokens, options, future))
+            self._counters['submitted'] += 1
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+        return future
+
+    def generate(self, prompt, priority=0.0, tokens=1, **options):
+        """Blocking submit(): returns the response text or raises the request's error."""
+        return self.submit(prompt, priority, tokens, **options).result()
+
+    async def _next_job(self):
+        while True:
+            with self._lock:
+                if self._heap:
+                    return heapq.heappop(self._heap)
+                self._wakeup.clear()
+            await self._wakeup.wait()
+
+    async def _worker(self):
+        while True:
+            _, _, prompt, tokens, options, future = await self._next_job()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = await self._call(prompt, tokens, options)
+            except Exception as e:
+                self._count('failed')
+                future.set_exception(e)
+            else:
+                self._count('completed')
+                future.set_result(result)
+
+    async def _call(self, prompt, tokens, options):
+        for attempt in range(self.max_retries + 1):
+            waited = 0.0
+            if self._rpm:
+                waited += await self._rpm.acquire(1)
+            if self._tpm:
+                waited += await self._tpm.acquire(tokens)
+            self._count('quota_wait_seconds', waited)
+            self._count('in_flight', 1)
+            try:
+                return await self._generate(prompt, **options)
+            except Exception as e:
+                if not is_quota_error(e) or attempt == self.max_retries:
+                    raise
+                self._count('quota_errors')
+                self._count('retries')
+                for bucket in (self._rpm, self._tpm):
+                    if bucket:
+                        bucket.drain()
+                delay = backoff_delay(attempt)
+                print(f"  ⏳ Model quota exceeded, retrying in {delay:.1f}s")
+            finally:
+                self._count('in_flight', -1)
+            await asyncio.sleep(delay)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+            if name == 'in_flight':
+                self._counters['peak_in_flight'] = max(self._counters['peak_in_flight'], self._counters['in_flight'])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counters, queued=len(self._heap),
+                        quota_wait_seconds=round(self._counters['quota_wait_seconds'], 1))
+
+
+if __name__ == "__main__":
+    # Throughput against the local stub model:
+    #   python llm_dispatcher.py [requests] [latency] [rpm] [quota_error_rate]
+    import sys
+    from stub_model import StubModel
+
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    rpm = float(sys.argv[3]) if len(sys.argv) > 3 else 120
+    quota_error_rate = float(sys.argv[4]) if len(sys.argv) > 4 else 0.0
+    prompts = [f"Prompt {n}" for n in range(total)]
+
+    model = StubModel(latency=latency, jitter=0.0, seed=1)
+    start = time.perf_counter()
+    for prompt in prompts[:5]:
+        model.generate_content(prompt)
+    sequential = 5 / (time.perf_counter() - start) * 60
+    print(f"Sequential: {sequential:.0f} requests/min (1/latency)")
+
+    model = StubModel(latency=latency, jitter=latency / 5, quota_error_rate=quota_error_rate, seed=1)
+
+    async def stub_generate(prompt):
+        return (await model.generate_content_async(prompt)).text
+
+    dispatcher = Dispatcher(stub_generate, rpm=rpm, tpm=0)
+    start = time.perf_counter()
+    futures = [dispatcher.submit(prompt, priority=n) for n, prompt in enumerate(prompts)]
+    done = sum(1 for future in futures if future.exception() is None)
+    elapsed = time.perf_counter() - start
+    print(f"Dispatcher: {done}/{total} ok, {done / elapsed * 60:.0f} requests/min "
+          f"(quota {rpm:.0f}/min, {dispatcher.max_in_flight} in flight)")
+    print(dispatcher.stats())
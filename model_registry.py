@@ -0,0 +1,76 @@
+import threading
+import time
+
+import google.generativeai as genai
+from google.generativeai import client as genai_client
+
+from stub_model import StubModel
+
+# One client per model name for the whole process, shared by every worker thread
+_lock = threading.Lock()
+_models = {}
+_counters = {'builds': 0, 'build_seconds': 0.0, 'lookups': 0, 'lookup_seconds': 0.0}
+
+
+def _build(name):
+    if name == 'stub':
+        return StubModel()
+    model = genai.GenerativeModel(name)
+    # The gRPC transport is created once per process on first use; doing it
+    # here keeps that cost out of the first request
+    genai_client.get_default_generative_client()
+    return model
+
+
+def get_model(name):
+    """Returns the shared client for a model ('stub' = stub_model.StubModel), building it on first use."""
+    start = time.perf_counter()
+    model = _models.get(name)
+    if model is None:
+        with _lock:
+            model = _models.get(name)
+            if model is None:
+                model = _models[name] = _build(name)
+                _counters['builds'] += 1
+                _counters['build_seconds'] += time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+    with _lock:
+        _counters['lookups'] += 1
+        _counters['lookup_seconds'] += elapsed
+    return model
+
+
+def prewarm(*names):
+    """Builds the clients at startup so the first article of a run does not pay for it."""
+    for name in names:
+        try:
+            get_model(name)
+        except Exception as e:
+            print(f"⚠️  Could not pre-warm model client {name}: {e}")
+    with _lock:
+        print(f"🔥 Model clients ready: {', '.join(_models)} ({_counters['build_seconds'] * 1000:.1f} ms to build)")
+
+
+async def prewarm_async():
+    """
+    Builds the async transport used by generate_content_async.
+
+    Run it on the event loop that sends the requests (Dispatcher.run): the
+    gRPC aio channel is bound to the loop it was created on.
+    """
+    start = time.perf_counter()
+    genai_client.get_default_generative_async_client()
+    elapsed = time.perf_counter() - start
+    print(f"🔥 Async model transport ready ({elapsed * 1000:.1f} ms to build)")
+
+
+def stats():
+    """Client overhead: build_ms is the one-time cost per model, lookup_ms what each request pays."""
+    with _lock:
+        return {
+            'models': list(_models),
+            'builds': _counters['builds'],
+            'build_ms': round(_counters['build_seconds'] * 1000 / _counters['builds'], 3) if _counters['builds'] else 0.0,
+            'lookups': _counters['lookups'],
+            'lookup_ms': round(_counters['lookup_seconds'] * 1000 / _counters['lookups'], 4) if _counters['lookups'] else 0.0,
+        }
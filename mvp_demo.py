@@ -1,7 +1,10 @@
 import requests
-from bs4 import BeautifulSoup
 import os
+import re
 import time
+import itertools
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
@@ -11,6 +14,18 @@ from selenium.webdriver.support import expected_conditions as EC
 import google.generativeai as genai
 from dotenv import load_dotenv
 
+import http_client
+import analysis_schema
+import cascade
+import condense
+import html_parser
+import llm_cache
+import llm_dispatcher
+import model_registry
+import near_dup
+import processed_store
+import triage
+
 # Load environment variables
 load_dotenv()
 
@@ -20,6 +35,12 @@ COMPETITOR_NAME = "Grab"
 BASE_URL = "https://www.grab.com/sg/press/"
 CACHE_FILE = f"{COMPETITOR_NAME.lower()}_articles.txt"
 
+# How much article text is extracted (0 = no limit). Fetching and parsing
+# stop as soon as the budget is reached; condense.py then picks the sentences
+# that fit the ANALYSIS_TOKEN_BUDGET sent to Gemini.
+ARTICLE_TEXT_BUDGET = int(os.environ.get('ARTICLE_TEXT_BUDGET', '12000'))  # characters
+ARTICLE_TOKEN_BUDGET = int(os.environ.get('ARTICLE_TOKEN_BUDGET', '0'))    # estimated tokens
+
 # Gemini API Configuration
 # Note: Create a .env file with GEMINI_API_KEY=your_api_key_here
 # Get your API key from: https://makersuite.google.com/app/apikey
@@ -29,6 +50,16 @@ if not GEMINI_API_KEY:
     print("Please create a .env file with GEMINI_API_KEY=your_api_key_here")
     print("Get your API key from: https://makersuite.google.com/app/apikey")
 
+# Model used for the analysis ('stub' answers locally, see stub_model.py)
+GEMINI_MODEL = os.environ.get('GEMINI_MODEL', 'gemini-1.5-pro')
+
+# Model cascade: a fast model screens every article (feature analysis and
+# relevance score only); new features and articles scoring at least
+# CASCADE_ESCALATE_SCORE are analyzed again by GEMINI_MODEL
+GEMINI_FAST_MODEL = os.environ.get('GEMINI_FAST_MODEL', '')   # e.g. gemini-1.5-flash; empty = no cascade
+CASCADE_ESCALATE_SCORE = int(os.environ.get('CASCADE_ESCALATE_SCORE', '6'))
+CASCADE_FAST_RPM = float(os.environ.get('CASCADE_FAST_RPM', str(llm_dispatcher.LLM_RPM)))  # own quota
+
 # Configure Gemini
 if GEMINI_API_KEY:
     genai.configure(api_key=GEMINI_API_KEY)
@@ -38,6 +69,21 @@ if GEMINI_API_KEY:
 ARTICLE_LINK_SELECTOR = "div.elementor-post__text > h3 > a"
 
 # Core Analysis Prompt for Gemini
+# Bump ANALYSIS_PROMPT_VERSION whenever the prompt changes: cached analyses are keyed by it
+ANALYSIS_PROMPT_VERSION = "v1"
+ANALYSIS_FORMAT = """**FEATURE ANALYSIS:**
+- Is this announcing a new feature or product? (Yes/No)
+- Feature/Product Name: [Name if applicable]
+- Category: [e.g., Food Delivery, Transportation, Payments, etc.]
+- Target Market: [e.g., Singapore, Malaysia, Southeast Asia]
+
+**SUMMARY:**
+[2-3 sentence summary of what this announcement contains]
+
+**COMPETITIVE INTELLIGENCE:**
+[Key insights about what this means for competitors in the market]
+
+**RELEVANCE SCORE:** [1-10, where 10 is highly relevant new feature announcement]"""
 ANALYSIS_PROMPT = """
 You are an expert product analyst focused on identifying new features and product releases from competitor announcements.
 
@@ -48,21 +94,115 @@ ARTICLE TEXT:
 
 Please provide your analysis in the following format:
 
-**FEATURE ANALYSIS:**
+""" + ANALYSIS_FORMAT.replace('{', '{{').replace('}', '}}') + """
+
+Only respond with the structured analysis above. Be concise but thorough.""" 
+
+# Batching: several articles share one request (and one copy of the prompt)
+# as long as their estimated tokens fit the budget. 0 = one article per request.
+GEMINI_BATCH_TOKEN_BUDGET = int(os.environ.get('GEMINI_BATCH_TOKEN_BUDGET', '0'))
+GEMINI_BATCH_MAX_ARTICLES = int(os.environ.get('GEMINI_BATCH_MAX_ARTICLES', '8'))
+
+# Articles and answers are wrapped in numbered markers so the response can be
+# split back per article
+BATCH_ARTICLE_MARKER = "=== ARTICLE {number} ==="
+BATCH_ANALYSIS_MARKER = "=== ANALYSIS {number} ==="
+BATCH_ANALYSIS_PROMPT = """
+You are an expert product analyst focused on identifying new features and product releases from competitor announcements.
+
+Below are {count} separate articles, each starting with a line like "=== ARTICLE 1 ===".
+Analyze every article independently and provide one structured analysis per article.
+
+{articles}
+
+For each article, in order, start with a line "=== ANALYSIS <number> ===" (the article's number)
+followed by the analysis in this format:
+
+""" + ANALYSIS_FORMAT.replace('{', '{{').replace('}', '}}') + """
+
+Provide exactly {count} analyses, one per article, and nothing else. Be concise but thorough."""
+
+# 'json': schema-constrained JSON responses (analysis_schema.py), decoded in
+# one pass; 'markdown': the free-form format above. Responses that fail
+# validation are requested again in Markdown.
+ANALYSIS_OUTPUT = os.environ.get('ANALYSIS_OUTPUT', 'json').lower()
+JSON_OUTPUT = ANALYSIS_OUTPUT == 'json'
+ANALYSIS_JSON_FIELDS = """- is_new_feature: true if this announces a new feature or product
+- feature_name: name of the feature/product ("" if not applicable)
+- category: e.g. Food Delivery, Transportation, Payments, etc.
+- target_market: e.g. Singapore, Malaysia, Southeast Asia
+- summary: 2-3 sentence summary of what this announcement contains
+- competitive_intelligence: key insights about what this means for competitors in the market
+- key_features: up to 3 short descriptions of the key capabilities (empty if none)
+- relevance_score: 1-10, where 10 is highly relevant new feature announcement"""
+ANALYSIS_JSON_PROMPT = """
+You are an expert product analyst focused on identifying new features and product releases from competitor announcements.
+
+Please analyze the following article text:
+
+ARTICLE TEXT:
+{article_text}
+
+Respond with one JSON object with these fields:
+""" + ANALYSIS_JSON_FIELDS + """
+
+Be concise but thorough."""
+BATCH_ANALYSIS_JSON_PROMPT = """
+You are an expert product analyst focused on identifying new features and product releases from competitor announcements.
+
+Below are {count} separate articles, each starting with a line like "=== ARTICLE 1 ===".
+Analyze every article independently.
+
+{articles}
+
+Respond with a JSON array of exactly {count} objects, one per article, each with an "article" field
+(the article's number) and these fields:
+""" + ANALYSIS_JSON_FIELDS + """
+
+Be concise but thorough."""
+# Cached responses are keyed by prompt version, so the two output modes never mix
+ACTIVE_PROMPT_VERSION = f"{ANALYSIS_PROMPT_VERSION}-json" if JSON_OUTPUT else ANALYSIS_PROMPT_VERSION
+
+# Cascade screening: the feature analysis and score, without the competitive
+# intelligence write-up (cached separately, so the threshold can be changed
+# without analyzing again)
+SCREEN_ANALYSIS_FORMAT = """**FEATURE ANALYSIS:**
 - Is this announcing a new feature or product? (Yes/No)
 - Feature/Product Name: [Name if applicable]
 - Category: [e.g., Food Delivery, Transportation, Payments, etc.]
 - Target Market: [e.g., Singapore, Malaysia, Southeast Asia]
 
 **SUMMARY:**
-[2-3 sentence summary of what this announcement contains]
+[1-2 sentence summary of what this announcement contains]
 
-**COMPETITIVE INTELLIGENCE:**
-[Key insights about what this means for competitors in the market]
+**RELEVANCE SCORE:** [1-10, where 10 is highly relevant new feature announcement]"""
+SCREEN_ANALYSIS_PROMPT = """
+You are an expert product analyst screening competitor announcements for new features and product releases.
 
-**RELEVANCE SCORE:** [1-10, where 10 is highly relevant new feature announcement]
+ARTICLE TEXT:
+{article_text}
 
-Only respond with the structured analysis above. Be concise but thorough.""" 
+Please provide your analysis in the following format:
+
+""" + SCREEN_ANALYSIS_FORMAT.replace('{', '{{').replace('}', '}}') + """
+
+Only respond with the structured analysis above. Be brief."""
+SCREEN_JSON_PROMPT = """
+You are an expert product analyst screening competitor announcements for new features and product releases.
+
+ARTICLE TEXT:
+{article_text}
+
+Respond with one JSON object with these fields:
+""" + '\n'.join(line for line in ANALYSIS_JSON_FIELDS.split('\n')
+                if not line.startswith(('- competitive_intelligence', '- key_features'))).replace(
+    '2-3 sentence', '1-2 sentence') + """
+
+Be brief."""
+SCREEN_PROMPT_VERSION = f"{ACTIVE_PROMPT_VERSION}-screen"
+
+_BATCH_ANALYSIS_MARKER_RE = re.compile(r'^\s*=+\s*ANALYSIS\s+(\d+)\s*=+\s*$', re.MULTILINE)
+_BATCH_PROMPT_TOKENS = html_parser.estimate_tokens(BATCH_ANALYSIS_JSON_PROMPT if JSON_OUTPUT else BATCH_ANALYSIS_PROMPT)
 
 def get_article_urls(url: str, selector: str):
     """
@@ -91,83 +231,256 @@ def get_article_urls(url: str, selector: str):
     print(f"Found {len(mock_urls)} article links (from mock data).")
     return mock_urls
 
-def load_processed_urls(cache_file: str) -> set:
-    """Loads processed URLs from the cache file to a set."""
-    try:
-        if not os.path.exists(cache_file):
-            return set()
-        with open(cache_file, 'r') as f:
-            return set(line.strip() for line in f if line.strip())
-    except Exception as e:
-        print(f"Warning: Could not load cache file {cache_file}: {e}")
-        return set()
+def listing_fields_from_url(url: str) -> tuple:
+    """
+    Listing title and category of a Grab press URL (/press/<category>/<title-slug>/),
+    for triage when the article did not come from a parsed listing.
+    """
+    parts = [part for part in urlparse(url).path.split('/') if part]
+    if 'press' not in parts or len(parts) < parts.index('press') + 3:
+        return '', ''
+    category, slug = parts[parts.index('press') + 1], parts[-1]
+    return slug.replace('-', ' ').capitalize(), category.replace('-', ' ').capitalize()
 
-def save_processed_url(cache_file: str, url: str):
-    """Appends a new URL to the cache file."""
-    try:
-        with open(cache_file, 'a') as f:
-            f.write(url + '\\n')
-    except Exception as e:
-        print(f"Warning: Could not save to cache file {cache_file}: {e}")
+def load_processed_urls(competitor: str, cache_file: str = None) -> processed_store.ProcessedSet:
+    """
+    Opens the processed-URL store for a competitor.
+
+    The competitor's old text cache file, if given, is imported the first time.
+    The set (and its Bloom filter) is shared for the rest of the process.
+    """
+    return processed_store.open_set(competitor, cache_file)
+
+def save_processed_url(processed_urls: processed_store.ProcessedSet, url: str):
+    """Marks a URL as processed (written to the store in batches)."""
+    processed_urls.add(url)
+
+def extract_article_text(html, url: str = "", encoding: str = 'utf-8') -> str:
+    """
+    Extracts the readable text from an article page's HTML, up to the text budget.
+
+    Args:
+        html: The page as bytes/str, or an iterable of chunks (read lazily)
+        url: Used in log messages
+        encoding: Charset of byte input (the response's, see http_client.response_charset)
+    """
+    if not html:
+        return ""
+
+    chunks = [html] if isinstance(html, (bytes, str)) else html
+    # A simple approach to get the main content. This can be improved.
+    # We target common tags where article text resides.
+    text, found_body = html_parser.stream_article_text(chunks, ARTICLE_TEXT_BUDGET, ARTICLE_TOKEN_BUDGET, encoding)
+    if not found_body and text:
+        print(f"  - Could not find main article body for {url}. Falling back to body text.")
+    return text
 
 def get_article_text(url: str) -> str:
     """
     Fetches the content of a single article and extracts the text.
+
+    The body is streamed and parsing stops once the text budget is filled.
+    With the response cache on, the rest of the page is still downloaded
+    and cached when the body is closed (see http_client.iter_body).
     """
     print(f"  - Fetching content for {url}...")
+    info = {}
+    body = http_client.iter_body(url, info=info)
     try:
-        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=15)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # A simple approach to get the main content. This can be improved.
-        # We target common tags where article text resides.
-        article_body = soup.find('div', class_='entry-content') # A common class for content
-        if not article_body:
-             article_body = soup.find('article') or soup.find('main')
-
-        if article_body:
-            text_parts = article_body.find_all(['p', 'h1', 'h2', 'h3', 'li'])
-            return ' '.join(part.get_text(separator=' ', strip=True) for part in text_parts)
-        else:
-            print(f"  - Could not find main article body for {url}. Falling back to body text.")
-            return soup.body.get_text(separator=' ', strip=True)
-
+        # The first chunk brings the response headers, and with them the charset
+        first = next(body, b'')
+        return extract_article_text(itertools.chain([first], body), url, info.get('encoding', 'utf-8'))
     except requests.RequestException as e:
         print(f"  - Error fetching article content for {url}: {e}")
         return ""
+    finally:
+        body.close()
+
+def _model_configured() -> bool:
+    return bool(GEMINI_API_KEY) or GEMINI_MODEL == 'stub'
+
+def _generation_config(batch: bool = False, schema=None):
+    """Constrains JSON-mode responses to the analysis schema."""
+    if not JSON_OUTPUT:
+        return None
+    return {'response_mime_type': 'application/json',
+            'response_schema': schema or (analysis_schema.BATCH_SCHEMA if batch else analysis_schema.ANALYSIS_SCHEMA)}
+
+async def _generate_async(prompt: str, generation_config=None, on_chunk=None, fast: bool = False) -> str:
+    model = model_registry.get_model(GEMINI_FAST_MODEL if fast else GEMINI_MODEL)
+    start = time.perf_counter()
+    if on_chunk is None:
+        response = await model.generate_content_async(prompt, generation_config=generation_config)
+        text = response.text
+    else:
+        # Streamed: each piece of text is passed on as soon as it arrives
+        chunks = []
+        try:
+            response = await model.generate_content_async(prompt, generation_config=generation_config, stream=True)
+            async for chunk in response:
+                chunks.append(chunk.text)
+                on_chunk(chunk.text)
+        except Exception:
+            # The dispatcher may retry and stream the answer again from the start
+            if chunks:
+                on_chunk(None)
+            raise
+        text = ''.join(chunks)
+    # Model latency (without time queued for quota) and estimated cost per tier
+    cascade.record_call('fast' if fast else 'large', time.perf_counter() - start, prompt, text)
+    return text
+
+# Requests go through the dispatcher (concurrency, RPM/TPM quotas, retries on 429)
+_dispatcher = llm_dispatcher.Dispatcher(_generate_async) if llm_dispatcher.LLM_DISPATCH_ENABLED else None
+# The fast model of the cascade has its own quota
+_fast_dispatcher = llm_dispatcher.Dispatcher(_generate_async, rpm=CASCADE_FAST_RPM) \
+    if llm_dispatcher.LLM_DISPATCH_ENABLED and GEMINI_FAST_MODEL else None
 
-def analyze_text(article_text: str) -> str:
+def _generate(prompt: str, priority: float = 0.0, generation_config=None, on_chunk=None, fast: bool = False) -> str:
+    """
+    One Gemini round trip; returns the response text (empty if there was none).
+    With on_chunk, the response is streamed and on_chunk(text) is called for
+    each piece as it arrives (from the dispatcher thread, so keep it quick);
+    on_chunk(None) means the text passed so far is void, because the stream
+    failed and a retry starts over.
+    fast=True sends it to GEMINI_FAST_MODEL (the cascade's screening tier).
+
+    Blocks the calling thread only: with the dispatcher on, requests from
+    many threads are in flight together, most recent articles (highest
+    priority) first.
+    """
+    dispatcher = _fast_dispatcher if fast else _dispatcher
+    if dispatcher is not None:
+        return dispatcher.generate(prompt, priority, html_parser.estimate_tokens(prompt),
+                                   generation_config=generation_config, on_chunk=on_chunk, fast=fast)
+    model = model_registry.get_model(GEMINI_FAST_MODEL if fast else GEMINI_MODEL)
+    start = time.perf_counter()
+    if on_chunk is None:
+        text = model.generate_content(prompt, generation_config=generation_config).text
+    else:
+        chunks = []
+        try:
+            for chunk in model.generate_content(prompt, generation_config=generation_config, stream=True):
+                chunks.append(chunk.text)
+                on_chunk(chunk.text)
+        except Exception:
+            if chunks:
+                on_chunk(None)
+            raise
+        text = ''.join(chunks)
+    cascade.record_call('fast' if fast else 'large', time.perf_counter() - start, prompt, text)
+    return text
+
+def _map_requests(func, items: list) -> list:
+    """Runs func over items, concurrently when the dispatcher can keep several requests in flight."""
+    if _dispatcher is None or len(items) < 2:
+        return [func(item) for item in items]
+    # Waiting threads are cheap: the dispatcher decides what actually runs
+    with ThreadPoolExecutor(max_workers=min(len(items), 64)) as pool:
+        return list(pool.map(func, items))
+
+def dispatcher_stats() -> dict:
+    return _dispatcher.stats() if _dispatcher is not None else {}
+
+def prewarm_models():
+    """
+    Builds the model clients at startup, so the first article does not pay for it.
+    With the dispatcher on, that includes the async transport, built on the dispatcher's loop.
+    """
+    model_registry.prewarm(*filter(None, (GEMINI_MODEL, GEMINI_FAST_MODEL)))
+    if _dispatcher is not None and GEMINI_MODEL != 'stub':
+        try:
+            _dispatcher.run(model_registry.prewarm_async)
+        except Exception as e:
+            print(f"⚠️  Could not pre-warm the async model transport: {e}")
+
+def cascade_stats() -> dict:
+    stats = cascade.stats()
+    if _fast_dispatcher is not None:
+        stats['fast_dispatch'] = _fast_dispatcher.stats()
+    return stats
+
+def screen_text(article_text: str, priority: float = 0.0) -> str:
+    """
+    Cascade screening tier: feature analysis and relevance score from GEMINI_FAST_MODEL.
+
+    Args:
+        article_text: Condensed article text (see analyze_text)
+
+    Returns:
+        The screening analysis, or "" if the fast model failed (the article is then escalated)
+    """
+    cached = llm_cache.get(GEMINI_FAST_MODEL, SCREEN_PROMPT_VERSION, article_text)
+    if cached is not None:
+        return cached
+    try:
+        print(f"  - Screening with {GEMINI_FAST_MODEL}...")
+        prompt = SCREEN_JSON_PROMPT if JSON_OUTPUT else SCREEN_ANALYSIS_PROMPT
+        text = _generate(prompt.format(article_text=article_text), priority,
+                         _generation_config(schema=analysis_schema.SCREEN_SCHEMA), fast=True)
+    except Exception as e:
+        print(f"  - Error during screening: {e}")
+        return ""
+    if text:
+        llm_cache.put(GEMINI_FAST_MODEL, SCREEN_PROMPT_VERSION, article_text, text)
+    return text or ""
+
+def analyze_text(article_text: str, priority: float = 0.0, on_chunk=None) -> str:
     """
     Analyzes article text using Gemini API to identify new features and competitive intelligence.
     
     Args:
         article_text: The cleaned text content of the article
+        priority: Dispatch priority, e.g. the publish timestamp (newer goes first)
+        on_chunk: Optional callback receiving the analysis text as it streams in
+            (None when the text so far is void and streaming starts over, see _generate)
         
     Returns:
         The analysis results from Gemini, or an error message
     """
-    if not GEMINI_API_KEY:
-        return "ERROR: Gemini API key not configured"
-    
     if not article_text.strip():
         return "ERROR: No article text provided"
     
+    # Keep the most informative sentences within the token budget
+    article_text = condense.condense(article_text)
+    
+    cached = llm_cache.get(GEMINI_MODEL, ACTIVE_PROMPT_VERSION, article_text)
+    if cached is not None:
+        print(f"  - Using cached analysis ({GEMINI_MODEL}, prompt {ACTIVE_PROMPT_VERSION})")
+        return cached
+    
+    if not _model_configured():
+        return "ERROR: Gemini API key not configured"
+    
+    if GEMINI_FAST_MODEL:
+        screening = screen_text(article_text, priority)
+        escalate = cascade.should_escalate(screening, CASCADE_ESCALATE_SCORE)
+        cascade.record_decision(escalate)
+        if not escalate:
+            print(f"  - Below the escalation threshold, keeping the {GEMINI_FAST_MODEL} analysis")
+            return screening
+        print(f"  - Escalating to {GEMINI_MODEL}")
+    
     try:
-        # Initialize Gemini model
-        model = genai.GenerativeModel('gemini-1.5-pro')
-        
         # Format the prompt with the article text
-        formatted_prompt = ANALYSIS_PROMPT.format(article_text=article_text[:4000])  # Limit text to avoid token limits
+        prompt = ANALYSIS_JSON_PROMPT if JSON_OUTPUT else ANALYSIS_PROMPT
+        formatted_prompt = prompt.format(article_text=article_text)
         
         print(f"  - Sending to Gemini for analysis...")
         
         # Generate analysis
-        response = model.generate_content(formatted_prompt)
+        text = _generate(formatted_prompt, priority, _generation_config(), on_chunk)
+        
+        if text and JSON_OUTPUT and analysis_schema.decode(text) is None:
+            print(f"  - Response does not match the analysis schema, asking again in Markdown")
+            if on_chunk:
+                on_chunk(None)
+            text = _generate(ANALYSIS_PROMPT.format(article_text=article_text), priority, on_chunk=on_chunk)
         
-        if response.text:
+        if text:
             print(f"  - Analysis completed successfully")
-            return response.text
+            llm_cache.put(GEMINI_MODEL, ACTIVE_PROMPT_VERSION, article_text, text)
+            return text
         else:
             return "ERROR: Empty response from Gemini"
             
@@ -175,30 +488,149 @@ def analyze_text(article_text: str) -> str:
         print(f"  - Error during Gemini analysis: {e}")
         return f"ERROR: Gemini analysis failed - {str(e)}"
 
-def display_results(analysis: str, url: str) -> None:
+def pack_batches(articles: list, token_budget: int = None, max_articles: int = None) -> list:
+    """
+    Groups (key, text) pairs, in order, into batches whose prompt fits the token budget.
+
+    An article too large to share a request ends up in a batch of its own.
+    """
+    token_budget = GEMINI_BATCH_TOKEN_BUDGET if token_budget is None else token_budget
+    max_articles = GEMINI_BATCH_MAX_ARTICLES if max_articles is None else max_articles
+    batches, current, used = [], [], _BATCH_PROMPT_TOKENS
+    for key, text in articles:
+        # The article marker adds a handful of tokens
+        tokens = html_parser.estimate_tokens(text) + 8
+        if current and (used + tokens > token_budget or len(current) >= max_articles):
+            batches.append(current)
+            current, used = [], _BATCH_PROMPT_TOKENS
+        current.append((key, text))
+        used += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+def split_batch_analysis(response_text: str, count: int) -> list:
+    """
+    Splits a batched response (JSON array or Markdown sections) into one analysis per article, in article order.
+
+    Returns:
+        List of count analyses, or None when the response does not contain
+        exactly one well-formed section per article
+    """
+    if analysis_schema.is_json(response_text):
+        return analysis_schema.decode_batch(response_text, count)
+    matches = list(_BATCH_ANALYSIS_MARKER_RE.finditer(response_text or ""))
+    if [int(match.group(1)) for match in matches] != list(range(1, count + 1)):
+        return None
+    sections = []
+    for match, following in zip(matches, matches[1:] + [None]):
+        section = response_text[match.end():following.start() if following else len(response_text)].strip()
+        # Each section must be a complete analysis parse_analysis_result can read
+        if "FEATURE ANALYSIS" not in section.upper() or "RELEVANCE SCORE" not in section.upper():
+            return None
+        sections.append(section)
+    return sections
+
+def analyze_texts(articles: dict, priorities: dict = None) -> dict:
+    """
+    Analyzes several articles, packing them into as few Gemini requests as the batch budget allows.
+
+    Cached analyses are reused as in analyze_text, and each article of a batch
+    is cached on its own. A batch whose response cannot be split back per
+    article is retried one article at a time. With the dispatcher on, the
+    requests are sent concurrently.
+
+    Args:
+        articles: {key (e.g. URL): article text}
+        priorities: Optional {key: dispatch priority} (see analyze_text)
+
+    Returns:
+        {key: analysis or "ERROR: ..." message}, like analyze_text per article
+    """
+    priorities = priorities or {}
+    # The cascade decides per article, so its articles are not batched
+    if not GEMINI_BATCH_TOKEN_BUDGET or GEMINI_FAST_MODEL or len(articles) < 2:
+        return dict(_map_requests(lambda item: (item[0], analyze_text(item[1], priorities.get(item[0], 0.0))),
+                                  list(articles.items())))
+
+    results = {}
+    pending = []
+    for key, text in articles.items():
+        if not text.strip():
+            results[key] = "ERROR: No article text provided"
+            continue
+        text = condense.condense(text)
+        cached = llm_cache.get(GEMINI_MODEL, ACTIVE_PROMPT_VERSION, text)
+        if cached is not None:
+            results[key] = cached
+        else:
+            pending.append((key, text))
+    if pending and not _model_configured():
+        results.update((key, "ERROR: Gemini API key not configured") for key, _ in pending)
+        return results
+
+    def analyze_batch(batch):
+        if len(batch) == 1:
+            key, text = batch[0]
+            return [(key, analyze_text(text, priorities.get(key, 0.0)))]
+
+        sections = None
+        try:
+            prompt = BATCH_ANALYSIS_JSON_PROMPT if JSON_OUTPUT else BATCH_ANALYSIS_PROMPT
+            formatted_prompt = prompt.format(
+                count=len(batch),
+                articles="\n\n".join(f"{BATCH_ARTICLE_MARKER.format(number=number)}\n{text}"
+                                      for number, (_, text) in enumerate(batch, 1)))
+            print(f"  - Sending {len(batch)} articles to Gemini in one request...")
+            priority = max(priorities.get(key, 0.0) for key, _ in batch)
+            sections = split_batch_analysis(_generate(formatted_prompt, priority, _generation_config(batch=True)),
+                                            len(batch))
+            if sections is None:
+                print(f"  - Could not split the batched response, analyzing {len(batch)} articles one by one")
+        except Exception as e:
+            print(f"  - Error during batched Gemini analysis: {e}, analyzing {len(batch)} articles one by one")
+
+        if sections is None:
+            return [(key, analyze_text(text, priorities.get(key, 0.0))) for key, text in batch]
+        print(f"  - Batched analysis of {len(batch)} articles completed successfully")
+        for (key, text), section in zip(batch, sections):
+            llm_cache.put(GEMINI_MODEL, ACTIVE_PROMPT_VERSION, text, section)
+        return [(key, section) for (key, _), section in zip(batch, sections)]
+
+    for pairs in _map_requests(analyze_batch, pack_batches(pending)):
+        results.update(pairs)
+    return results
+
+def display_results(analysis: str, url: str, result: dict = None) -> None:
     """
     Displays the analysis results in a formatted way and identifies key feature announcements.
     
     Args:
         analysis: The analysis text from Gemini
         url: The source URL
+        result: The already parsed result (e.g. web_app.parse_analysis_result),
+            so the text does not have to be scanned again
     """
     if analysis.startswith("ERROR:"):
         print(f"  - {analysis}")
         return
     
+    record = analysis_schema.decode(analysis)
     print(f"\\n=== ANALYSIS RESULTS ===")
     print(f"Source: {url}")
     print("-" * 50)
-    print(analysis)
+    print(analysis_schema.to_markdown(record) if record else analysis)
     print("-" * 50)
     
-    # Check if this is a significant feature announcement
-    analysis_lower = analysis.lower()
-    
-    # Look for indicators of new features
-    if "yes" in analysis_lower and any(keyword in analysis_lower for keyword in 
-                                     ["new feature", "product launch", "announcing", "introduces", "launches"]):
+    if result is not None:
+        is_new_feature, feature_name = result.get('is_new_feature'), result.get('title') or "Unknown Feature"
+    elif record is not None:
+        is_new_feature, feature_name = record['is_new_feature'], record['feature_name'] or "Unknown Feature"
+    else:
+        # Legacy Markdown: look for indicators of new features
+        analysis_lower = analysis.lower()
+        is_new_feature = "yes" in analysis_lower and any(keyword in analysis_lower for keyword in 
+                                     ["new feature", "product launch", "announcing", "introduces", "launches"])
         
         # Try to extract feature name from the analysis
         lines = analysis.split('\\n')
@@ -207,7 +639,9 @@ def display_results(analysis: str, url: str) -> None:
             if "feature/product name:" in line.lower():
                 feature_name = line.split(':', 1)[1].strip()
                 break
-        
+    
+    # Check if this is a significant feature announcement
+    if is_new_feature:
         print(f"\\n🚀 NEW FEATURE DETECTED: {feature_name}")
         print(f"📄 Source: {url}")
         print("⚠️  This requires competitive intelligence review!")
@@ -216,36 +650,65 @@ def display_results(analysis: str, url: str) -> None:
 # --- Main Execution ---
 if __name__ == "__main__":
     print("--- Starting Competitor Feature Watcher MVP ---")
+    if _model_configured():
+        prewarm_models()
 
-    processed_urls = load_processed_urls(CACHE_FILE)
+    processed_urls = load_processed_urls(COMPETITOR_NAME.lower(), CACHE_FILE)
     print(f"Loaded {len(processed_urls)} processed URLs from cache.")
     
     all_urls = get_article_urls(BASE_URL, ARTICLE_LINK_SELECTOR)
     
-    new_urls = [url for url in all_urls if url not in processed_urls]
+    new_urls = processed_urls.filter_new(all_urls)
     
     if not new_urls:
         print("\\n--- No new articles found. ---")
     else:
         print(f"\\n--- Found {len(new_urls)} new articles to process ---")
+        # Texts to analyze, so that GEMINI_BATCH_TOKEN_BUDGET can pack them into shared requests
+        to_analyze, signatures, analyses = {}, {}, {}
         for url in new_urls:
             print(f"Processing new article: {url}")
             
-            # Save to cache immediately to avoid reprocessing failed URLs in the MVP
-            save_processed_url(CACHE_FILE, url)
-            print(f"  - Marked as processed and saved to cache.")
-
             article_text = get_article_text(url)
             
             if article_text:
                 print(f"  - Successfully extracted text. Length: {len(article_text)} chars.")
                 
-                # Analyze with Gemini
-                analysis = analyze_text(article_text)
+                title, category = listing_fields_from_url(url)
+                decision, probability = triage.decide(title, category, triage.lead_text(article_text))
+                if decision in ('skip', 'defer'):
+                    print(f"  - Triage score {probability:.2f} below {triage.TRIAGE_THRESHOLD}, not analyzing ({decision}).")
+                    if decision == 'skip':
+                        save_processed_url(processed_urls, url)
+                    # Deferred articles stay unprocessed and come back in a later run
+                    continue
                 
-                # Display results using the formatted display function
-                display_results(analysis, url)
+                # Marked once the triage decision is made, so failed analyses are not retried in the MVP
+                save_processed_url(processed_urls, url)
+                print(f"  - Marked as processed and saved to cache.")
+                
+                # Reuse the analysis of a near-duplicate, otherwise analyze with Gemini
+                signatures[url] = near_dup.minhash(article_text)
+                duplicate = near_dup.find_duplicate(signatures[url], GEMINI_MODEL, ACTIVE_PROMPT_VERSION)
+                if duplicate:
+                    print(f"  - Near-duplicate of {duplicate['url']}, reusing its analysis.")
+                    analyses[url] = duplicate['analysis']
+                else:
+                    to_analyze[url] = article_text
             else:
+                # Not retried in the MVP
+                save_processed_url(processed_urls, url)
                 print(f"  - Failed to extract text.")
+        
+        for url, analysis in analyze_texts(to_analyze).items():
+            if not analysis.startswith("ERROR:"):
+                near_dup.remember(url, signatures[url], analysis, GEMINI_MODEL, ACTIVE_PROMPT_VERSION)
+            analyses[url] = analysis
+        
+        for url in new_urls:
+            if url in analyses:
+                # Display results using the formatted display function
+                display_results(analyses[url], url)
+        processed_urls.flush()
 
     print("\\n--- MVP script finished ---") 
\ No newline at end of file
@@ -0,0 +1,164 @@
+import array
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+# Fingerprints of analyzed articles, so republished copies reuse the analysis
+NEAR_DUP_DB = os.environ.get('NEAR_DUP_DB', 'near_duplicates.db')
+# Set to 0 to turn near-duplicate detection off
+NEAR_DUP_ENABLED = os.environ.get('NEAR_DUP_ENABLED', '1').lower() not in ('0', 'false', 'no')
+# Two texts are near-duplicates when the estimated Jaccard similarity of
+# their word 3-shingles is at least this
+NEAR_DUP_THRESHOLD = float(os.environ.get('NEAR_DUP_THRESHOLD', '0.8'))
+# Texts shorter than this (in words) are too short to fingerprint reliably
+NEAR_DUP_MIN_WORDS = int(os.environ.get('NEAR_DUP_MIN_WORDS', '40'))
+
+SHINGLE_SIZE = 3
+NUM_PERM = 128
+# LSH banding: articles are only compared when all rows of at least one band
+# agree. 16 bands x 8 rows makes pairs above ~0.7 similarity candidates
+# almost surely, and pairs below ~0.4 almost never.
+NUM_BANDS = 16
+BAND_ROWS = NUM_PERM // NUM_BANDS
+
+# Fixed seed: signatures must stay comparable across runs
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20250611)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+_WORD_RE = re.compile(r'\w+')
+
+_lock = threading.Lock()
+_conn = None
+# Only fingerprints analyzed with the same model and prompt version are
+# compared, so a model or prompt change means a fresh analysis
+_index = None  # {(model, prompt_version, band, band_hash): [row_id, ...]}
+_signatures = None  # {row_id: signature}
+
+
+def minhash(text):
+    """MinHash signature (array of NUM_PERM 32-bit ints) of the text's word 3-shingles, or None if it is too short."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < max(NEAR_DUP_MIN_WORDS, SHINGLE_SIZE):
+        return None
+    hashes = {zlib.crc32(' '.join(words[i:i + SHINGLE_SIZE]).encode('utf-8'))
+              for i in range(len(words) - SHINGLE_SIZE + 1)}
+    return array.array('I', (min((a * h + b) % _MERSENNE_PRIME for h in hashes) & 0xFFFFFFFF
+                             for a, b in _PERMUTATIONS))
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(signature, other) if x == y) / NUM_PERM
+
+
+def _bands(signature, model, prompt_version):
+    return [(model, prompt_version, band, hash(signature[band * BAND_ROWS:(band + 1) * BAND_ROWS].tobytes()))
+            for band in range(NUM_BANDS)]
+
+
+def _to_blob(signature):
+    return array.array('I', signature).tobytes()
+
+
+def _from_blob(blob):
+    # Kept packed (4 bytes per value), not as a list of Python ints
+    signature = array.array('I')
+    signature.frombytes(blob)
+    return signature
+
+
+def _connect():
+    """Opens the database and loads the band index once per process."""
+    global _conn, _index, _signatures
+    if _conn is None:
+        _conn = sqlite3.connect(NEAR_DUP_DB, check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("""CREATE TABLE IF NOT EXISTS fingerprints (
+            id INTEGER PRIMARY KEY,
+            url TEXT NOT NULL,
+            signature BLOB NOT NULL,
+            analysis TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            model TEXT,
+            prompt_version TEXT)""")
+        columns = {row[1] for row in _conn.execute("PRAGMA table_info(fingerprints)")}
+        for column in ('model', 'prompt_version'):
+            if column not in columns:
+                # Older rows have neither, so they never match again
+                _conn.execute(f"ALTER TABLE fingerprints ADD COLUMN {column} TEXT")
+        _conn.commit()
+        _index = {}
+        _signatures = {}
+        for row_id, blob, model, prompt_version in _conn.execute(
+                "SELECT id, signature, model, prompt_version FROM fingerprints WHERE model IS NOT NULL"):
+            _add_to_index(row_id, _from_blob(blob), model, prompt_version)
+    return _conn
+
+
+def _add_to_index(row_id, signature, model, prompt_version):
+    _signatures[row_id] = signature
+    for key in _bands(signature, model, prompt_version):
+        _index.setdefault(key, []).append(row_id)
+
+
+def find_duplicate(signature, model, prompt_version):
+    """
+    Looks up a near-duplicate previously analyzed with the same model and prompt version.
+
+    Returns:
+        {'url', 'analysis', 'similarity'} of the closest match, or None
+    """
+    if signature is None or not NEAR_DUP_ENABLED:
+        return None
+    with _lock:
+        conn = _connect()
+        candidates = set()
+        for key in _bands(signature, model, prompt_version):
+            candidates.update(_index.get(key, ()))
+        best_id, best_similarity = None, NEAR_DUP_THRESHOLD
+        for row_id in candidates:
+            score = similarity(signature, _signatures[row_id])
+            if score >= best_similarity:
+                best_id, best_similarity = row_id, score
+        if best_id is None:
+            return None
+        url, analysis = conn.execute("SELECT url, analysis FROM fingerprints WHERE id = ?", (best_id,)).fetchone()
+    return {'url': url, 'analysis': analysis, 'similarity': best_similarity}
+
+
+def remember(url, signature, analysis, model, prompt_version):
+    """Stores the analysis of an article under its fingerprint, with the model and prompt version that produced it."""
+    if signature is None or not NEAR_DUP_ENABLED:
+        return
+    with _lock:
+        conn = _connect()
+        cursor = conn.execute("INSERT INTO fingerprints (url, signature, analysis, created_at, model, prompt_version) "
+                              "VALUES (?, ?, ?, ?, ?, ?)",
+                              (url, _to_blob(signature), analysis, time.time(), model, prompt_version))
+        conn.commit()
+        _add_to_index(cursor.lastrowid, array.array('I', signature), model, prompt_version)
+
+
+def invalidate(prompt_version):
+    """Forgets the fingerprints of analyses made with one prompt version (see llm_cache.invalidate); returns how many."""
+    global _conn
+    with _lock:
+        conn = _connect()
+        removed = conn.execute("DELETE FROM fingerprints WHERE prompt_version = ?", (prompt_version,)).rowcount
+        conn.commit()
+        # Rebuilt without them on next use
+        conn.close()
+        _conn = None
+    return removed
+
+
+def stats():
+    with _lock:
+        _connect()
+        return {'signatures': len(_signatures), 'buckets': len(_index),
+                'bands': NUM_BANDS, 'threshold': NEAR_DUP_THRESHOLD}
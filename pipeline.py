@@ -0,0 +1,106 @@
+import queue
+import threading
+
+# Marks the end of a stage's input; one is sent per downstream worker
+_STOP = object()
+
+
+class StagedPipeline:
+    """
+    Runs items through a chain of stages, each served by its own worker pool.
+
+    Stages are joined by bounded queues so a slow stage applies back-pressure
+    to the ones in front of it instead of buffering the whole run in memory,
+    while the stages themselves overlap (article N+1 downloads while article N
+    is being analyzed).
+
+    Each stage is a ``(name, func, workers)`` tuple. ``func(item, value)``
+    receives the original item and the previous stage's output (``None`` for
+    the first stage) and returns the value for the next stage. Returning
+    ``None`` drops the item: it is reported as finished without running the
+    remaining stages.
+    """
+
+    def __init__(self, stages, queue_size=8):
+        if not stages:
+            raise ValueError("StagedPipeline needs at least one stage")
+        self.stages = [(name, func, max(1, int(workers))) for name, func, workers in stages]
+        self.queue_size = max(1, int(queue_size))
+
+    def run(self, items, on_done=None):
+        """
+        Push every item through the pipeline and block until all are finished.
+
+        Args:
+            items: Iterable of work items (e.g. article URLs)
+            on_done: Optional callback ``on_done(item, value, error)`` invoked
+                exactly once per item, from a worker thread, when the item
+                leaves the pipeline (completed, dropped or failed)
+
+        Returns:
+            List of ``(item, value)`` pairs for items that completed every stage
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        completed = []
+        completed_lock = threading.Lock()
+
+        def finish(item, value, error):
+            if error is None and value is not None:
+                with completed_lock:
+                    completed.append((item, value))
+            if on_done:
+                try:
+                    on_done(item, value, error)
+                except Exception as e:
+                    print(f"  ⚠️  Pipeline callback failed for {item}: {e}")
+
+        threads = []
+        for index, (name, func, workers) in enumerate(self.stages):
+            is_last = index == len(self.stages) - 1
+            next_queue = None if is_last else queues[index + 1]
+            next_workers = 0 if is_last else self.stages[index + 1][2]
+            # The last worker of a stage to exit forwards the stop markers
+            remaining = {'count': workers}
+            remaining_lock = threading.Lock()
+
+            def worker(func=func, in_queue=queues[index], next_queue=next_queue,
+                       next_workers=next_workers, remaining=remaining,
+                       remaining_lock=remaining_lock, stage_name=name):
+                while True:
+                    job = in_queue.get()
+                    if job is _STOP:
+                        break
+                    item, value = job
+                    try:
+                        value = func(item, value)
+                    except Exception as e:
+                        print(f"  ❌ Stage '{stage_name}' failed for {item}: {e}")
+                        finish(item, None, e)
+                        continue
+                    if value is None or next_queue is None:
+                        finish(item, value, None)
+                    else:
+                        next_queue.put((item, value))
+
+                with remaining_lock:
+                    remaining['count'] -= 1
+                    last_out = remaining['count'] == 0
+                if last_out and next_queue is not None:
+                    for _ in range(next_workers):
+                        next_queue.put(_STOP)
+
+            for n in range(workers):
+                thread = threading.Thread(target=worker, name=f"pipeline-{name}-{n}")
+                thread.daemon = True
+                thread.start()
+                threads.append(thread)
+
+        for item in items:
+            queues[0].put((item, None))
+        for _ in range(self.stages[0][2]):
+            queues[0].put(_STOP)
+
+        for thread in threads:
+            thread.join()
+
+        return completed
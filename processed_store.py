@@ -0,0 +1,274 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import url_canon
+from bloom_filter import BloomFilter
+
+# SQLite database of processed article URLs, keyed by competitor and canonical URL
+PROCESSED_DB = os.environ.get('PROCESSED_DB', 'processed_urls.db')
+# ProcessedSet.add() buffers URLs and writes them in batches of this size
+PROCESSED_FLUSH_EVERY = int(os.environ.get('PROCESSED_FLUSH_EVERY', '20'))
+
+# In-memory Bloom filter in front of the database, rebuilt from it when a
+# competitor's set is first opened. A URL the filter has never seen is new
+# without a database lookup, and a hit is trusted as "already processed", so
+# membership checks never touch disk. About PROCESSED_BLOOM_FP_RATE of new
+# URLs hit too: crawl_listing confirms the hit it stops at (ProcessedSet.confirmed),
+# and PROCESSED_BLOOM_VERIFY=1 confirms every hit against the database.
+PROCESSED_BLOOM_FP_RATE = float(os.environ.get('PROCESSED_BLOOM_FP_RATE', '0.0001'))
+PROCESSED_BLOOM_VERIFY = os.environ.get('PROCESSED_BLOOM_VERIFY', '0').lower() in ('1', 'true', 'yes')
+PROCESSED_BLOOM_MIN_CAPACITY = int(os.environ.get('PROCESSED_BLOOM_MIN_CAPACITY', '10000'))
+
+# Version of the stored key format (see canonical); older keys are rewritten on open
+KEY_VERSION = 1
+
+# SQLite caps the number of bound parameters per statement
+_QUERY_BATCH = 500
+
+# The old text cache files hold URLs separated by newlines, spaces or a
+# literal backslash-n (written by an earlier save_processed_url)
+_LEGACY_SEPARATOR_RE = re.compile(r'\s+|\\n')
+
+_lock = threading.Lock()
+_conn = None
+_sets = {}
+
+
+def _connect():
+    """Opens the database once per process (WAL, so readers never block the writer)."""
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(PROCESSED_DB, check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("PRAGMA synchronous=NORMAL")
+        _conn.execute("""CREATE TABLE IF NOT EXISTS processed (
+            competitor TEXT NOT NULL,
+            url TEXT NOT NULL,
+            processed_at REAL NOT NULL,
+            PRIMARY KEY (competitor, url)) WITHOUT ROWID""")
+        _conn.execute("""CREATE TABLE IF NOT EXISTS imported_files (
+            path TEXT PRIMARY KEY,
+            competitor TEXT NOT NULL,
+            url_count INTEGER NOT NULL,
+            imported_at REAL NOT NULL)""")
+        if _conn.execute("PRAGMA user_version").fetchone()[0] < KEY_VERSION:
+            _migrate_keys(_conn)
+        _conn.commit()
+    return _conn
+
+
+def _migrate_keys(conn):
+    """Rewrites stored URLs into the current key format."""
+    rows = conn.execute("SELECT competitor, url, processed_at FROM processed").fetchall()
+    if rows:
+        conn.execute("DELETE FROM processed")
+        conn.executemany("INSERT OR IGNORE INTO processed (competitor, url, processed_at) VALUES (?, ?, ?)",
+                         [(competitor, canonical(url), processed_at) for competitor, url, processed_at in rows])
+        print(f"🔁 Re-keyed {len(rows)} processed URLs")
+    conn.execute(f"PRAGMA user_version = {KEY_VERSION}")
+
+
+def canonical(url: str) -> str:
+    """Key under which a URL is stored (see url_canon.dedup_key)."""
+    return url_canon.dedup_key(url)
+
+
+def contains(competitor: str, url: str) -> bool:
+    """Primary-key lookup; nothing is loaded into memory."""
+    with _lock:
+        row = _connect().execute("SELECT 1 FROM processed WHERE competitor = ? AND url = ?",
+                                 (competitor, canonical(url))).fetchone()
+    return row is not None
+
+
+def filter_new(competitor: str, urls) -> list:
+    """Returns the URLs (in their given order) that have not been processed yet."""
+    urls = list(urls)
+    keys = {url: canonical(url) for url in urls}
+    unique_keys = list(set(keys.values()))
+    seen = set()
+    with _lock:
+        conn = _connect()
+        for start in range(0, len(unique_keys), _QUERY_BATCH):
+            batch = unique_keys[start:start + _QUERY_BATCH]
+            placeholders = ','.join('?' * len(batch))
+            seen.update(row[0] for row in conn.execute(
+                f"SELECT url FROM processed WHERE competitor = ? AND url IN ({placeholders})",
+                [competitor] + batch))
+    return [url for url in urls if keys[url] not in seen]
+
+
+def add_many(competitor: str, urls) -> int:
+    """Marks URLs as processed in one transaction; returns how many were new."""
+    now = time.time()
+    rows = [(competitor, canonical(url), now) for url in urls if url]
+    if not rows:
+        return 0
+    with _lock:
+        conn = _connect()
+        before = conn.total_changes
+        conn.executemany("INSERT OR IGNORE INTO processed (competitor, url, processed_at) VALUES (?, ?, ?)", rows)
+        conn.commit()
+        return conn.total_changes - before
+
+
+def count(competitor: str) -> int:
+    with _lock:
+        return _connect().execute("SELECT COUNT(*) FROM processed WHERE competitor = ?",
+                                  (competitor,)).fetchone()[0]
+
+
+def import_text_file(competitor: str, path: str, force=False) -> int:
+    """
+    One-time import of an old ``*_articles.txt`` cache file.
+
+    A file is imported once (remembered by path); later calls are no-ops
+    unless force is set. The text file itself is left untouched.
+
+    Returns:
+        Number of URLs that were new to the store
+    """
+    if not path or not os.path.exists(path):
+        return 0
+    key = os.path.abspath(path)
+    if not force:
+        with _lock:
+            if _connect().execute("SELECT 1 FROM imported_files WHERE path = ?", (key,)).fetchone():
+                return 0
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            urls = [url for url in _LEGACY_SEPARATOR_RE.split(f.read()) if url.startswith('http')]
+    except Exception as e:
+        print(f"Warning: Could not read cache file {path}: {e}")
+        return 0
+
+    added = add_many(competitor, urls)
+    with _lock:
+        conn = _connect()
+        conn.execute("INSERT OR REPLACE INTO imported_files (path, competitor, url_count, imported_at) VALUES (?, ?, ?, ?)",
+                     (key, competitor, len(urls), time.time()))
+        conn.commit()
+    print(f"📥 Imported {added} processed URLs for {competitor} from {path}")
+    return added
+
+
+class ProcessedSet:
+    """
+    Set-like view of one competitor's processed URLs.
+
+    Supports ``in``, ``len()`` and ``add()``, so it can be passed anywhere
+    a set of known URLs was used before. Membership is answered by the
+    Bloom filter (and, when verifying, the database index); added URLs are
+    buffered and written in batches. Use open_set() to share one instance
+    (and one filter) per competitor.
+    """
+
+    def __init__(self, competitor: str, legacy_file: str = None):
+        self.competitor = competitor
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        self.memory_answers = 0
+        self.disk_lookups = 0
+        if legacy_file:
+            import_text_file(competitor, legacy_file)
+        self._bloom = None
+        self._rebuild_bloom()
+
+    def _rebuild_bloom(self):
+        """Builds the filter from the database, sized with room to grow."""
+        self.flush()
+        with _lock:
+            conn = _connect()
+            total = conn.execute("SELECT COUNT(*) FROM processed WHERE competitor = ?",
+                                 (self.competitor,)).fetchone()[0]
+            bloom = BloomFilter(max(PROCESSED_BLOOM_MIN_CAPACITY, total * 2), PROCESSED_BLOOM_FP_RATE)
+            for (key,) in conn.execute("SELECT url FROM processed WHERE competitor = ?", (self.competitor,)):
+                bloom.add(key)
+        with self._pending_lock:
+            for key in self._pending:
+                bloom.add(key)
+            self._bloom = bloom
+
+    def _has_key(self, key, verify=None):
+        if key not in self._bloom:
+            # Never added: certainly new, no disk access
+            self.memory_answers += 1
+            return False
+        if not (PROCESSED_BLOOM_VERIFY if verify is None else verify):
+            self.memory_answers += 1
+            return True
+        with self._pending_lock:
+            if key in self._pending:
+                return True
+        self.disk_lookups += 1
+        with _lock:
+            row = _connect().execute("SELECT 1 FROM processed WHERE competitor = ? AND url = ?",
+                                     (self.competitor, key)).fetchone()
+        return row is not None
+
+    def __contains__(self, url):
+        return self._has_key(canonical(url))
+
+    def confirmed(self, url):
+        """Membership without Bloom false positives, whatever PROCESSED_BLOOM_VERIFY says."""
+        return self._has_key(canonical(url), verify=True)
+
+    def __len__(self):
+        self.flush()
+        return count(self.competitor)
+
+    def add(self, url):
+        key = canonical(url)
+        with self._pending_lock:
+            self._pending.add(key)
+            self._bloom.add(key)
+            full = len(self._pending) >= PROCESSED_FLUSH_EVERY
+        if full:
+            self.flush()
+        if self._bloom.is_full():
+            self._rebuild_bloom()
+
+    def filter_new(self, urls) -> list:
+        """Membership check for a whole listing, keeping the given order."""
+        urls = list(urls)
+        if not PROCESSED_BLOOM_VERIFY:
+            return [url for url in urls if not self._has_key(canonical(url))]
+        # Only filter hits need confirming, in one batched query
+        candidates = [url for url in urls if canonical(url) in self._bloom]
+        self.flush()
+        self.disk_lookups += len(candidates)
+        still_new = set(filter_new(self.competitor, candidates))
+        self.memory_answers += len(urls) - len(candidates)
+        return [url for url in urls if url in still_new or canonical(url) not in self._bloom]
+
+    def flush(self):
+        """Writes buffered URLs to the database."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, set()
+        if pending:
+            add_many(self.competitor, pending)
+
+    def stats(self) -> dict:
+        return {
+            'bloom_keys': self._bloom.count,
+            'bloom_capacity': self._bloom.capacity,
+            'bloom_bytes': self._bloom.size_bytes(),
+            'bloom_fp_rate': self._bloom.error_rate,
+            'memory_answers': self.memory_answers,
+            'disk_lookups': self.disk_lookups,
+        }
+
+
+def open_set(competitor: str, legacy_file: str = None) -> ProcessedSet:
+    """Returns the process-wide ProcessedSet of a competitor, building its filter on first use."""
+    with _lock:
+        processed = _sets.get(competitor)
+    if processed is None:
+        processed = ProcessedSet(competitor, legacy_file)
+        with _lock:
+            processed = _sets.setdefault(competitor, processed)
+    return processed
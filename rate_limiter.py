@@ -0,0 +1,140 @@
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Per-host token bucket configuration (requests per second)
+RATE_LIMIT_INITIAL = float(os.environ.get('RATE_LIMIT_INITIAL', '2'))
+RATE_LIMIT_MIN = float(os.environ.get('RATE_LIMIT_MIN', '0.2'))
+RATE_LIMIT_MAX = float(os.environ.get('RATE_LIMIT_MAX', '10'))
+RATE_LIMIT_BURST = float(os.environ.get('RATE_LIMIT_BURST', '4'))
+# AIMD: add this much rate per successful request, multiply by this on throttling
+RATE_LIMIT_INCREASE = float(os.environ.get('RATE_LIMIT_INCREASE', '0.25'))
+RATE_LIMIT_DECREASE = float(os.environ.get('RATE_LIMIT_DECREASE', '0.5'))
+# Responses slower than this are treated as the site asking us to back off
+RATE_LIMIT_SLOW_SECONDS = float(os.environ.get('RATE_LIMIT_SLOW_SECONDS', '5'))
+
+# Retry policy for throttled / failed requests
+HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', '3'))
+HTTP_BACKOFF_BASE = float(os.environ.get('HTTP_BACKOFF_BASE', '1'))
+HTTP_BACKOFF_MAX = float(os.environ.get('HTTP_BACKOFF_MAX', '30'))
+
+# Status codes that mean "too fast" and shrink the host's rate
+THROTTLE_STATUSES = (429, 503)
+# Status codes worth retrying
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class HostLimiter:
+    """Token bucket for one host whose refill rate adapts AIMD-style."""
+
+    def __init__(self, host):
+        self.host = host
+        self.rate = RATE_LIMIT_INITIAL
+        self.capacity = max(1.0, RATE_LIMIT_BURST)
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.blocked_until = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.slow = 0
+        self.retries = 0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def acquire(self):
+        """Blocks until a request to this host is allowed."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    self.requests += 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self, elapsed=None):
+        """Additive increase, unless the response was slow."""
+        with self.lock:
+            if elapsed is not None and elapsed > RATE_LIMIT_SLOW_SECONDS:
+                self.slow += 1
+                self.rate = max(RATE_LIMIT_MIN, self.rate * RATE_LIMIT_DECREASE)
+            else:
+                self.rate = min(RATE_LIMIT_MAX, self.rate + RATE_LIMIT_INCREASE)
+
+    def on_throttle(self, retry_after=None):
+        """Multiplicative decrease; pauses the whole host for Retry-After seconds."""
+        with self.lock:
+            self.throttled += 1
+            self.rate = max(RATE_LIMIT_MIN, self.rate * RATE_LIMIT_DECREASE)
+            # Drain the bucket so queued callers do not burst straight back in
+            self.tokens = 0
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+    def on_retry(self):
+        with self.lock:
+            self.retries += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'rate': round(self.rate, 3),
+                'requests': self.requests,
+                'throttled': self.throttled,
+                'slow': self.slow,
+                'retries': self.retries,
+                'blocked_for': round(max(0.0, self.blocked_until - time.monotonic()), 1),
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(host: str) -> HostLimiter:
+    """Returns the limiter for a host, creating it on first use."""
+    host = (host or '').lower()
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = HostLimiter(host)
+        return limiter
+
+
+def parse_retry_after(value):
+    """Parses a Retry-After header (seconds or HTTP date) into seconds, or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter for the given retry attempt (0-based)."""
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * (2 ** attempt)))
+
+
+def stats() -> dict:
+    """Current rate and throttle counters for every host seen so far."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.host: limiter.snapshot() for limiter in limiters}
@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import requests
+
+import url_canon
+
+# Cache configuration
+# HTTP_CACHE_MODE: 'on' (read-through cache), 'off' (always hit the network)
+# or 'replay' (serve only from the cache, never touch the network)
+HTTP_CACHE_MODE = os.environ.get('HTTP_CACHE_MODE', 'on').lower()
+HTTP_CACHE_DIR = os.environ.get('HTTP_CACHE_DIR', '.http_cache')
+HTTP_CACHE_TTL = float(os.environ.get('HTTP_CACHE_TTL', str(24 * 3600)))  # freshness, seconds
+HTTP_CACHE_RETENTION = float(os.environ.get('HTTP_CACHE_RETENTION', str(30 * 24 * 3600)))  # kept for replay
+HTTP_CACHE_MAX_BYTES = int(os.environ.get('HTTP_CACHE_MAX_BYTES', str(200 * 1024 * 1024)))
+
+# Run an eviction pass after this many stores
+EVICT_EVERY = 50
+
+# Response headers worth keeping alongside the body
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+_lock = threading.Lock()
+_conn = None
+_stores_since_evict = 0
+
+
+class ReplayMiss(requests.ConnectionError):
+    """Raised in replay mode when a URL has never been cached."""
+
+
+def _blob_path(content_hash: str) -> str:
+    return os.path.join(HTTP_CACHE_DIR, 'blobs', content_hash[:2], f"{content_hash}.z")
+
+
+def _connect():
+    """Opens the index database once per process."""
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.join(HTTP_CACHE_DIR, 'blobs'), exist_ok=True)
+        _conn = sqlite3.connect(os.path.join(HTTP_CACHE_DIR, 'index.sqlite'), check_same_thread=False)
+        _conn.execute("""CREATE TABLE IF NOT EXISTS entries (
+            url TEXT PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            status INTEGER NOT NULL,
+            headers TEXT NOT NULL,
+            stored_at REAL NOT NULL,
+            accessed_at REAL NOT NULL)""")
+        _conn.execute("""CREATE TABLE IF NOT EXISTS blobs (
+            content_hash TEXT PRIMARY KEY,
+            size INTEGER NOT NULL)""")
+        _conn.execute("CREATE INDEX IF NOT EXISTS entries_hash ON entries(content_hash)")
+        _conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed_at)")
+        _conn.commit()
+    return _conn
+
+
+def _build_response(url, status, headers, body):
+    """Wraps a cached body in a requests.Response so callers cannot tell the difference."""
+    response = requests.Response()
+    response.status_code = status
+    response.url = url
+    response._content = body
+    response.headers.update(headers)
+    response.headers['X-ACFWS-Cache'] = 'hit'
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+def lookup(url: str, max_age=None):
+    """
+    Returns a cached requests.Response for the URL, or None.
+
+    Args:
+        url: The URL to look up (canonicalized before lookup)
+        max_age: Maximum entry age in seconds; None accepts any age
+    """
+    key = url_canon.canonicalize_url(url) or url.strip()
+    with _lock:
+        conn = _connect()
+        row = conn.execute("SELECT content_hash, status, headers, stored_at FROM entries WHERE url = ?",
+                           (key,)).fetchone()
+        if row is None:
+            return None
+        content_hash, status, headers, stored_at = row
+        if max_age is not None and time.time() - stored_at > max_age:
+            return None
+        try:
+            with open(_blob_path(content_hash), 'rb') as f:
+                body = zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            conn.execute("DELETE FROM entries WHERE url = ?", (key,))
+            conn.commit()
+            return None
+        conn.execute("UPDATE entries SET accessed_at = ? WHERE url = ?", (time.time(), key))
+        conn.commit()
+    return _build_response(url, status, json.loads(headers), body)
+
+
+def store(url: str, response):
+    """Stores a successful response; identical bodies share one compressed blob."""
+    if response.status_code != 200:
+        return
+    store_body(url, response.status_code, response.headers, response.content)
+
+
+def store_body(url: str, status: int, response_headers, body: bytes):
+    """Stores a body that was read separately (e.g. streamed in chunks)."""
+    global _stores_since_evict
+    key = url_canon.canonicalize_url(url) or url.strip()
+    content_hash = hashlib.sha256(body).hexdigest()
+    headers = {name: response_headers[name] for name in KEPT_HEADERS if name in response_headers}
+    now = time.time()
+
+    with _lock:
+        conn = _connect()
+        path = _blob_path(content_hash)
+        if conn.execute("SELECT 1 FROM blobs WHERE content_hash = ?", (content_hash,)).fetchone() is None \
+                or not os.path.exists(path):
+            compressed = zlib.compress(body, 6)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+            conn.execute("INSERT OR REPLACE INTO blobs (content_hash, size) VALUES (?, ?)",
+                         (content_hash, len(compressed)))
+        conn.execute("""INSERT OR REPLACE INTO entries (url, content_hash, status, headers, stored_at, accessed_at)
+                        VALUES (?, ?, ?, ?, ?, ?)""",
+                     (key, content_hash, status, json.dumps(headers), now, now))
+        conn.commit()
+        _stores_since_evict += 1
+        run_eviction = _stores_since_evict >= EVICT_EVERY
+
+    if run_eviction:
+        evict()
+
+
+def evict(retention=None, max_bytes=None):
+    """
+    Drops entries older than the retention period, then least recently used
+    entries until the blobs fit in max_bytes. Unreferenced blobs are deleted.
+
+    Returns:
+        Number of entries removed
+    """
+    global _stores_since_evict
+    retention = HTTP_CACHE_RETENTION if retention is None else retention
+    max_bytes = HTTP_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+
+    with _lock:
+        conn = _connect()
+        _stores_since_evict = 0
+        removed = conn.execute("DELETE FROM entries WHERE stored_at < ?", (time.time() - retention,)).rowcount
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total > max_bytes:
+            # Least recently used first; a blob is only freed once no entry uses it
+            for url, content_hash in conn.execute("SELECT url, content_hash FROM entries ORDER BY accessed_at").fetchall():
+                if total <= max_bytes:
+                    break
+                conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+                removed += 1
+                if conn.execute("SELECT 1 FROM entries WHERE content_hash = ?", (content_hash,)).fetchone() is None:
+                    size = conn.execute("SELECT size FROM blobs WHERE content_hash = ?", (content_hash,)).fetchone()
+                    total -= size[0] if size else 0
+
+        orphans = conn.execute("""SELECT content_hash FROM blobs
+                                  WHERE content_hash NOT IN (SELECT content_hash FROM entries)""").fetchall()
+        for (content_hash,) in orphans:
+            try:
+                os.remove(_blob_path(content_hash))
+            except OSError:
+                pass
+            conn.execute("DELETE FROM blobs WHERE content_hash = ?", (content_hash,))
+        conn.commit()
+    return removed
+
+
+def stats() -> dict:
+    """Returns entry/blob counts and the compressed size on disk."""
+    with _lock:
+        conn = _connect()
+        entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        blobs, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+    return {'mode': HTTP_CACHE_MODE, 'entries': entries, 'blobs': blobs, 'bytes': size}
@@ -0,0 +1,138 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+# Analysis results, appended as each article finishes
+RESULTS_DB = os.environ.get('RESULTS_DB', 'results.db')
+
+# Columns a result dict is stored in; anything else goes into the 'extra' JSON
+_COLUMNS = ('url', 'competitor', 'source', 'title', 'summary', 'analysis', 'category',
+            'is_new_feature', 'relevance_score', 'original_publish_date', 'timestamp', 'key_features')
+
+_lock = threading.Lock()
+_conn = None
+
+
+def _connect():
+    """Opens the database once per process (WAL, so page renders never block the pipeline)."""
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(RESULTS_DB, check_same_thread=False)
+        _conn.row_factory = sqlite3.Row
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("""CREATE TABLE IF NOT EXISTS results (
+            id INTEGER PRIMARY KEY,
+            url TEXT NOT NULL,
+            competitor TEXT NOT NULL,
+            source TEXT,
+            title TEXT,
+            summary TEXT,
+            analysis TEXT,
+            category TEXT,
+            is_new_feature INTEGER NOT NULL DEFAULT 0,
+            relevance_score INTEGER NOT NULL DEFAULT 0,
+            original_publish_date TEXT,
+            timestamp TEXT,
+            key_features TEXT,
+            extra TEXT)""")
+        for column in ('competitor', 'original_publish_date', 'is_new_feature', 'category', 'relevance_score'):
+            _conn.execute(f"CREATE INDEX IF NOT EXISTS results_{column} ON results({column})")
+        _conn.commit()
+    return _conn
+
+
+def _date_text(value):
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return value or ''
+
+
+def append(result, competitor):
+    """Stores one parsed result (as returned by parse_analysis_result); returns its id."""
+    row = dict(result, competitor=competitor)
+    extra = {key: value for key, value in row.items() if key not in _COLUMNS}
+    values = [
+        row.get('url'), competitor, row.get('source'), row.get('title'), row.get('summary'),
+        row.get('analysis'), row.get('category'), int(bool(row.get('is_new_feature'))),
+        int(row.get('relevance_score') or 0), _date_text(row.get('original_publish_date')),
+        row.get('timestamp'), json.dumps(row.get('key_features') or []),
+        json.dumps(extra, default=str) if extra else None,
+    ]
+    with _lock:
+        conn = _connect()
+        cursor = conn.execute(f"INSERT INTO results ({', '.join(_COLUMNS)}, extra) "
+                              f"VALUES ({', '.join('?' * (len(_COLUMNS) + 1))})", values)
+        conn.commit()
+        return cursor.lastrowid
+
+
+def _to_dict(row):
+    result = dict(row)
+    extra = result.pop('extra', None)
+    if extra:
+        result.update(json.loads(extra))
+    result['is_new_feature'] = bool(result['is_new_feature'])
+    result['key_features'] = json.loads(result['key_features'] or '[]')
+    return result
+
+
+def _where(competitor=None, new_only=False, category=None, min_score=None):
+    clauses, params = [], []
+    if competitor:
+        clauses.append("competitor = ?")
+        params.append(competitor)
+    if new_only:
+        clauses.append("is_new_feature = 1")
+    if category:
+        clauses.append("category = ?")
+        params.append(category)
+    if min_score is not None:
+        clauses.append("relevance_score >= ?")
+        params.append(min_score)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def query(competitor=None, new_only=False, category=None, min_score=None,
+          order_by='id', limit=50, offset=0):
+    """
+    Reads results through the indexes, newest first.
+
+    Args:
+        competitor: COMPETITORS key to filter on
+        new_only: Only results announcing a new feature
+        category: Exact category
+        min_score: Minimum relevance score
+        order_by: 'id' (analysis order), 'original_publish_date' or 'relevance_score'
+        limit / offset: Page window; limit=None returns everything
+    """
+    if order_by not in ('id', 'original_publish_date', 'relevance_score'):
+        raise ValueError(f"Unsupported order: {order_by}")
+    where, params = _where(competitor, new_only, category, min_score)
+    sql = f"SELECT * FROM results{where} ORDER BY {order_by} DESC, id DESC"
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params += [limit, offset]
+    with _lock:
+        rows = _connect().execute(sql, params).fetchall()
+    return [_to_dict(row) for row in rows]
+
+
+def count(competitor=None, new_only=False, category=None, min_score=None):
+    where, params = _where(competitor, new_only, category, min_score)
+    with _lock:
+        return _connect().execute(f"SELECT COUNT(*) FROM results{where}", params).fetchone()[0]
+
+
+def summary():
+    """Dashboard counters: total results and how many announce new features."""
+    return {'total': count(), 'new_features': count(new_only=True)}
+
+
+def clear():
+    """Deletes every stored result."""
+    with _lock:
+        conn = _connect()
+        conn.execute("DELETE FROM results")
+        conn.commit()
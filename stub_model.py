@@ -0,0 +1,139 @@
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import time
+
+# Local stand-in for the Gemini model (GEMINI_MODEL=stub), for exercising the
+# analysis path and llm_dispatcher without an API key or quota
+LLM_STUB_LATENCY = float(os.environ.get('LLM_STUB_LATENCY', '1.0'))              # seconds per request
+LLM_STUB_JITTER = float(os.environ.get('LLM_STUB_JITTER', '0.2'))                # +/- seconds
+LLM_STUB_ERROR_RATE = float(os.environ.get('LLM_STUB_ERROR_RATE', '0'))          # share of server errors
+LLM_STUB_QUOTA_ERROR_RATE = float(os.environ.get('LLM_STUB_QUOTA_ERROR_RATE', '0'))  # share of 429s
+
+_ARTICLE_MARKER_RE = re.compile(r'^=== ARTICLE (\d+) ===$', re.MULTILINE)
+
+
+class StubQuotaError(Exception):
+    """Mimics Gemini's 429 ResourceExhausted."""
+    code = 429
+
+
+class StubServerError(Exception):
+    code = 500
+
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubStreamResponse:
+    """Answer delivered in chunks, like generate_content(..., stream=True); iterate sync or async."""
+
+    def __init__(self, text, chunk_delay=0.0, chunk_chars=40):
+        self.text = text
+        self._chunks = [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)]
+        self._delay = chunk_delay / max(1, len(self._chunks))
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            time.sleep(self._delay)
+            yield StubResponse(chunk)
+
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            await asyncio.sleep(self._delay)
+            yield StubResponse(chunk)
+
+
+class StubModel:
+    """
+    Answers prompts after a configurable delay with a well-formed analysis
+    (one per article for batched prompts; JSON when the generation config
+    asks for it; in chunks with stream=True), failing a configurable share of requests with quota or
+    server errors.
+    """
+
+    def __init__(self, latency=None, jitter=None, error_rate=None, quota_error_rate=None, seed=None):
+        self.latency = LLM_STUB_LATENCY if latency is None else latency
+        self.jitter = LLM_STUB_JITTER if jitter is None else jitter
+        self.error_rate = LLM_STUB_ERROR_RATE if error_rate is None else error_rate
+        self.quota_error_rate = LLM_STUB_QUOTA_ERROR_RATE if quota_error_rate is None else quota_error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+
+    def _delay(self):
+        with self._lock:
+            self.calls += 1
+            return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def _respond(self, prompt, generation_config=None):
+        with self._lock:
+            roll = self._random.random()
+            if roll < self.quota_error_rate:
+                self.failures += 1
+                raise StubQuotaError("429 Resource has been exhausted (e.g. check quota).")
+            if roll < self.quota_error_rate + self.error_rate:
+                self.failures += 1
+                raise StubServerError("500 An internal error has occurred.")
+        numbers = [int(n) for n in _ARTICLE_MARKER_RE.findall(prompt)]
+        if (generation_config or {}).get('response_mime_type') == 'application/json':
+            if not numbers:
+                return StubResponse(json.dumps(_record(prompt)))
+            return StubResponse(json.dumps([dict(_record(prompt + str(n)), article=n) for n in numbers]))
+        if not numbers:
+            return StubResponse(_analysis(prompt))
+        return StubResponse("\n\n".join(f"=== ANALYSIS {n} ===\n{_analysis(prompt + str(n))}" for n in numbers))
+
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        delay = self._delay()
+        if stream:
+            # Half the latency before the first chunk, the rest spread over the chunks
+            time.sleep(delay / 2)
+            return StubStreamResponse(self._respond(prompt, generation_config).text, delay / 2)
+        time.sleep(delay)
+        return self._respond(prompt, generation_config)
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        delay = self._delay()
+        if stream:
+            await asyncio.sleep(delay / 2)
+            return StubStreamResponse(self._respond(prompt, generation_config).text, delay / 2)
+        await asyncio.sleep(delay)
+        return self._respond(prompt, generation_config)
+
+
+def _record(seed_text):
+    score = sum(seed_text.encode('utf-8')) % 10 + 1
+    return {
+        'is_new_feature': score >= 6,
+        'feature_name': f"Stub Feature {score}",
+        'category': 'Testing',
+        'target_market': 'Singapore',
+        'summary': 'Stub analysis produced locally without calling Gemini.',
+        'competitive_intelligence': 'None, this is a stub response.',
+        'key_features': [f"Stub capability {score}"],
+        'relevance_score': score,
+    }
+
+
+def _analysis(seed_text):
+    record = _record(seed_text)
+    return f"""**FEATURE ANALYSIS:**
+- Is this announcing a new feature or product? {'Yes' if record['is_new_feature'] else 'No'}
+- Feature/Product Name: {record['feature_name']}
+- Category: Testing
+- Target Market: Singapore
+
+**SUMMARY:**
+Stub analysis produced locally without calling Gemini.
+
+**COMPETITIVE INTELLIGENCE:**
+None, this is a stub response.
+
+**RELEVANCE SCORE:** {record['relevance_score']}"""
@@ -0,0 +1,56 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import http_client
+import mvp_demo
+import response_cache
+
+# The article body closes long before the page ends, so extraction stops early
+ARTICLE = ('<html><body><div class="entry-content"><p>Grab launches GrabPay Later for riders.</p></div>'
+           + '<footer>' + 'x' * 200000 + '</footer></body></html>').encode('utf-8')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    requests_served = 0
+
+    def do_GET(self):
+        _Handler.requests_served += 1
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(ARTICLE)))
+        self.end_headers()
+        self.wfile.write(ARTICLE)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def article_url(monkeypatch):
+    # web_app's setup_proxy may have pointed the environment at a local proxy
+    monkeypatch.setenv('NO_PROXY', '127.0.0.1')
+    monkeypatch.setenv('no_proxy', '127.0.0.1')
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/press/launch/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_article_fetched_with_cache_on_replays_offline(article_url, tmp_path, monkeypatch):
+    monkeypatch.setattr(response_cache, 'HTTP_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(response_cache, '_conn', None)
+    monkeypatch.setattr(http_client, 'HTTP_STREAM_CHUNK_SIZE', 1024)
+
+    monkeypatch.setattr(response_cache, 'HTTP_CACHE_MODE', 'on')
+    recorded = mvp_demo.get_article_text(article_url)
+    assert recorded == 'Grab launches GrabPay Later for riders.'
+    assert response_cache.lookup(article_url).content == ARTICLE
+
+    served = _Handler.requests_served
+    monkeypatch.setattr(response_cache, 'HTTP_CACHE_MODE', 'replay')
+    assert mvp_demo.get_article_text(article_url) == recorded
+    assert _Handler.requests_served == served
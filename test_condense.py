@@ -0,0 +1,66 @@
+import condense
+import html_parser
+
+
+def test_estimate_tokens_counts_words_and_punctuation():
+    assert html_parser.estimate_tokens("Grab launches GrabPay, today!") == 6
+
+
+def test_estimate_tokens_counts_cjk_and_thai_per_character():
+    assert html_parser.estimate_tokens("你好世界。") == 5
+    assert html_parser.estimate_tokens("สวัสดีครับ" * 150) == 1500
+    assert html_parser.estimate_tokens("Grab在新加坡推出新功能") == 10
+
+
+def test_truncate_tokens():
+    assert html_parser.truncate_tokens("one two three", 2) == "one two"
+    assert html_parser.truncate_tokens("你好世界", 2) == "你好"
+    assert html_parser.truncate_tokens("short", 10) == "short"
+
+
+def test_split_sentences_latin_and_cjk():
+    assert condense.split_sentences("第一句。第二句！第三句？ Fourth one. Fifth") == \
+        ["第一句。", "第二句！", "第三句？", "Fourth one.", "Fifth"]
+    assert condense.split_sentences("Version 2.0 is out.\nNext block") == ["Version 2.0 is out.", "Next block"]
+
+
+def test_condense_leaves_text_within_budget_unchanged():
+    text = "Grab launches a new payments feature for merchants in Singapore."
+    assert condense.condense(text, token_budget=100, max_chars=0) == text
+
+
+def test_condense_keeps_title_sentences_within_budget():
+    text = ("The company reported quarterly results today. " * 20 +
+            "Grab launches GrabPay Later for merchants in Singapore. " +
+            "Investors attended the annual meeting. " * 20)
+    out = condense.condense(text, title="Grab launches GrabPay Later", token_budget=40, max_chars=0)
+    assert html_parser.estimate_tokens(out) <= 40
+    assert "GrabPay Later" in out
+    assert condense.condense(out, title="Grab launches GrabPay Later", token_budget=40, max_chars=0) == out
+
+
+def test_condense_applies_budget_to_cjk_text():
+    text = "格步今天在新加坡推出了新的支付功能。" * 20 + "该公司发布了季度财报！" * 100
+    out = condense.condense(text, title="格步推出支付功能", token_budget=200, max_chars=0)
+    assert html_parser.estimate_tokens(out) <= 200
+    assert out.startswith("格步今天在新加坡推出了新的支付功能。")
+
+
+def test_condense_cuts_unsplittable_text_to_budget():
+    out = condense.condense("สวัสดีครับ" * 150, token_budget=100, max_chars=0)
+    assert html_parser.estimate_tokens(out) == 100
+
+
+def test_condense_character_cap_drops_whole_sentences():
+    text = ("Grab launches GrabPay Later for merchants in Singapore today. " +
+            "The company also thanked its partners and staff for their hard work this year. " * 60)
+    out = condense.condense(text, title="Grab launches GrabPay Later", token_budget=800, max_chars=400)
+    assert len(out) <= 400
+    assert out.startswith("Grab launches GrabPay Later")
+    assert all(sentence in text for sentence in condense.split_sentences(out))
+    assert out.endswith(".")
+
+
+def test_condense_character_cap_cuts_a_single_sentence_at_a_word():
+    out = condense.condense("word " * 50 + "end", token_budget=1000, max_chars=32)
+    assert out == " ".join(["word"] * 6)
@@ -0,0 +1,58 @@
+import threading
+
+from event_hub import EventHub
+
+
+def test_readers_resume_from_their_last_event_id():
+    hub = EventHub(size=10)
+    for n in range(3):
+        hub.publish({'n': n})
+    events, missed = hub.read(0, timeout=0)
+    assert [event_id for event_id, _ in events] == [1, 2, 3] and missed == 0
+    events, missed = hub.read(2, timeout=0)
+    assert events == [(3, {'n': 2})] and missed == 0
+
+
+def test_ring_buffer_drops_the_oldest_events():
+    hub = EventHub(size=3)
+    for n in range(5):
+        hub.publish(n)
+    events, missed = hub.read(0, timeout=0)
+    assert [event_id for event_id, _ in events] == [3, 4, 5]
+    assert missed == 2
+    assert hub.read(4, timeout=0) == ([(5, 4)], 0)
+
+
+def test_client_ids_carry_the_hub_epoch():
+    hub = EventHub(size=5)
+    for letter in 'abc':
+        hub.publish(letter)
+    assert hub.format_id(2) == f"{hub.epoch}-2"
+    assert hub.parse_id(hub.format_id(2)) == 2
+    assert hub.parse_id('') is None and hub.parse_id('12') is None and hub.parse_id('x-y') is None
+
+
+def test_id_from_before_a_restart_replays_everything():
+    before = EventHub(size=5)
+    for n in range(40):
+        before.publish(n)
+    hub = EventHub(size=5)
+    for letter in 'abc':
+        hub.publish(letter)
+    # A smaller number from the old process must not skip this process's events
+    after_id = hub.parse_id(before.format_id(2))
+    assert after_id == 0
+    events, missed = hub.read(after_id, timeout=0)
+    assert [data for _, data in events] == ['a', 'b', 'c'] and missed == 0
+    assert hub.read(hub.parse_id(before.format_id(40)), timeout=0)[0] == events
+
+
+def test_caught_up_reader_waits_for_the_next_event():
+    hub = EventHub()
+    hub.publish('first')
+    timer = threading.Timer(0.05, hub.publish, args=('second',))
+    timer.start()
+    events, _ = hub.read(1, timeout=2)
+    timer.join()
+    assert events == [(2, 'second')]
+    assert hub.read(2, timeout=0.01) == ([], 0)
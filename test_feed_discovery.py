@@ -0,0 +1,87 @@
+from datetime import datetime
+
+import feed_discovery
+
+RSS = b"""<?xml version="1.0"?><rss version="2.0"><channel>
+<item><title>New feature</title><link>https://grab.com/press/new/</link>
+<pubDate>Mon, 02 Jun 2025 08:00:00 +0000</pubDate><category>Consumers</category>
+<description>&lt;p&gt;GrabPay &lt;b&gt;Later&lt;/b&gt;&lt;/p&gt;</description></item>
+<item><title>Older</title><link>https://grab.com/press/older/</link><pubDate>Wed, 01 Jan 2025 08:00:00 +0000</pubDate></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom">
+<entry><title>Atom post</title><link rel="alternate" href="https://grab.com/press/atom/"/>
+<link rel="edit" href="https://grab.com/edit/1"/><category term="Drivers"/>
+<updated>2025-06-01T10:00:00Z</updated><summary>Summary</summary></entry></feed>"""
+
+SITEMAP = b"""<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+<url><loc>https://grab.com/press/dated-launch/</loc><lastmod>2025-06-03</lastmod></url>
+<url><loc>https://grab.com/press/old-launch/</loc><lastmod>2020-01-01</lastmod></url>
+<url><loc>https://grab.com/press/undated-page/</loc></url></urlset>"""
+
+SITEMAP_INDEX = b"""<?xml version="1.0"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+<sitemap><loc>https://grab.com/press-sitemap.xml</loc><lastmod>2025-06-03</lastmod></sitemap>
+<sitemap><loc>https://grab.com/old-sitemap.xml</loc><lastmod>2019-01-01</lastmod></sitemap></sitemapindex>"""
+
+SINCE = datetime(2025, 5, 1)
+
+
+def _articles(content, since=SINCE):
+    return [value for kind, value in feed_discovery.iter_xml_entries(content, since) if kind == 'article']
+
+
+def test_parse_feed_date_formats():
+    assert feed_discovery.parse_feed_date('2025-06-03') == datetime(2025, 6, 3)
+    assert feed_discovery.parse_feed_date('Mon, 02 Jun 2025 08:00:00 +0000').tzinfo is None
+    assert feed_discovery.parse_feed_date('not a date') is None
+    assert feed_discovery.parse_feed_date('') is None
+
+
+def test_rss_stops_at_first_old_item():
+    articles = _articles(RSS)
+    assert [a['url'] for a in articles] == ['https://grab.com/press/new/']
+    assert articles[0]['category'] == 'Consumers'
+    assert articles[0]['description'] == 'GrabPay Later'
+    assert articles[0]['source'] == 'rss'
+
+
+def test_atom_uses_alternate_link_and_term():
+    (article,) = _articles(ATOM)
+    assert (article['url'], article['category'], article['title']) == ('https://grab.com/press/atom/', 'Drivers', 'Atom post')
+
+
+def test_sitemap_skips_old_and_undated_entries_within_a_window():
+    articles = _articles(SITEMAP)
+    assert [a['url'] for a in articles] == ['https://grab.com/press/dated-launch/']
+    assert articles[0]['title'] == 'Dated Launch'
+
+
+def test_sitemap_without_window_keeps_undated_entries_undated():
+    undated = [a for a in _articles(SITEMAP, since=None) if 'undated' in a['url']]
+    assert undated[0]['publish_date'] is None
+    assert undated[0]['original_date_text'] == 'Unknown'
+
+
+def test_sitemap_index_follows_recent_children():
+    children = [value for kind, value in feed_discovery.iter_xml_entries(SITEMAP_INDEX, SINCE) if kind == 'sitemap']
+    assert children == ['https://grab.com/press-sitemap.xml']
+
+
+def test_discover_articles_merges_sources_newest_first(monkeypatch):
+    sources = {'https://grab.com/feed/': RSS, 'https://grab.com/sitemap.xml': SITEMAP}
+    undated_item = b'<rss><channel><item><title>Undated</title><link>https://grab.com/press/undated-item/</link></item></channel></rss>'
+    sources['https://grab.com/feed2/'] = undated_item
+
+    def fetch_source(url, since, profile=None):
+        return [value for kind, value in feed_discovery.iter_xml_entries(sources[url], since) if kind == 'article'], []
+
+    monkeypatch.setattr(feed_discovery, '_fetch_source', fetch_source)
+    config = {'feeds': ['https://grab.com/feed/', 'https://grab.com/feed2/'], 'sitemaps': ['https://grab.com/sitemap.xml'],
+              'sitemap_filter': '/press/'}
+    urls, _ = feed_discovery.discover_articles(config, known_urls={'https://grab.com/press/atom/'}, since=SINCE)
+    assert urls == ['https://grab.com/press/dated-launch/', 'https://grab.com/press/new/',
+                    'https://grab.com/press/undated-item/']
+
+
+def test_discover_articles_without_sources():
+    assert feed_discovery.discover_articles({'feeds': [], 'sitemaps': []}) is None
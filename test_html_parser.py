@@ -0,0 +1,80 @@
+import http_client
+import html_parser
+
+ARTICLE_PAGE = """<html><head><title>t</title><script>var tracking = 1;</script></head><body>
+<nav><ul><li>Home</li></ul></nav>
+<div class="entry-content"><h1>Grab launches GrabPay Later</h1>
+<p>Users can now <b>split</b> payments.</p><style>.x{color:red}</style><ul><li>No fees</li></ul></div>
+<footer><p>Copyright</p></footer></body></html>"""
+
+
+def test_stream_article_text_reads_entry_content():
+    text, found_body = html_parser.stream_article_text([ARTICLE_PAGE])
+    assert found_body
+    assert text == 'Grab launches GrabPay Later Users can now split payments. No fees'
+
+
+def test_stream_article_text_falls_back_to_body_without_scripts():
+    page = '<html><body><div>Plain page</div><script>alert(1)</script><noscript>Enable JS</noscript><p>text</p></body></html>'
+    text, found_body = html_parser.stream_article_text([page])
+    assert not found_body
+    assert text == 'Plain page text'
+
+
+def test_stream_article_text_stops_at_budget():
+    chunks = [ARTICLE_PAGE[i:i + 16].encode('utf-8') for i in range(0, len(ARTICLE_PAGE), 16)]
+    text, _ = html_parser.stream_article_text(chunks, max_chars=20)
+    assert text == 'Grab launches GrabPa'
+
+
+def test_stream_article_text_decodes_response_charset():
+    body = '<html><body><article><p>ราคาพิเศษ cafe</p></article></body></html>'.encode('tis-620')
+    charset = http_client.response_charset({'Content-Type': 'text/html; charset=TIS-620'})
+    text, _ = html_parser.stream_article_text([body[:20], body[20:]], encoding=charset)
+    assert text == 'ราคาพิเศษ cafe'
+
+
+def test_response_charset_defaults_to_utf8():
+    assert http_client.response_charset({'Content-Type': 'text/html; charset="ISO-8859-1"'}) == 'iso8859-1'
+    assert http_client.response_charset({'Content-Type': 'text/html'}) == 'utf-8'
+    assert http_client.response_charset({'Content-Type': 'text/html; charset=no-such-charset'}) == 'utf-8'
+    assert http_client.response_charset({}) == 'utf-8'
+
+
+def test_next_link_found_whatever_the_attribute_order():
+    assert html_parser._find_next_href('<link rel="next" href="/press/page/2/">') == '/press/page/2/'
+    assert html_parser._find_next_href('<a class="more" rel=next href=/press/page/3/>') == '/press/page/3/'
+    assert html_parser._find_next_href('<link rel="prev" href="/a/"><a href="/b/" rel="next nofollow">') == '/b/'
+
+
+LISTING_PAGE = """<html><head><link rel="next" href="/press/page/2/"></head><body>
+<a class="blogHyperlink" href="/press/consumers/launch/"><article class="panel-article">
+<h2>Grab <script>var tracking = 1;</script>launches</h2><span class="post-date">1 Jan 2025</span>
+<span class="post-cat">Consumers</span><p><ul><li>New app feature</li></ul><style>.x{}</style><noscript>Enable JS</noscript>for riders</p>
+<h3>More</h3></article></a></body></html>"""
+
+
+def _backend_runs():
+    for backend in html_parser.available_backends():
+        yield backend, True
+        if backend != 'selectolax':
+            yield backend, False
+
+
+def test_listing_backends_agree_on_fixture_pages():
+    with open('grab_press_page.html', 'rb') as f:
+        saved_page = f.read()
+    for page in (saved_page, LISTING_PAGE):
+        results = {(backend, partial): html_parser.parse_grab_listing(page, backend=backend, partial=partial)
+                   for backend, partial in _backend_runs()}
+        baseline = results[('html.parser', False)]
+        assert baseline[0]
+        for run, result in results.items():
+            assert result == baseline, run
+
+
+def test_listing_text_leaves_out_scripts_and_styles():
+    panels, link_count, next_href = html_parser.parse_grab_listing(LISTING_PAGE, backend='html.parser')
+    assert panels[0]['title'] == 'Grablaunches'
+    assert panels[0]['description'] == 'New app featurefor riders'
+    assert (link_count, next_href) == (1, '/press/page/2/')
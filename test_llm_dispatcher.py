@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+import llm_dispatcher
+import mvp_demo
+
+
+def test_bucket_allows_a_burst_after_idle():
+    bucket = llm_dispatcher.TokenBucket(60, burst_seconds=10)
+    assert bucket.capacity == 10
+    waits = asyncio.run(_acquire_many(bucket, 4))
+    assert waits == [0.0] * 4
+
+
+def test_default_burst_covers_the_in_flight_requests():
+    assert llm_dispatcher.TokenBucket(60).capacity >= llm_dispatcher.LLM_MAX_IN_FLIGHT
+
+
+def test_bucket_refills_at_the_per_minute_rate():
+    bucket = llm_dispatcher.TokenBucket(600, burst_seconds=1)
+    bucket.drain()
+    start = time.monotonic()
+    asyncio.run(bucket.acquire(1))
+    assert 0.05 < time.monotonic() - start < 0.5
+
+
+def test_oversized_request_leaves_the_bucket_in_debt():
+    bucket = llm_dispatcher.TokenBucket(600, burst_seconds=1)
+    assert asyncio.run(bucket.acquire(25)) == 0.0
+    assert bucket.tokens < -14
+
+
+async def _acquire_many(bucket, count):
+    return [await bucket.acquire() for _ in range(count)]
+
+
+class _FlakyStreamModel:
+    """Streams two chunks, failing with a quota error after the first on the first call."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        self.calls += 1
+        failing = self.calls == 1
+
+        async def chunks():
+            yield _Chunk('Hello ')
+            if failing:
+                raise RuntimeError('429 quota exceeded')
+            yield _Chunk('world')
+        return chunks()
+
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+def test_retried_stream_resets_the_streamed_text(monkeypatch):
+    model = _FlakyStreamModel()
+    monkeypatch.setattr(mvp_demo.model_registry, 'get_model', lambda name: model)
+    monkeypatch.setattr(llm_dispatcher, 'backoff_delay', lambda attempt: 0.0)
+    dispatcher = llm_dispatcher.Dispatcher(mvp_demo._generate_async, rpm=0, tpm=0, max_retries=2)
+    received = []
+    assert dispatcher.generate('prompt', on_chunk=received.append) == 'Hello world'
+    assert received == ['Hello ', None, 'Hello ', 'world']
+    # What a page shows: text since the last reset
+    shown = ''
+    for text in received:
+        shown = '' if text is None else shown + text
+    assert shown == 'Hello world'
+
+
+def test_run_builds_on_the_dispatcher_loop():
+    dispatcher = llm_dispatcher.Dispatcher(mvp_demo._generate_async, rpm=0, tpm=0)
+
+    async def running_loop():
+        return asyncio.get_running_loop()
+
+    assert dispatcher.run(running_loop) is dispatcher._loop
+
+
+def test_prewarm_builds_the_async_transport_on_the_dispatcher_loop(monkeypatch):
+    dispatcher = llm_dispatcher.Dispatcher(mvp_demo._generate_async, rpm=0, tpm=0)
+    loops = []
+    monkeypatch.setattr(mvp_demo, '_dispatcher', dispatcher)
+    monkeypatch.setattr(mvp_demo, 'GEMINI_MODEL', 'gemini-1.5-pro')
+    monkeypatch.setattr(mvp_demo, 'GEMINI_FAST_MODEL', '')
+    monkeypatch.setattr(mvp_demo.model_registry, 'prewarm', lambda *names: None)
+    monkeypatch.setattr(mvp_demo.model_registry.genai_client, 'get_default_generative_async_client',
+                        lambda: loops.append(asyncio.get_running_loop()))
+    mvp_demo.prewarm_models()
+    assert loops == [dispatcher._loop]
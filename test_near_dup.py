@@ -0,0 +1,61 @@
+import array
+import sqlite3
+
+import pytest
+
+import near_dup
+
+WORDS = ("grab launches grabpay later a new buy now pay later option for riders and merchants across "
+         "singapore with no fees for the first three months and flexible instalments in the app").split()
+
+
+def _article(variant=''):
+    return ' '.join(WORDS * 2) + ' ' + variant
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(near_dup, 'NEAR_DUP_DB', str(tmp_path / 'near_dup.db'))
+    monkeypatch.setattr(near_dup, '_conn', None)
+    monkeypatch.setattr(near_dup, 'NEAR_DUP_ENABLED', True)
+    yield
+    if near_dup._conn is not None:
+        near_dup._conn.close()
+
+
+def test_signatures_are_packed():
+    signature = near_dup.minhash(_article())
+    assert isinstance(signature, array.array) and signature.itemsize == 4 and len(signature) == near_dup.NUM_PERM
+    assert near_dup.minhash('too short') is None
+
+
+def test_republished_copy_reuses_analysis_of_same_model_and_prompt():
+    near_dup.remember('https://a/1', near_dup.minhash(_article()), 'analysis', 'gemini-1.5-pro', 'v1')
+    match = near_dup.find_duplicate(near_dup.minhash(_article('republished')), 'gemini-1.5-pro', 'v1')
+    assert match['url'] == 'https://a/1' and match['analysis'] == 'analysis'
+    assert match['similarity'] >= near_dup.NEAR_DUP_THRESHOLD
+
+
+def test_model_or_prompt_change_means_a_fresh_analysis():
+    near_dup.remember('https://a/1', near_dup.minhash(_article()), 'analysis', 'gemini-1.5-pro', 'v1')
+    signature = near_dup.minhash(_article())
+    assert near_dup.find_duplicate(signature, 'gemini-1.5-pro', 'v2') is None
+    assert near_dup.find_duplicate(signature, 'gemini-1.5-flash', 'v1') is None
+
+
+def test_invalidate_forgets_a_prompt_version():
+    near_dup.remember('https://a/1', near_dup.minhash(_article()), 'analysis', 'gemini-1.5-pro', 'v1')
+    assert near_dup.invalidate('v1') == 1
+    assert near_dup.find_duplicate(near_dup.minhash(_article()), 'gemini-1.5-pro', 'v1') is None
+
+
+def test_rows_from_before_versioning_never_match():
+    conn = sqlite3.connect(near_dup.NEAR_DUP_DB)
+    conn.execute("""CREATE TABLE fingerprints (id INTEGER PRIMARY KEY, url TEXT NOT NULL, signature BLOB NOT NULL,
+                    analysis TEXT NOT NULL, created_at REAL NOT NULL)""")
+    conn.execute("INSERT INTO fingerprints (url, signature, analysis, created_at) VALUES (?, ?, ?, 0)",
+                 ('https://a/old', near_dup._to_blob(near_dup.minhash(_article())), 'old analysis'))
+    conn.commit()
+    conn.close()
+    assert near_dup.find_duplicate(near_dup.minhash(_article()), 'gemini-1.5-pro', 'v1') is None
+    assert near_dup.stats()['signatures'] == 0
@@ -0,0 +1,101 @@
+import threading
+import time
+
+import pytest
+
+from pipeline import StagedPipeline
+
+
+def _pipeline_threads():
+    return [thread for thread in threading.enumerate() if thread.name.startswith('pipeline-')]
+
+
+def test_each_item_runs_the_stages_in_order():
+    seen = []
+    seen_lock = threading.Lock()
+
+    def stage(name):
+        def func(item, value):
+            with seen_lock:
+                seen.append((item, name))
+            return (value or []) + [name]
+        return func
+
+    pipeline = StagedPipeline([('fetch', stage('fetch'), 3), ('parse', stage('parse'), 2),
+                               ('analyze', stage('analyze'), 2)])
+    completed = pipeline.run(range(20))
+    assert sorted(completed) == [(item, ['fetch', 'parse', 'analyze']) for item in range(20)]
+    for item in range(20):
+        assert [name for seen_item, name in seen if seen_item == item] == ['fetch', 'parse', 'analyze']
+
+
+def test_stages_run_at_most_their_worker_count_at_once():
+    running = {'fetch': 0, 'analyze': 0}
+    peak = {'fetch': 0, 'analyze': 0}
+    lock = threading.Lock()
+
+    def stage(name):
+        def func(item, value):
+            with lock:
+                running[name] += 1
+                peak[name] = max(peak[name], running[name])
+            time.sleep(0.01)
+            with lock:
+                running[name] -= 1
+            return item
+        return func
+
+    pipeline = StagedPipeline([('fetch', stage('fetch'), 4), ('analyze', stage('analyze'), 2)], queue_size=2)
+    assert len(pipeline.run(range(24))) == 24
+    assert 1 < peak['fetch'] <= 4 and 1 < peak['analyze'] <= 2
+
+
+def test_worker_count_and_queue_size_are_at_least_one():
+    pipeline = StagedPipeline([('only', lambda item, value: item, 0)], queue_size=0)
+    assert pipeline.stages[0][2] == 1 and pipeline.queue_size == 1
+    assert pipeline.run(['a']) == [('a', 'a')]
+    with pytest.raises(ValueError):
+        StagedPipeline([])
+
+
+def test_a_failing_stage_reports_the_error_and_the_rest_continue():
+    analyzed = []
+    done = {}
+    done_lock = threading.Lock()
+
+    def parse(item, value):
+        if item == 3:
+            raise RuntimeError('bad page')
+        return None if item == 5 else item
+
+    def on_done(item, value, error):
+        with done_lock:
+            assert item not in done
+            done[item] = (value, error)
+
+    pipeline = StagedPipeline([('fetch', lambda item, value: item, 2), ('parse', parse, 2),
+                               ('analyze', lambda item, value: analyzed.append(item) or item, 2)])
+    completed = pipeline.run(range(8), on_done=on_done)
+    assert sorted(item for item, _ in completed) == [0, 1, 2, 4, 6, 7]
+    assert 3 not in analyzed and 5 not in analyzed
+    assert set(done) == set(range(8))
+    assert isinstance(done[3][1], RuntimeError) and done[3][0] is None
+    # A dropped item finishes without an error
+    assert done[5] == (None, None)
+
+
+def test_a_failing_callback_does_not_stop_the_run():
+    def on_done(item, value, error):
+        raise RuntimeError('callback broke')
+
+    pipeline = StagedPipeline([('fetch', lambda item, value: item, 2)])
+    assert len(pipeline.run(range(5), on_done=on_done)) == 5
+
+
+def test_every_worker_exits_when_the_run_ends():
+    before = len(_pipeline_threads())
+    pipeline = StagedPipeline([('fetch', lambda item, value: item, 3), ('parse', lambda item, value: item, 1),
+                               ('analyze', lambda item, value: item, 4)], queue_size=1)
+    assert len(pipeline.run(range(10))) == 10
+    assert pipeline.run([]) == []
+    assert len(_pipeline_threads()) == before
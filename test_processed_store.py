@@ -0,0 +1,76 @@
+import pytest
+
+import listing_crawler
+import processed_store
+from bloom_filter import BloomFilter
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(processed_store, 'PROCESSED_DB', str(tmp_path / 'processed.db'))
+    monkeypatch.setattr(processed_store, '_conn', None)
+    monkeypatch.setattr(processed_store, '_sets', {})
+    yield
+    if processed_store._conn is not None:
+        processed_store._conn.close()
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    keys = [f"example.com/press/{i}" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"example.com/news/{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+    assert bloom.is_full()
+
+
+def test_processed_set_matches_canonical_variants():
+    processed = processed_store.open_set('grab')
+    processed.add('https://www.grab.com/sg/press/launch/?utm_source=x')
+    assert 'http://grab.com/sg/press/launch' in processed
+    assert 'https://www.grab.com/sg/press/other/' not in processed
+    assert len(processed) == 1
+    assert processed_store.contains('grab', 'https://grab.com/sg/press/launch/')
+    assert not processed_store.contains('gojek', 'https://grab.com/sg/press/launch/')
+
+
+def test_bloom_false_positive_is_verified_against_database(monkeypatch):
+    processed = processed_store.open_set('grab')
+    processed.add('https://grab.com/press/old')
+    processed.flush()
+    new_url = 'https://grab.com/press/new'
+    # Simulate a false positive: in the filter, never stored
+    processed._bloom.add(processed_store.canonical(new_url))
+
+    monkeypatch.setattr(processed_store, 'PROCESSED_BLOOM_VERIFY', True)
+    assert new_url not in processed
+    assert processed.filter_new([new_url, 'https://grab.com/press/old']) == [new_url]
+
+    monkeypatch.setattr(processed_store, 'PROCESSED_BLOOM_VERIFY', False)
+    assert new_url in processed
+    assert not processed.confirmed(new_url)
+    assert processed.confirmed('https://grab.com/press/old')
+
+
+def test_crawl_does_not_stop_at_a_false_positive(monkeypatch):
+    monkeypatch.setattr(processed_store, 'PROCESSED_BLOOM_VERIFY', False)
+    processed = processed_store.open_set('grab')
+    processed.add('https://grab.com/press/3')
+    processed._bloom.add(processed_store.canonical('https://grab.com/press/2'))
+    pages = {
+        'page1': ([{'url': 'https://grab.com/press/1'}, {'url': 'https://grab.com/press/2'}], 'page2'),
+        'page2': ([{'url': 'https://grab.com/press/3'}, {'url': 'https://grab.com/press/4'}], None),
+    }
+    articles, reached_known = listing_crawler.crawl_listing('page1', pages.__getitem__, known_urls=processed)
+    assert [article['url'] for article in articles] == ['https://grab.com/press/1', 'https://grab.com/press/2']
+    assert reached_known
+
+
+def test_import_text_file_reads_legacy_separators(tmp_path):
+    legacy = tmp_path / 'grab_articles.txt'
+    legacy.write_text('https://grab.com/press/a\\nhttps://grab.com/press/b\nhttps://grab.com/press/c ')
+    assert processed_store.import_text_file('grab', str(legacy)) == 3
+    assert processed_store.import_text_file('grab', str(legacy)) == 0
+    assert processed_store.count('grab') == 3
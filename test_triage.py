@@ -0,0 +1,62 @@
+import pytest
+
+import triage
+
+
+@pytest.fixture(autouse=True)
+def prior_model(tmp_path, monkeypatch):
+    # Start every test from the keyword prior, never from a saved model
+    monkeypatch.setattr(triage, 'TRIAGE_MODEL_FILE', str(tmp_path / 'triage_model.json'))
+    monkeypatch.setattr(triage, '_model', None)
+
+
+def test_prior_ranks_launches_above_earnings():
+    launch = triage.score('Grab launches new GrabPay feature', 'Consumers', 'Grab introduces a new app feature')
+    earnings = triage.score('Grab reports quarterly results', 'Others', 'Quarterly earnings and revenue')
+    assert launch > triage.TRIAGE_THRESHOLD > earnings
+
+
+def test_decide_modes(monkeypatch):
+    monkeypatch.setattr(triage, 'TRIAGE_EXPLORE_RATE', 0.0)
+    low = ('Quarterly results and earnings report', 'Investor', '')
+    monkeypatch.setattr(triage, 'TRIAGE_MODE', 'skip')
+    assert triage.decide(*low)[0] == 'skip'
+    monkeypatch.setattr(triage, 'TRIAGE_MODE', 'defer')
+    assert triage.decide(*low)[0] == 'defer'
+    monkeypatch.setattr(triage, 'TRIAGE_MODE', 'off')
+    assert triage.decide(*low)[0] == 'analyze'
+
+
+def test_decide_explores_below_threshold(monkeypatch):
+    monkeypatch.setattr(triage, 'TRIAGE_MODE', 'skip')
+    monkeypatch.setattr(triage, 'TRIAGE_EXPLORE_RATE', 1.0)
+    assert triage.decide('Quarterly results and earnings report', 'Investor', '')[0] == 'explore'
+
+
+def test_training_uses_listing_fields():
+    rows = [{'title': 'LLM feature name', 'category': 'Payments', 'listing_title': 'Listing title',
+             'listing_category': 'Others', 'lead': 'lead', 'relevance_score': 8},
+            {'title': 'Old row without listing fields', 'relevance_score': 2}]
+    assert triage.training_rows(rows) == rows[:1]
+    assert triage._inputs(rows[0]) == ('Listing title', 'Others', 'lead')
+
+
+def test_train_learns_from_listing_titles():
+    rows = []
+    for n in range(30):
+        rows.append({'listing_title': f'Zorblat gizmo {n}', 'listing_category': 'Others',
+                     'title': 'Unrelated LLM title', 'relevance_score': 9})
+        rows.append({'listing_title': f'Quibble notice {n}', 'listing_category': 'Others',
+                     'title': 'Unrelated LLM title', 'relevance_score': 1})
+    triage.train(rows)
+    assert triage.score('Zorblat gizmo', 'Others') > 0.5 > triage.score('Quibble notice', 'Others')
+    assert triage.evaluate(rows, threshold=0.5)['positives_missed'] == 0
+
+
+def test_explored_rows_are_upweighted(monkeypatch):
+    monkeypatch.setattr(triage, 'TRIAGE_EXPLORE_RATE', 0.1)
+    assert triage._weight({'triage_decision': 'explore'}) == pytest.approx(10.0)
+    assert triage._weight({'triage_decision': 'analyze'}) == 1.0
+    rows = [{'listing_title': 'a', 'relevance_score': 9, 'triage_decision': 'explore'},
+            {'listing_title': 'b', 'relevance_score': 1}]
+    assert triage.evaluate(rows, threshold=1.01)['positives_missed'] == pytest.approx(10.0)
@@ -0,0 +1,32 @@
+import response_cache
+import url_canon
+
+
+def test_canonicalize_url_normalizes_links():
+    assert url_canon.canonicalize_url('HTTPS://Example.COM:443//press//a?b=2&utm_source=x&a=1#top') == \
+        'https://example.com/press/a?a=1&b=2'
+    assert url_canon.canonicalize_url('../b', base_url='https://example.com/press/a/') == 'https://example.com/press/b'
+    assert url_canon.canonicalize_url('http://example.com:8080') == 'http://example.com:8080/'
+
+
+def test_canonicalize_url_rejects_non_http_links():
+    for link in ('', '#comments', 'mailto:press@example.com', 'javascript:void(0)'):
+        assert url_canon.canonicalize_url(link, base_url='https://example.com/') is None
+
+
+def test_dedup_key_ignores_scheme_www_and_trailing_slash():
+    keys = {url_canon.dedup_key(url) for url in (
+        'https://www.example.com/press/launch/',
+        'http://example.com/press/launch',
+        'https://example.com/press/launch?fbclid=abc',
+    )}
+    assert keys == {'example.com/press/launch'}
+    assert url_canon.dedup_key('https://example.com/press/launch?id=2') != url_canon.dedup_key('https://example.com/press/launch')
+
+
+def test_response_cache_keys_by_canonical_url(tmp_path, monkeypatch):
+    monkeypatch.setattr(response_cache, 'HTTP_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(response_cache, '_conn', None)
+    response_cache.store_body('https://Example.com/press/a?utm_medium=email', 200, {'Content-Type': 'text/html'}, b'<p>hi</p>')
+    cached = response_cache.lookup('https://example.com/press/a#top')
+    assert cached is not None and cached.content == b'<p>hi</p>'
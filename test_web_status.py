@@ -0,0 +1,45 @@
+import pytest
+
+import web_app
+
+
+@pytest.fixture(autouse=True)
+def fresh_status(monkeypatch):
+    monkeypatch.setattr(web_app, 'status_version', 0)
+    monkeypatch.setattr(web_app, 'status_snapshot', {})
+    monkeypatch.setattr(web_app, 'status_field_versions', {})
+    monkeypatch.setitem(web_app.app_state, 'progress', 0)
+    monkeypatch.setitem(web_app.app_state, 'status', 'ready')
+
+
+def test_first_poll_gets_every_field():
+    token, fields = web_app.status_changes('')
+    assert token == f"{web_app.STATUS_EPOCH}-1"
+    assert set(fields) == set(web_app.STATUS_FIELDS)
+
+
+def test_delta_holds_only_changed_fields():
+    token, _ = web_app.status_changes('')
+    web_app.app_state['progress'] = 40
+    new_token, fields = web_app.status_changes(token)
+    assert fields == {'progress': 40}
+    assert web_app.status_changes(new_token) == (new_token, None)
+
+
+def test_status_route_answers_304_when_unchanged():
+    client = web_app.app.test_client()
+    first = client.get('/status').get_json()
+    assert client.get('/status', query_string={'since': first['version']}).status_code == 304
+
+
+def test_token_from_another_process_gets_full_status(monkeypatch):
+    token, _ = web_app.status_changes('')
+    for _ in range(3):
+        web_app.app_state['progress'] += 10
+        web_app.status_changes('')
+    # The restarted process has counted to a higher version than the client saw
+    monkeypatch.setattr(web_app, 'STATUS_EPOCH', 'restarted')
+    _, fields = web_app.status_changes(token)
+    assert set(fields) == set(web_app.STATUS_FIELDS)
+    for stale in ('12', 'garbage', "restarted-99"):
+        assert set(web_app.status_changes(stale)[1]) == set(web_app.STATUS_FIELDS)
@@ -0,0 +1,230 @@
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import zlib
+
+# Local pre-classifier that estimates, before any LLM call, how likely an
+# article is to be a relevant feature announcement
+TRIAGE_MODE = os.environ.get('TRIAGE_MODE', 'skip').lower()   # skip, defer or off
+# Articles scoring below this probability are skipped / deferred
+TRIAGE_THRESHOLD = float(os.environ.get('TRIAGE_THRESHOLD', '0.2'))
+# Weights learned by `python triage.py train`; the keyword prior is used until then
+TRIAGE_MODEL_FILE = os.environ.get('TRIAGE_MODEL_FILE', 'triage_model.json')
+# Stored results at or above this LLM relevance score (or flagged as a new feature) are positives
+TRIAGE_LABEL_SCORE = int(os.environ.get('TRIAGE_LABEL_SCORE', '6'))
+# Share of below-threshold articles analyzed anyway, so training also sees
+# LLM verdicts for the articles triage would have skipped
+TRIAGE_EXPLORE_RATE = float(os.environ.get('TRIAGE_EXPLORE_RATE', '0.05'))
+
+HASH_BUCKETS = 1 << 18
+LEAD_WORDS = 60
+
+# Starting weights, so triage is useful before any training
+PRIOR_WEIGHTS = {
+    'launch': 1.2, 'launches': 1.2, 'launched': 1.0, 'introduces': 1.2, 'introducing': 1.2,
+    'new': 0.8, 'feature': 1.2, 'features': 1.0, 'app': 0.6, 'rollout': 1.0, 'beta': 1.0,
+    'pilot': 0.8, 'partnership': 0.6, 'partners': 0.4, 'expands': 0.6, 'service': 0.5,
+    'users': 0.4, 'merchants': 0.4, 'payments': 0.4, 'subscription': 0.8, 'ai': 0.6,
+    'results': -1.5, 'quarter': -1.5, 'quarterly': -1.5, 'financial': -1.2, 'earnings': -1.5,
+    'revenue': -1.0, 'notes': -0.8, 'offering': -0.6, 'shareholders': -1.2, 'investor': -1.0,
+    'csr': -1.5, 'donates': -1.2, 'donation': -1.2, 'charity': -1.2, 'volunteers': -1.0,
+    'community': -0.6, 'scholarship': -1.0, 'insights': -1.0, 'survey': -1.0, 'trends': -1.0,
+    'report': -0.8, 'appoints': -1.2, 'ceo': -0.6, 'board': -0.8, 'award': -0.8, 'awards': -0.8,
+}
+PRIOR_BIAS = 0.0
+# Feature vectors are L2-normalized, so a single keyword only carries a
+# fraction of its weight; this scales the prior up to be decisive
+PRIOR_STRENGTH = 4.0
+
+_WORD_RE = re.compile(r'\w+')
+
+_lock = threading.Lock()
+_random = random.Random()
+_model = None  # {'bias': float, 'weights': {bucket: weight}, 'trained_on': int}
+
+
+def _hash(feature):
+    return zlib.crc32(feature.encode('utf-8')) % HASH_BUCKETS
+
+
+def lead_text(text, description=''):
+    """First paragraph used for triage: the listing description, else the opening words of the article."""
+    if description and description.strip():
+        return description.strip()
+    return ' '.join((text or '').split()[:LEAD_WORDS])
+
+
+def features(title, category, lead):
+    """Hashed, log-scaled term frequencies of words and word pairs; title and category words also count per field."""
+    counts = {}
+    for field, text in (('t', title), ('c', category), ('p', lead)):
+        words = _WORD_RE.findall((text or '').lower())
+        for n, word in enumerate(words):
+            for feature in (word, f'{field}:{word}'):
+                counts[feature] = counts.get(feature, 0) + 1
+            if n:
+                pair = f'{words[n - 1]} {word}'
+                counts[pair] = counts.get(pair, 0) + 1
+    vector = {}
+    for feature, count in counts.items():
+        bucket = _hash(feature)
+        vector[bucket] = vector.get(bucket, 0.0) + 1.0 + math.log(count)
+    norm = math.sqrt(sum(value * value for value in vector.values())) or 1.0
+    return {bucket: value / norm for bucket, value in vector.items()}
+
+
+def _prior_model():
+    return {'bias': PRIOR_BIAS, 'weights': {_hash(word): PRIOR_STRENGTH * weight for word, weight in PRIOR_WEIGHTS.items()},
+            'trained_on': 0}
+
+
+def _load():
+    global _model
+    with _lock:
+        if _model is None:
+            model = _prior_model()
+            if os.path.exists(TRIAGE_MODEL_FILE):
+                try:
+                    with open(TRIAGE_MODEL_FILE, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    model = {'bias': data['bias'], 'weights': {int(k): v for k, v in data['weights'].items()},
+                             'trained_on': data.get('trained_on', 0)}
+                except Exception as e:
+                    print(f"Warning: Could not load triage model {TRIAGE_MODEL_FILE}: {e}")
+            _model = model
+        return _model
+
+
+def _probability(model, vector):
+    weights = model['weights']
+    z = model['bias'] + sum(weights.get(bucket, 0.0) * value for bucket, value in vector.items())
+    return 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z))))
+
+
+def score(title, category='', lead=''):
+    """Probability (0-1) that the article is worth an LLM call."""
+    return _probability(_load(), features(title, category, lead))
+
+
+def decide(title, category='', lead=''):
+    """
+    Triage decision for one article, from its listing title and category.
+
+    Returns:
+        ('analyze' | 'explore' | 'skip' | 'defer', probability); 'explore' is
+        a below-threshold article sampled for analysis (TRIAGE_EXPLORE_RATE)
+    """
+    probability = score(title, category, lead)
+    if TRIAGE_MODE == 'off' or probability >= TRIAGE_THRESHOLD:
+        return 'analyze', probability
+    with _lock:
+        explore = _random.random() < TRIAGE_EXPLORE_RATE
+    if explore:
+        return 'explore', probability
+    return ('defer' if TRIAGE_MODE == 'defer' else 'skip'), probability
+
+
+def _label(result):
+    return 1 if result.get('is_new_feature') or (result.get('relevance_score') or 0) >= TRIAGE_LABEL_SCORE else 0
+
+
+def _inputs(result):
+    """What decide() saw for a stored result: the listing title and category, not the LLM's."""
+    return result.get('listing_title'), result.get('listing_category'), result.get('lead', '')
+
+
+def _weight(result):
+    # Explored articles stand in for all the skipped ones they were sampled from
+    if result.get('triage_decision') == 'explore' and TRIAGE_EXPLORE_RATE > 0:
+        return 1.0 / TRIAGE_EXPLORE_RATE
+    return 1.0
+
+
+def training_rows(results):
+    """Stored results usable for training: those recorded with their listing title."""
+    return [r for r in results if r.get('listing_title') is not None]
+
+
+def train(results, epochs=20, learning_rate=0.5, l2=1e-4, seed=7):
+    """
+    Fits logistic regression weights (starting from the keyword prior) to past LLM verdicts.
+
+    Explored below-threshold articles are weighted by 1 / TRIAGE_EXPLORE_RATE,
+    so the skipped region is not underrepresented.
+
+    Args:
+        results: Stored result dicts (see results_store.query) with
+            listing_title, listing_category, lead, triage_decision,
+            relevance_score and is_new_feature (see training_rows)
+
+    Returns:
+        The trained model dict (also made the active model; call save() to keep it)
+    """
+    global _model
+    examples = [(features(*_inputs(r)), _label(r), _weight(r)) for r in results]
+    # Weights average to 1, which keeps the step sizes of plain SGD
+    scale = len(examples) / (sum(weight for _, _, weight in examples) or 1)
+    model = _prior_model()
+    rng = random.Random(seed)
+    for epoch in range(epochs):
+        rng.shuffle(examples)
+        rate = learning_rate / (1 + epoch)
+        for vector, label, weight in examples:
+            error = scale * weight * (_probability(model, vector) - label)
+            model['bias'] -= rate * error
+            weights = model['weights']
+            for bucket, value in vector.items():
+                current = weights.get(bucket, 0.0)
+                weights[bucket] = current - rate * (error * value + l2 * current)
+    model['trained_on'] = len(examples)
+    with _lock:
+        _model = model
+    return model
+
+
+def evaluate(results, threshold=None):
+    """Share of results triage would send to the LLM, and how many positives it would miss."""
+    threshold = TRIAGE_THRESHOLD if threshold is None else threshold
+    model = _load()
+    sent = missed = positives = total = 0
+    for r in results:
+        passed = _probability(model, features(*_inputs(r))) >= threshold
+        label = _label(r)
+        weight = _weight(r)
+        total += weight
+        sent += weight * passed
+        positives += weight * label
+        missed += weight * (label and not passed)
+    return {'articles': len(results), 'sent_to_llm': round(sent / (total or 1), 3),
+            'positives': round(positives, 1), 'positives_missed': round(missed, 1)}
+
+
+def save(path=None):
+    model = _load()
+    with open(path or TRIAGE_MODEL_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'bias': model['bias'], 'weights': {str(k): round(v, 5) for k, v in model['weights'].items() if v},
+                   'trained_on': model['trained_on']}, f)
+
+
+if __name__ == "__main__":
+    # python triage.py train   - retrain from stored LLM scores (results_store)
+    # python triage.py         - evaluate the current model on stored results
+    import results_store
+    stored = training_rows(results_store.query(limit=None))
+    if len(sys.argv) > 1 and sys.argv[1] == 'train':
+        if not stored:
+            print("No stored results to train on")
+            sys.exit(1)
+        random.Random(1).shuffle(stored)
+        held_out = stored[:len(stored) // 5]
+        train(stored[len(held_out):])
+        if held_out:
+            print(f"Held-out: {evaluate(held_out)}")
+        train(stored)
+        save()
+        print(f"Trained on {len(stored)} results, saved to {TRIAGE_MODEL_FILE}")
+    print(f"Stored results: {evaluate(stored)}")
@@ -0,0 +1,68 @@
+import os
+import re
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only track the visit and never change the article.
+# utm_* is always dropped; extra names can be added comma-separated.
+TRACKING_PARAMS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref', 'igshid'} | {
+    name.strip().lower() for name in os.environ.get('URL_TRACKING_PARAMS', '').split(',') if name.strip()
+}
+
+_DUPLICATE_SLASHES_RE = re.compile(r'/{2,}')
+
+
+def _is_tracking_param(name):
+    name = name.lower()
+    return name.startswith('utm_') or name in TRACKING_PARAMS
+
+
+def canonicalize_url(url, base_url=None):
+    """
+    Normalizes a discovered link into the URL that is fetched and stored.
+
+    Resolves it against base_url (so relative links of any form work),
+    lowercases scheme and host, drops default ports, the fragment and
+    tracking parameters, and sorts the remaining query.
+
+    Returns:
+        The canonical absolute URL, or None for links that are not http(s)
+        (mailto:, javascript:, '#', ...)
+    """
+    url = (url or '').strip()
+    # Empty and fragment-only links point back at the page they are on
+    if not url or url.startswith('#'):
+        return None
+    if base_url:
+        url = urljoin(base_url, url)
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in ('http', 'https') or not parts.hostname:
+        return None
+
+    host = parts.hostname.lower()
+    port = parts.port
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+    path = _DUPLICATE_SLASHES_RE.sub('/', parts.path) or '/'
+    query = urlencode(sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                             if not _is_tracking_param(name)))
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+def dedup_key(url):
+    """
+    Identity of an article for "already seen" checks.
+
+    On top of canonicalize_url it ignores http vs https, a leading "www."
+    and a trailing slash, which all point at the same article but would
+    otherwise look like a new one.
+    """
+    canonical = canonicalize_url(url)
+    if canonical is None:
+        return url.strip() if url else ''
+    parts = urlsplit(canonical)
+    host = parts.netloc
+    if host.startswith('www.'):
+        host = host[4:]
+    path = parts.path.rstrip('/') or '/'
+    return f"{host}{path}?{parts.query}" if parts.query else f"{host}{path}"
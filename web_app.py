@@ -1,6 +1,5 @@
 from flask import Flask, render_template, jsonify, request, Response
 import threading
-import queue
 import time
 import json
 from datetime import datetime
@@ -10,7 +9,8 @@ from contextlib import redirect_stdout
 import os
 import requests
 import re
-from bs4 import BeautifulSoup
+import uuid
+from urllib.parse import urljoin
 
 # Configure proxy settings
 def setup_proxy():
@@ -47,9 +47,29 @@ setup_proxy()
 # Import our existing MVP logic
 from mvp_demo import (
     load_processed_urls, save_processed_url, get_article_urls,
-    get_article_text, analyze_text, display_results,
-    CACHE_FILE, BASE_URL, ARTICLE_LINK_SELECTOR
+    get_article_text,
+    analyze_text, analyze_texts, display_results,
+    CACHE_FILE, BASE_URL, ARTICLE_LINK_SELECTOR,
+    GEMINI_BATCH_TOKEN_BUDGET, GEMINI_BATCH_MAX_ARTICLES, GEMINI_MODEL, GEMINI_API_KEY, dispatcher_stats,
+    GEMINI_FAST_MODEL, ACTIVE_PROMPT_VERSION, cascade_stats, prewarm_models
 )
+from pipeline import StagedPipeline
+from analysis_batcher import AnalysisBatcher
+from event_hub import EventHub
+import http_client
+import listing_cache
+import rate_limiter
+import listing_crawler
+import feed_discovery
+import html_parser
+import condense
+import analysis_schema
+import triage
+import url_canon
+import near_dup
+import llm_cache
+import model_registry
+import results_store
 
 # Multi-Competitor Configuration
 COMPETITORS = {
@@ -58,6 +78,10 @@ COMPETITORS = {
         'base_url': 'https://www.grab.com/sg/press/',
         'selector': 'div.elementor-post__text > h3 > a',
         'cache_file': 'grab_articles.txt',
+        'header_profile': 'grab',
+        # Discovery sources read before the HTML listing (see feed_discovery)
+        'feeds': ['https://www.grab.com/sg/press/feed/'],
+        'sitemaps': [],
         'color': 'success',
         'demo_articles': [
             {
@@ -95,6 +119,9 @@ COMPETITORS = {
         'base_url': 'https://www.foodme.asia/news/',
         'selector': 'article.news-item h2 > a',
         'cache_file': 'foodme_articles.txt',
+        'header_profile': 'default',
+        'feeds': [],
+        'sitemaps': [],
         'color': 'warning',
         'demo_articles': [
             {
@@ -132,11 +159,32 @@ COMPETITORS = {
         'base_url': 'https://squareup.com/us/en/press',
         'selector': 'a[href*="/press/"]',
         'cache_file': 'square_articles.txt',
+        'header_profile': 'square',
+        'feeds': [],
+        'sitemaps': [],
+        'sitemap_filter': '/press/',
         'color': 'info',
         'demo_articles': []  # No demo articles needed for live scraping
     }
 }
 
+# Worker pool sizes for the fetch -> parse -> analyze pipeline.
+# Analyze workers mostly wait on llm_dispatcher, which caps the requests in
+# flight (LLM_MAX_IN_FLIGHT) and starts the most recent articles first, so
+# there can be more of them than concurrent requests.
+PIPELINE_WORKERS = {
+    'fetch': int(os.environ.get('FETCH_WORKERS', '4')),
+    'parse': int(os.environ.get('PARSE_WORKERS', '2')),
+    'analyze': int(os.environ.get('ANALYZE_WORKERS', '8')),
+}
+PIPELINE_QUEUE_SIZE = int(os.environ.get('PIPELINE_QUEUE_SIZE', '8'))
+# With GEMINI_BATCH_TOKEN_BUDGET set, articles reaching the analyze stage
+# together share one Gemini request; a batch waits at most this long to fill.
+# Batches are bounded by ANALYZE_WORKERS, so raise it along with the batch size.
+GEMINI_BATCH_WAIT = float(os.environ.get('GEMINI_BATCH_WAIT', '2'))
+# Results shown per page on /results
+RESULTS_PAGE_SIZE = int(os.environ.get('RESULTS_PAGE_SIZE', '20'))
+
 app = Flask(__name__)
 
 # Global state management
@@ -146,7 +194,6 @@ app_state = {
     'total_articles': 0,
     'processed_articles': 0,
     'current_task': '',
-    'results': [],
     'logs': [],
     'start_time': None,
     'end_time': None,
@@ -155,8 +202,109 @@ app_state = {
     'available_competitors': list(COMPETITORS.keys())
 }
 
-# Thread-safe queue for real-time logs
-log_queue = queue.Queue()
+# Guards app_state fields updated from pipeline worker threads
+state_lock = threading.Lock()
+
+# Fields served by /status; everything else (article metadata, results,
+# service statistics) is available from its own endpoint
+STATUS_FIELDS = ('status', 'progress', 'total_articles', 'processed_articles', 'current_task',
+                 'start_time', 'end_time', 'selected_competitor')
+# Version of the status fields: bumped whenever /status sees one of them
+# changed, with the version at which each field last changed. Clients get it
+# as "<epoch>-<version>"; the epoch is new in every process, so a version
+# from before a restart is never mistaken for a current one.
+STATUS_EPOCH = uuid.uuid4().hex[:12]
+status_lock = threading.Lock()
+status_version = 0
+status_snapshot = {}
+status_field_versions = {}
+
+def current_status():
+    """
+    Compact progress status, versioned for delta polling.
+
+    Returns:
+        (version, {field: value}, {field: version it last changed at})
+    """
+    global status_version
+    with status_lock:
+        changed = [field for field in STATUS_FIELDS
+                   if field not in status_snapshot or status_snapshot[field] != app_state.get(field)]
+        if changed:
+            status_version += 1
+            for field in changed:
+                status_snapshot[field] = app_state.get(field)
+                status_field_versions[field] = status_version
+        return status_version, dict(status_snapshot), dict(status_field_versions)
+
+def status_changes(since=''):
+    """
+    Status for a client that last saw the version token `since`.
+
+    Returns:
+        (token, fields): all fields for an empty, malformed or other-process
+        token, else only those changed after it; fields is None when nothing changed
+    """
+    version, fields, field_versions = current_status()
+    epoch, _, seen = (since or '').rpartition('-')
+    if epoch == STATUS_EPOCH and seen.isdigit() and int(seen) <= version:
+        if int(seen) == version:
+            fields = None
+        else:
+            fields = {field: value for field, value in fields.items() if field_versions[field] > int(seen)}
+    return f"{STATUS_EPOCH}-{version}", fields
+
+# Real-time logs and progress events for /logs, and live analysis events
+# (analysis text as it streams in, each result once parsed) for /stream.
+# Each SSE client reads from its own position in these bounded buffers and
+# resumes from Last-Event-ID after a reconnect.
+LOG_BUFFER_SIZE = int(os.environ.get('LOG_BUFFER_SIZE', '2000'))
+STREAM_BUFFER_SIZE = int(os.environ.get('STREAM_BUFFER_SIZE', '1000'))
+log_hub = EventHub(LOG_BUFFER_SIZE)
+stream_hub = EventHub(STREAM_BUFFER_SIZE)
+# Id of the last log event before the current run: new /logs clients start after it
+run_log_start = 0
+
+def publish_event(event):
+    """Sends a live analysis event to the /stream clients."""
+    stream_hub.publish(event)
+
+def publish_progress():
+    log_hub.publish({'progress': {field: app_state[field] for field in
+                                  ('status', 'progress', 'total_articles', 'processed_articles', 'current_task')}})
+
+def sse_response(hub, start_id, stop_when_finished=False):
+    """
+    Streams a hub's events after start_id as server-sent events, each with its id.
+
+    With stop_when_finished, the stream ends once it is caught up and the run
+    has finished (the browser reconnects with Last-Event-ID).
+    """
+    def generate():
+        cursor = start_id
+        while True:
+            events, missed = hub.read(cursor, timeout=1)
+            if missed:
+                yield f"data: {json.dumps({'missed': missed})}\n\n"
+            for event_id, data in events:
+                cursor = event_id
+                yield f"id: {hub.format_id(event_id)}\ndata: {json.dumps(data, default=str)}\n\n"
+            if not events:
+                # Send heartbeat
+                yield f"data: {json.dumps({'heartbeat': True})}\n\n"
+                if stop_when_finished and app_state['status'] in ['completed', 'error']:
+                    break
+    
+    return Response(generate(), mimetype='text/event-stream',
+                   headers={'Cache-Control': 'no-cache'})
+
+def last_event_id(hub, default):
+    """
+    Resume position sent by a reconnecting client (Last-Event-ID header, or
+    ?last_event_id=); an id from before a restart replays the whole buffer.
+    """
+    event_id = hub.parse_id(request.headers.get('Last-Event-ID') or request.args.get('last_event_id'))
+    return default if event_id is None else event_id
 
 class LogCapture:
     """Capture print statements and send to web interface"""
@@ -169,7 +317,7 @@ class LogCapture:
             timestamp = datetime.now().strftime("%H:%M:%S")
             log_entry = f"[{timestamp}] {text.strip()}"
             self.logs.append(log_entry)
-            log_queue.put(log_entry)
+            log_hub.publish({'log': log_entry})
             # Print to original console (not captured stdout)
             self.original_stdout.write(f"{log_entry}\n")
             self.original_stdout.flush()
@@ -177,6 +325,16 @@ class LogCapture:
     def flush(self):
         pass
 
+def recency_priority(url):
+    """Dispatch priority of an article: its publish timestamp, so newer articles are analyzed first."""
+    publish_date = app_state.get('article_metadata', {}).get(url, {}).get('publish_date')
+    if isinstance(publish_date, str):
+        try:
+            publish_date = datetime.fromisoformat(publish_date)
+        except ValueError:
+            return 0.0
+    return publish_date.timestamp() if isinstance(publish_date, datetime) else 0.0
+
 def parse_analysis_result(analysis_text, url):
     """Parse the raw Gemini analysis text into structured data for the template"""
     
@@ -203,6 +361,22 @@ def parse_analysis_result(analysis_text, url):
         'relevance_score': 0
     }
     
+    # JSON output mode: validated and decoded in one pass
+    record = analysis_schema.decode(analysis_text)
+    if record is not None:
+        result.update({
+            'title': record['feature_name'] or result['title'],
+            'summary': record['summary'],
+            'is_new_feature': record['is_new_feature'],
+            'category': record['category'] or result['category'],
+            'key_features': record['key_features'],
+            'relevance_score': record['relevance_score'],
+            'target_market': record['target_market'],
+            'competitive_intelligence': record['competitive_intelligence'],
+        })
+        return result
+    
+    # Legacy Markdown format
     try:
         lines = analysis_text.split('\n')
         
@@ -285,14 +459,21 @@ def parse_analysis_result(analysis_text, url):
     
     return result
 
-def run_analysis_task():
-    """Background task to run the ACFWS analysis"""
+def run_analysis_task(backfill_pages=0):
+    """
+    Background task to run the ACFWS analysis
+    
+    Args:
+        backfill_pages: When > 0, crawl this many listing pages regardless of
+            already processed articles instead of stopping at the first one
+    """
     global app_state
     
     try:
         app_state['status'] = 'running'
         app_state['start_time'] = datetime.now()
         app_state['current_task'] = 'Initializing analysis task...'
+        publish_progress()
         
         # Capture stdout to get script output
         log_capture = LogCapture()
@@ -300,21 +481,41 @@ def run_analysis_task():
         with redirect_stdout(log_capture):
             print("🚀 Starting competitor feature analysis...")
             
-            # Load processed URLs
-            print("📂 Loading processed article cache...")
-            processed_urls = load_processed_urls(CACHE_FILE)
-            app_state['current_task'] = 'Cache loaded'
-            
             # Get selected competitor configuration
             competitor_config = COMPETITORS[app_state['selected_competitor']]
             competitor_name = competitor_config['name']
             
+            # Load processed URLs (the listing crawl stops at the first one it meets)
+            print("📂 Loading processed article cache...")
+            processed_urls = load_processed_urls(app_state['selected_competitor'], competitor_config['cache_file'])
+            app_state['current_task'] = 'Cache loaded'
+            
+            crawl_options = {
+                'known_urls': processed_urls,
+                'max_pages': backfill_pages or None,
+                'backfill': backfill_pages > 0,
+            }
+            if backfill_pages:
+                print(f"📚 Backfill requested: crawling up to {backfill_pages} listing pages")
+            
             print(f"🔍 Getting article URL list for {competitor_name}...")
             
+            # Feeds / sitemaps first: cheaper than HTML parsing and they carry real dates
+            feed_result = None
+            if not backfill_pages:
+                feed_result = feed_discovery.discover_articles(competitor_config, known_urls=processed_urls)
+            
             # Try dynamic fetching for all competitors with real URLs, fallback to demo data
-            if app_state['selected_competitor'] == 'grab':
+            if feed_result is not None:
+                all_urls, articles = feed_result
+                for article in articles:
+                    app_state['article_metadata'][article['url']] = article
+                print(f"✅ Found {len(all_urls)} new articles from {competitor_name} feeds")
+                
+            elif app_state['selected_competitor'] == 'grab':
                 # Use Grab-specific function
-                result = get_article_urls(competitor_config['base_url'], competitor_config['selector'])
+                result = get_article_urls(competitor_config['base_url'], competitor_config['selector'],
+                                          **crawl_options)
                 
                 # Handle both old and new function signatures
                 if isinstance(result, tuple):
@@ -330,7 +531,9 @@ def run_analysis_task():
             elif app_state['selected_competitor'] == 'square':
                 # Use real-time scraping for Square POS
                 print(f"🔍 Fetching real-time articles from {competitor_name}...")
-                result = get_article_urls_generic(competitor_config['base_url'], competitor_config['selector'])
+                result = get_article_urls_generic(competitor_config['base_url'], competitor_config['selector'],
+                                                  profile=competitor_config.get('header_profile'),
+                                                  **crawl_options)
                 
                 if isinstance(result, tuple):
                     all_urls, articles = result
@@ -356,72 +559,150 @@ def run_analysis_task():
             app_state['current_task'] = f'Found {len(all_urls)} articles from {competitor_name}'
             
             # Filter new URLs
-            new_urls = [url for url in all_urls if url not in processed_urls]
+            new_urls = processed_urls.filter_new(all_urls)
             print(f"📊 Found {len(new_urls)} new articles to analyze")
             
             if not new_urls:
                 print("✅ All articles already analyzed, no reprocessing needed")
                 app_state['status'] = 'completed'
                 app_state['end_time'] = datetime.now()
+                publish_progress()
                 return
             
-            # Process each new article
+            # Process new articles through the fetch -> parse -> analyze pipeline
             results = []
-            for i, url in enumerate(new_urls):
-                app_state['current_task'] = f'Analyzing article {i+1}/{len(new_urls)}'
-                
-                print(f"\n📖 Processing article {i+1}/{len(new_urls)}: {url}")
-                
-                # Get article content
+            selected_competitor = app_state['selected_competitor']
+            total_new = len(new_urls)
+            positions = {url: i + 1 for i, url in enumerate(new_urls)}
+            app_state['processed_articles'] = 0
+            app_state['current_task'] = f'Analyzing {total_new} articles'
+            triage_counts = {'analyze': 0, 'explore': 0, 'skip': 0, 'defer': 0}
+            batcher = AnalysisBatcher(analyze_texts, GEMINI_BATCH_MAX_ARTICLES, GEMINI_BATCH_WAIT) \
+                if GEMINI_BATCH_TOKEN_BUDGET else None
+            
+            def fetch_stage(url, _):
+                print(f"\n📖 Processing article {positions[url]}/{total_new}: {url}")
                 print("  🔄 Getting article content...")
-                article_text = get_article_text(url)
-                
+                # Text is extracted while the body streams in, stopping at the text budget
+                return get_article_text(url)
+            
+            def parse_stage(url, article_text):
                 # Try mock content if real content failed (for demo purposes)
                 if not article_text or len(article_text.strip()) < 100:
-                    selected_competitor = app_state['selected_competitor']
                     mock_text = get_mock_content(selected_competitor, url)
                     if mock_text:
                         print(f"  📝 Using mock content for demo purposes")
                         article_text = mock_text
                 
-                if article_text and len(article_text.strip()) > 100:
-                    print("  🤖 Using AI to analyze content...")
-                    analysis = analyze_text(article_text)
-                    
-                    if analysis and not analysis.startswith("ERROR:"):
-                        # Parse the analysis to extract structured data
-                        parsed_result = parse_analysis_result(analysis, url)
-                        results.append(parsed_result)
-                        
-                        # Display results (this will be captured in logs)
-                        display_results(analysis, url)
-                        
-                        # Save to cache
-                        competitor_config = COMPETITORS[app_state['selected_competitor']]
-                        save_processed_url(competitor_config['cache_file'], url)
-                        print(f"  ✅ Article analysis completed and saved to cache")
-                    else:
-                        print(f"  ❌ AI analysis failed: {analysis}")
+                if not article_text or len(article_text.strip()) <= 100:
+                    print(f"  ⚠️  No content available for analysis: {url}")
+                    return None
+                
+                # Cheap local triage: unlikely feature announcements never reach Gemini
+                metadata = app_state['article_metadata'].setdefault(url, {})
+                metadata['lead'] = triage.lead_text(article_text, metadata.get('description', ''))
+                decision, metadata['triage_score'] = triage.decide(
+                    metadata.get('title', ''), metadata.get('category', ''), metadata['lead'])
+                metadata['triage_decision'] = decision
+                with state_lock:
+                    triage_counts[decision] += 1
+                if decision == 'skip':
+                    print(f"  🚫 Triage score {metadata['triage_score']:.2f}, skipping analysis")
+                    save_processed_url(processed_urls, url)
+                    return None
+                if decision == 'defer':
+                    # Not marked as processed: it comes back in a later run
+                    print(f"  ⏸️  Triage score {metadata['triage_score']:.2f}, deferring analysis")
+                    return None
+                
+                # Only the most informative sentences (within ANALYSIS_TOKEN_BUDGET) are analyzed
+                return condense.condense(article_text, metadata.get('title', ''))
+            
+            def analyze_stage(url, article_text):
+                # Republished copies of an already analyzed article reuse its analysis
+                signature = near_dup.minhash(article_text)
+                duplicate = near_dup.find_duplicate(signature, GEMINI_MODEL, ACTIVE_PROMPT_VERSION)
+                if duplicate:
+                    print(f"  ♻️  Near-duplicate of {duplicate['url']} "
+                          f"(similarity {duplicate['similarity']:.2f}), reusing its analysis")
+                    analysis = duplicate['analysis']
                 else:
-                    print(f"  ⚠️  No content available for analysis")
+                    print(f"  🤖 Using AI to analyze content: {url}")
+                    priority = recency_priority(url)
+                    if batcher:
+                        analysis = batcher.analyze(url, article_text, priority)
+                    else:
+                        # Analysis text goes to the open pages while Gemini is still writing it
+                        publish_event({'type': 'analysis_start', 'url': url,
+                                       'title': app_state['article_metadata'].get(url, {}).get('title', '')})
+                        analysis = analyze_text(article_text, priority, on_chunk=lambda text: publish_event(
+                            {'type': 'analysis_chunk', 'url': url, 'text': text} if text is not None
+                            else {'type': 'analysis_reset', 'url': url}))
+                
+                if not analysis or analysis.startswith("ERROR:"):
+                    print(f"  ❌ AI analysis failed: {analysis}")
+                    publish_event({'type': 'analysis_failed', 'url': url})
+                    return None
+                if not duplicate:
+                    near_dup.remember(url, signature, analysis, GEMINI_MODEL, ACTIVE_PROMPT_VERSION)
                 
-                # Update progress after processing each article
-                app_state['processed_articles'] = i + 1  # Show completed articles (1-based)
-                app_state['progress'] = int(((i + 1) / len(new_urls)) * 100)
+                # Parse the analysis to extract structured data
+                parsed_result = parse_analysis_result(analysis, url)
+                if duplicate:
+                    parsed_result['duplicate_of'] = duplicate['url']
+                # Kept so triage can be retrained from the LLM's verdicts (python triage.py train)
+                metadata = app_state['article_metadata'].get(url, {})
+                parsed_result['lead'] = metadata.get('lead', '')
+                parsed_result['triage_score'] = round(metadata.get('triage_score', 0.0), 3)
+                parsed_result['triage_decision'] = metadata.get('triage_decision', 'analyze')
+                # parse_analysis_result replaces title and category with the LLM's; triage scores the listing's
+                parsed_result['listing_title'] = metadata.get('title', '')
+                parsed_result['listing_category'] = metadata.get('category', '')
+                # Stored right away, so the results page shows it while the run continues
+                results_store.append(parsed_result, selected_competitor)
+                with state_lock:
+                    results.append(parsed_result)
+                publish_event({'type': 'result', 'result': {key: value for key, value in parsed_result.items()
+                                                            if key not in ('analysis', 'lead')}})
                 
-                time.sleep(0.5)  # Small delay for demo effect
+                # Display results (this will be captured in logs)
+                display_results(analysis, url, parsed_result)
+                
+                # Save to cache
+                save_processed_url(processed_urls, url)
+                print(f"  ✅ Article analysis completed and saved to cache")
+                return parsed_result
+            
+            def on_article_done(url, value, error):
+                # Update progress once per article, however it left the pipeline
+                with state_lock:
+                    app_state['processed_articles'] += 1
+                    app_state['progress'] = int((app_state['processed_articles'] / total_new) * 100)
+                    app_state['current_task'] = f"Analyzed {app_state['processed_articles']}/{total_new} articles"
+                    publish_progress()
             
-            # Accumulate results instead of overwriting
-            if 'results' not in app_state:
-                app_state['results'] = []
-            app_state['results'].extend(results)
+            pipeline = StagedPipeline([
+                ('fetch', fetch_stage, PIPELINE_WORKERS['fetch']),
+                ('parse', parse_stage, PIPELINE_WORKERS['parse']),
+                ('analyze', analyze_stage, PIPELINE_WORKERS['analyze']),
+            ], queue_size=PIPELINE_QUEUE_SIZE)
+            pipeline.run(new_urls, on_done=on_article_done)
+            processed_urls.flush()
+            if batcher:
+                print(f"📦 Gemini batching: {batcher.stats()}")
+            print(f"📡 Gemini dispatch: {dispatcher_stats()}")
+            if GEMINI_FAST_MODEL:
+                print(f"🪜 Model cascade: {cascade_stats()}")
+            print(f"🧮 Triage: {triage_counts['analyze']} analyzed, {triage_counts['explore']} explored, "
+                  f"{triage_counts['skip']} skipped, {triage_counts['defer']} deferred")
             
             app_state['processed_articles'] = len(new_urls)
             app_state['progress'] = 100
             app_state['status'] = 'completed'
             app_state['end_time'] = datetime.now()
+            publish_progress()
             
-            total_results = len(app_state['results'])
+            total_results = results_store.count()
             print(f"\n🎉 Analysis completed! Processed {len(new_urls)} articles, found {len(results)} new analysis results")
             print(f"📊 Total accumulated results across all competitors: {total_results}")
             
@@ -429,6 +710,7 @@ def run_analysis_task():
         app_state['status'] = 'error'
         app_state['current_task'] = f'Error: {str(e)}'
         app_state['end_time'] = datetime.now()
+        publish_progress()
         print(f"❌ Error during analysis: {str(e)}")
 
 @app.route('/')
@@ -436,6 +718,8 @@ def index():
     """Main page"""
     return render_template('index.html', 
                          state=app_state, 
+                         result_count=results_store.count(),
+                         recent_results=results_store.query(limit=3),
                          competitors=COMPETITORS,
                          selected_competitor=app_state['selected_competitor'])
 
@@ -457,6 +741,13 @@ def start_analysis():
     if app_state['status'] in ['running']:
         return jsonify({'error': 'Analysis is already running'}), 400
     
+    # Optional bounded backfill crawl: {"backfill_pages": N}
+    data = request.get_json(silent=True) or {}
+    try:
+        backfill_pages = max(0, int(data.get('backfill_pages', 0)))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'backfill_pages must be an integer'}), 400
+    
     # Reset state (preserve existing results for accumulation)
     app_state.update({
         'status': 'ready',
@@ -470,16 +761,12 @@ def start_analysis():
         'article_metadata': {}  # Clear previous article metadata
     })
     
-    # Initialize results list if it doesn't exist, but don't clear existing results
-    if 'results' not in app_state:
-        app_state['results'] = []
-    
-    # Clear log queue
-    while not log_queue.empty():
-        log_queue.get()
+    # Monitors opened from now on show this run's logs only
+    global run_log_start
+    run_log_start = log_hub.last_id
     
     # Start background task
-    thread = threading.Thread(target=run_analysis_task)
+    thread = threading.Thread(target=run_analysis_task, args=(backfill_pages,))
     thread.daemon = True
     thread.start()
     
@@ -487,28 +774,32 @@ def start_analysis():
 
 @app.route('/status')
 def get_status():
-    """Get current status"""
-    return jsonify(app_state)
+    """
+    Current progress (STATUS_FIELDS) and its version token.
+    With ?since=<version>, only the fields changed after that version; 304 if none.
+    """
+    version, fields = status_changes(request.args.get('since', ''))
+    if fields is None:
+        return Response(status=304)
+    return jsonify(dict(fields, version=version))
+
+@app.route('/stats')
+def get_stats():
+    """Service statistics (rate limits, LLM cache, dispatch, model clients, cascade)"""
+    return jsonify({'rate_limits': rate_limiter.stats(), 'llm_cache': llm_cache.stats(),
+                    'llm_dispatch': dispatcher_stats(), 'model_clients': model_registry.stats(),
+                    'cascade': cascade_stats()})
 
 @app.route('/logs')
 def stream_logs():
-    """Real-time log stream"""
-    def generate():
-        while True:
-            try:
-                # Get log from queue with timeout
-                log = log_queue.get(timeout=1)
-                yield f"data: {json.dumps({'log': log})}\n\n"
-            except queue.Empty:
-                # Send heartbeat
-                yield f"data: {json.dumps({'heartbeat': True})}\n\n"
-                
-                # If analysis is complete, stop streaming
-                if app_state['status'] in ['completed', 'error']:
-                    break
-    
-    return Response(generate(), mimetype='text/event-stream',
-                   headers={'Cache-Control': 'no-cache'})
+    """Real-time log and progress stream (from the start of the current run, or from Last-Event-ID)"""
+    return sse_response(log_hub, last_event_id(log_hub, run_log_start), stop_when_finished=True)
+
+@app.route('/stream')
+def stream_events():
+    """Live analysis stream: streamed analysis text and finished results, for /monitor and /results"""
+    # New clients only get what happens from now on; the page already shows earlier results
+    return sse_response(stream_hub, last_event_id(stream_hub, stream_hub.last_id))
 
 @app.route('/monitor')
 def monitor():
@@ -517,118 +808,109 @@ def monitor():
 
 @app.route('/results')
 def results():
-    """Results page"""
-    return render_template('results.html', state=app_state)
+    """Results page (one page of stored results, newest first)"""
+    try:
+        page = max(1, int(request.args.get('page', 1)))
+    except ValueError:
+        page = 1
+    stats = results_store.summary()
+    pages = max(1, -(-stats['total'] // RESULTS_PAGE_SIZE))
+    page = min(page, pages)
+    page_results = results_store.query(limit=RESULTS_PAGE_SIZE, offset=(page - 1) * RESULTS_PAGE_SIZE)
+    return render_template('results.html', state=app_state, results=page_results,
+                           stats=stats, page=page, pages=pages)
 
 @app.route('/clear-results', methods=['POST'])
 def clear_results():
     """Clear all accumulated analysis results"""
-    app_state['results'] = []
+    results_store.clear()
     return jsonify({'message': 'All analysis results cleared successfully'})
 
-def get_article_urls(base_url, selector, limit=10):
-    """获取Grab最新文章列表，包含标题、URL、发布日期等信息"""
+def fetch_grab_listing_page(page_url, limit=10):
+    """抓取并解析Grab新闻列表的一页，返回 (文章列表, 下一页URL)"""
+    cached = listing_cache.get_entry(page_url, limit)
+    response = http_client.get(page_url, profile='grab', cache_ttl=0,
+                               headers=listing_cache.conditional_headers(cached))
+    if response.status_code == 304 and cached:
+        print("♻️  Press page not modified (304), reusing cached article list")
+        return listing_cache.cached_page(cached)
+    response.raise_for_status()
+    
+    # 解析列表页（后端由 HTML_PARSER_BACKEND 决定）
+    panels, link_count, next_href = html_parser.parse_grab_listing(response.content, limit=limit)
+    print(f"Found {link_count} article links on press page.")
+    
+    articles = []
+    valid_articles = 0
+    
+    for panel in panels:
+        try:
+            article_url = url_canon.canonicalize_url(panel['url'], page_url)
+            if not article_url:
+                continue
+            title = panel['title']
+            original_date_text = panel['date_text']
+            publish_date = None
+            
+            if original_date_text:
+                # 解析日期格式 "11 Jun 2025" 或其他格式
+                # 尝试多种日期格式
+                for fmt in ["%d %b %Y", "%B %d, %Y", "%d %B %Y"]:
+                    try:
+                        publish_date = datetime.strptime(original_date_text, fmt)
+                        break
+                    except ValueError:
+                        continue
+            
+            if not publish_date:
+                # 如果无法解析，使用当前时间作为默认值
+                publish_date = datetime.now()
+            
+            article_info = {
+                'url': article_url,
+                'title': title,
+                'publish_date': publish_date,
+                'original_date_text': original_date_text,
+                'description': panel['description'],
+                'category': panel['category'],
+                'source': 'grab'
+            }
+            
+            articles.append(article_info)
+            valid_articles += 1
+            print(f"  ✓ {valid_articles:2d}. {title[:50]}... ({original_date_text})")
+            
+        except Exception as e:
+            print(f"  ❌ Error processing article: {e}")
+            continue
+    
+    next_url = urljoin(page_url, next_href) if next_href else None
+    listing_cache.store(page_url, response, articles, limit, next_url)
+    return articles, next_url
+
+def get_article_urls(base_url, selector, limit=10, known_urls=None, max_pages=1, backfill=False):
+    """
+    获取Grab最新文章列表，包含标题、URL、发布日期等信息
+    
+    Pass known_urls to crawl older listing pages until the first already
+    processed article (at most max_pages pages, None = CRAWL_MAX_PAGES);
+    backfill=True reads max_pages pages regardless of known URLs.
+    """
     
     try:
         print("🔍 Fetching latest articles from Grab...")
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(base_url, headers=headers, timeout=15)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # 查找所有文章链接
-        blog_links = soup.find_all('a', class_='blogHyperlink')
-        print(f"Found {len(blog_links)} article links on press page.")
-        
-        articles = []
-        valid_articles = 0
-        
-        for link in blog_links:
-            if valid_articles >= limit:
-                break
-                
-            try:
-                # 获取URL
-                article_url = link.get('href')
-                if not article_url or article_url == '#':
-                    continue
-                    
-                # 获取文章容器
-                article_panel = link.find('article', class_=lambda x: x and 'panel-article' in str(x))
-                if not article_panel:
-                    continue
-                
-                # 获取标题
-                title_elem = article_panel.find('h2')
-                if not title_elem:
-                    title_elem = article_panel.find(['h1', 'h3', 'h4', 'h5'])
-                
-                title = title_elem.get_text(strip=True) if title_elem else "Unknown Title"
-                
-                # 获取发布日期
-                date_elem = article_panel.find(class_='post-date')
-                publish_date = None
-                original_date_text = ""
-                
-                if date_elem:
-                    original_date_text = date_elem.get_text(strip=True)
-                    # 解析日期格式 "11 Jun 2025" 或其他格式
-                    try:
-                        # 尝试多种日期格式
-                        for fmt in ["%d %b %Y", "%B %d, %Y", "%d %B %Y"]:
-                            try:
-                                publish_date = datetime.strptime(original_date_text, fmt)
-                                break
-                            except:
-                                continue
-                        
-                        if not publish_date:
-                            # 如果无法解析，使用当前时间作为默认值
-                            publish_date = datetime.now()
-                    except:
-                        publish_date = datetime.now()
-                else:
-                    publish_date = datetime.now()
-                
-                # 获取分类
-                cat_elem = article_panel.find(class_='post-cat')
-                category = "Others"
-                if cat_elem:
-                    category = cat_elem.get_text(strip=True).replace('**', '').strip()
-                
-                # 获取描述
-                description = ""
-                desc_p = article_panel.find('p')
-                if desc_p:
-                    description = desc_p.get_text(strip=True)
-                
-                article_info = {
-                    'url': article_url,
-                    'title': title,
-                    'publish_date': publish_date,
-                    'original_date_text': original_date_text,
-                    'description': description,
-                    'category': category,
-                    'source': 'grab'
-                }
-                
-                articles.append(article_info)
-                valid_articles += 1
-                print(f"  ✓ {valid_articles:2d}. {title[:50]}... ({original_date_text})")
-                
-            except Exception as e:
-                print(f"  ❌ Error processing article: {e}")
-                continue
+        articles, reached_known = listing_crawler.crawl_listing(
+            base_url, lambda page_url: fetch_grab_listing_page(page_url, limit),
+            known_urls=known_urls, max_pages=max_pages, backfill=backfill)
         
         if articles:
             # 按发布日期排序（最新的在前）
             articles.sort(key=lambda x: x['publish_date'], reverse=True)
             print(f"Successfully fetched {len(articles)} articles, sorted by date (newest first)")
             return [article['url'] for article in articles], articles
+        elif reached_known:
+            print("✅ No new articles since the last run")
+            return [], []
         else:
             print("⚠️  No valid articles found, falling back to demo mode")
             return get_demo_article_urls()
@@ -874,112 +1156,123 @@ def get_mock_content(competitor, url):
         return f"# {mock_data['title']}\n\n{mock_data['content']}"
     return None
 
-def get_article_urls_generic(base_url, selector, limit=20):
+def fetch_generic_listing_page(page_url, selector, limit=20, profile=None):
+    """Fetches and parses one page of a generic listing, returning (articles, next_url)"""
+    cached = listing_cache.get_entry(page_url, limit)
+    response = http_client.get(page_url, profile=profile,
+                               timeout=(http_client.HTTP_CONNECT_TIMEOUT, 30), cache_ttl=0,
+                               headers=listing_cache.conditional_headers(cached))
+    if response.status_code == 304 and cached:
+        print("♻️  Listing page not modified (304), reusing cached article list")
+        return listing_cache.cached_page(cached)
+    response.raise_for_status()
+    
+    print(f"✅ Successfully fetched page (Status: {response.status_code})")
+    print(f"📄 Content length: {len(response.content)} bytes")
+    
+    soup = html_parser.strip_non_text(html_parser.make_soup(response.content))
+    
+    # Find article links using the provided selector
+    links = soup.select(selector)
+    print(f"🔍 Found {len(links)} potential article links")
+    
+    articles = []
+    valid_articles = 0
+    
+    for i, link in enumerate(links[:limit * 2]):  # Get more than needed in case some are invalid
+        try:
+            # Extract URL
+            url = link.get('href', '')
+            
+            # Make URL absolute and canonical (drops tracking params, fragments, mailto: etc.)
+            url = url_canon.canonicalize_url(url, page_url)
+            if not url:
+                continue
+            
+            # Extract title
+            title = link.get_text(strip=True) or link.get('title', '')
+            if not title:
+                # Try to find title in parent elements
+                parent = link.parent
+                if parent:
+                    title = parent.get_text(strip=True)
+            
+            # Skip if URL or title is empty
+            if not url or not title:
+                continue
+            
+            # Try to extract publish date (this is site-specific)
+            publish_date = datetime.now()  # Default to now
+            original_date_text = "Today"
+            
+            # Look for date in nearby elements (common patterns)
+            date_element = None
+            for date_selector in ['.date', '.published', '.timestamp', 'time', '[datetime]']:
+                date_element = link.find_parent().find(date_selector) if link.find_parent() else None
+                if date_element:
+                    break
+            
+            if date_element:
+                date_text = date_element.get_text(strip=True) or date_element.get('datetime', '')
+                if date_text:
+                    original_date_text = date_text
+                    # Try to parse the date (basic parsing)
+                    try:
+                        from dateutil import parser
+                        publish_date = parser.parse(date_text)
+                    except:
+                        pass  # Keep default date if parsing fails
+            
+            article = {
+                'url': url,
+                'title': title,
+                'publish_date': publish_date,
+                'original_date_text': original_date_text,
+                'category': 'News',
+                'description': title,  # Use title as description fallback
+                'source': 'generic'
+            }
+            
+            articles.append(article)
+            valid_articles += 1
+            print(f"  ✓ {valid_articles:2d}. {title[:60]}... ({original_date_text})")
+            
+            if valid_articles >= limit:
+                break
+                
+        except Exception as e:
+            print(f"  ❌ Error processing article link {i}: {e}")
+            continue
+    
+    next_url = listing_crawler.find_next_page_url(soup, page_url)
+    listing_cache.store(page_url, response, articles, limit, next_url)
+    return articles, next_url
+
+def get_article_urls_generic(base_url, selector, limit=20, profile=None,
+                             known_urls=None, max_pages=1, backfill=False):
     """
     Generic function to fetch article URLs from any website
     使用通用方法从任何网站获取文章链接
+    
+    known_urls / max_pages / backfill control the paginated crawl, see get_article_urls.
     """
     print(f"🔍 Fetching articles from: {base_url}")
     print(f"   Using selector: {selector}")
     print(f"   Limit: {limit} articles")
     
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
-        
-        response = requests.get(base_url, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        print(f"✅ Successfully fetched page (Status: {response.status_code})")
-        print(f"📄 Content length: {len(response.content)} bytes")
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Find article links using the provided selector
-        links = soup.select(selector)
-        print(f"🔍 Found {len(links)} potential article links")
-        
-        articles = []
-        valid_articles = 0
-        
-        for i, link in enumerate(links[:limit * 2]):  # Get more than needed in case some are invalid
-            try:
-                # Extract URL
-                url = link.get('href', '')
-                
-                # Make URL absolute if relative
-                if url.startswith('/'):
-                    from urllib.parse import urljoin
-                    url = urljoin(base_url, url)
-                elif not url.startswith('http'):
-                    continue
-                
-                # Extract title
-                title = link.get_text(strip=True) or link.get('title', '')
-                if not title:
-                    # Try to find title in parent elements
-                    parent = link.parent
-                    if parent:
-                        title = parent.get_text(strip=True)
-                
-                # Skip if URL or title is empty
-                if not url or not title:
-                    continue
-                
-                # Try to extract publish date (this is site-specific)
-                publish_date = datetime.now()  # Default to now
-                original_date_text = "Today"
-                
-                # Look for date in nearby elements (common patterns)
-                date_element = None
-                for date_selector in ['.date', '.published', '.timestamp', 'time', '[datetime]']:
-                    date_element = link.find_parent().find(date_selector) if link.find_parent() else None
-                    if date_element:
-                        break
-                
-                if date_element:
-                    date_text = date_element.get_text(strip=True) or date_element.get('datetime', '')
-                    if date_text:
-                        original_date_text = date_text
-                        # Try to parse the date (basic parsing)
-                        try:
-                            from dateutil import parser
-                            publish_date = parser.parse(date_text)
-                        except:
-                            pass  # Keep default date if parsing fails
-                
-                article = {
-                    'url': url,
-                    'title': title,
-                    'publish_date': publish_date,
-                    'original_date_text': original_date_text,
-                    'category': 'News',
-                    'description': title,  # Use title as description fallback
-                    'source': 'generic'
-                }
-                
-                articles.append(article)
-                valid_articles += 1
-                print(f"  ✓ {valid_articles:2d}. {title[:60]}... ({original_date_text})")
-                
-                if valid_articles >= limit:
-                    break
-                    
-            except Exception as e:
-                print(f"  ❌ Error processing article link {i}: {e}")
-                continue
+        articles, reached_known = listing_crawler.crawl_listing(
+            base_url, lambda page_url: fetch_generic_listing_page(page_url, selector, limit, profile),
+            known_urls=known_urls, max_pages=max_pages, backfill=backfill)
         
         if articles:
             # Sort by publish date (newest first)
             articles.sort(key=lambda x: x['publish_date'], reverse=True)
             print(f"✅ Successfully fetched {len(articles)} articles, sorted by date (newest first)")
             return [article['url'] for article in articles], articles
+        elif reached_known:
+            print("✅ No new articles since the last run")
+            return [], []
         else:
             print("⚠️  No valid articles found")
             return [], []
@@ -1008,6 +1301,9 @@ if __name__ == '__main__':
         print("❌ Unable to find available port")
         exit(1)
     
+    if GEMINI_API_KEY or GEMINI_MODEL == 'stub':
+        prewarm_models()
+    
     print("🚀 ACFWS Web Demo starting...")
     print(f"📱 Please visit in browser: http://localhost:{port}")
     print("⭐ Tip: Use Ctrl+C to stop service")
@@ -13,6 +13,9 @@ from bs4 import BeautifulSoup
 import google.generativeai as genai
 from dotenv import load_dotenv
 
+import condense
+import model_registry
+
 # Load environment variables
 load_dotenv()
 
@@ -23,6 +26,7 @@ COMPETITOR_NAME = "Grab"
 BASE_URL = "https://www.grab.com/sg/press/"
 CACHE_FILE = f"{COMPETITOR_NAME.lower()}_articles.txt"
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-1.5-pro')
 
 # Configure Gemini
 if GEMINI_API_KEY:
@@ -148,8 +152,8 @@ def analyze_text_simple(article_text):
         return "ERROR: No article text provided"
     
     try:
-        model = genai.GenerativeModel('gemini-1.5-pro')
-        formatted_prompt = ANALYSIS_PROMPT.format(article_text=article_text[:4000])
+        model = model_registry.get_model(GEMINI_MODEL)
+        formatted_prompt = ANALYSIS_PROMPT.format(article_text=condense.condense(article_text))
         
         print(f"  - Sending to Gemini for analysis...")
         response = model.generate_content(formatted_prompt)
@@ -308,6 +312,9 @@ if __name__ == '__main__':
         print("❌ Unable to find available port")
         exit(1)
     
+    if GEMINI_API_KEY:
+        model_registry.prewarm(GEMINI_MODEL)
+    
     print("🚀 ACFWS Web Demo starting...")
     print(f"📱 Please visit in browser: http://localhost:{port}")
     print("⭐ Tip: Use Ctrl+C to stop service")